@@ -0,0 +1,302 @@
+import heapq
+from array import array
+from collections import Counter
+
+from indexes import DAY, normalize
+from main import from_timestamp
+
+try:
+    import numpy
+except ImportError:  # Aggregates fall back to pure Python over the same columns.
+    numpy = None
+
+
+class ColumnIndex:
+    """Registry index keeping some fields of every record as packed int64 columns.
+
+    Each record owns one row; removing a record moves the last row into its
+    place, so inserts and removes are O(1) and the columns stay dense.
+    Categorical columns store small integer codes, with the distinct values
+    (compared case-insensitively) kept in first-seen order. version changes
+    on every update, so array snapshots can be cached until it moves.
+    """
+
+    def __init__(self, fields, columns, categories=()):
+        """Initialize columns from {name: function(record) -> int or category value}.
+
+        fields names the record attributes the functions read; columns named
+        in categories are dictionary-encoded.
+        """
+        self.getters = columns
+        self.fields = set(fields)
+        self.categories = {name: [] for name in categories}
+        self._codes = {name: {} for name in categories}
+        self.columns = {name: array("q") for name in columns}
+        self.ids = []
+        self._rows = {}
+        self.version = 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _encode(self, name, value):
+        """Return the code of a categorical value, assigning one on first sight."""
+        codes = self._codes[name]
+        key = normalize(value)
+        code = codes.get(key)
+        if code is None:
+            code = codes[key] = len(self.categories[name])
+            self.categories[name].append(value)
+        return code
+
+    def insert(self, record_id, record):
+        """Append the record's values as a new row; leave the columns unchanged if one is invalid."""
+        values = [(name, get(record)) for name, get in self.getters.items()]
+        for name, value in values:
+            if name not in self._codes and not isinstance(value, int):
+                raise TypeError(f"Column '{name}' needs an integer, got {value!r}")
+        for name, value in values:
+            if name in self._codes:
+                value = self._encode(name, value)
+            self.columns[name].append(value)
+        self._rows[record_id] = len(self.ids)
+        self.ids.append(record_id)
+        self.version += 1
+
+    def row(self, record_id):
+        """Return the row holding record_id, or None."""
+        return self._rows.get(record_id)
+
+    def remove(self, record_id, record):
+        """Drop the record's row, filling the gap with the last row."""
+        row = self._rows.pop(record_id)
+        last_id = self.ids.pop()
+        for column in self.columns.values():
+            value = column.pop()
+            if last_id != record_id:
+                column[row] = value
+        if last_id != record_id:
+            self.ids[row] = last_id
+            self._rows[last_id] = row
+        self.version += 1
+
+    def clear(self):
+        """Remove every row (category codes are kept)."""
+        for name in self.columns:
+            self.columns[name] = array("q")
+        self.ids.clear()
+        self._rows.clear()
+        self.version += 1
+
+
+class StockFlowIndex:
+    """Registry index totalling each inventory item's quantity decreases and increases.
+
+    Registry.update removes a record from its indexes before changing it and
+    inserts it again afterwards, so the change is the difference between
+    the two quantities seen. Deletes are told apart from updates because
+    the registry has already dropped a deleted record when its indexes
+    hear about it; those are not counted as movements.
+    """
+
+    def __init__(self, registry, field="quantity"):
+        """Initialize with no recorded movements for the items in registry."""
+        self.registry = registry
+        self.field = field
+        self.fields = {field}
+        self.issued = {}
+        self.received = {}
+        self._before = {}
+
+    def insert(self, record_id, record):
+        """Record the movement since the quantity seen when an update began."""
+        before = self._before.pop(record_id, None)
+        if before is None:
+            return
+        change = getattr(record, self.field) - before
+        if change < 0:
+            self.issued[record_id] = self.issued.get(record_id, 0) - change
+        elif change > 0:
+            self.received[record_id] = self.received.get(record_id, 0) + change
+
+    def remove(self, record_id, record):
+        """Remember the quantity before an update; ignore deletes."""
+        if record_id in self.registry:
+            self._before[record_id] = getattr(record, self.field)
+
+    def clear(self):
+        """Forget every movement."""
+        self.issued.clear()
+        self.received.clear()
+        self._before.clear()
+
+
+class Analytics:
+    """Dashboard aggregates computed over packed columns of a HospitalManagementSystem.
+
+    Attaching it adds ColumnIndexes to patients (age, gender, diagnosis),
+    appointments (doctor, day) and inventory (quantity), plus a
+    StockFlowIndex, all maintained incrementally on every change. With
+    NumPy installed the columns are copied into arrays once per change and
+    aggregated vectorized; without it, or with use_numpy=False, the same
+    aggregates are counted in pure Python over the columns.
+    """
+
+    def __init__(self, hms, use_numpy=None):
+        """Attach column indexes to hms; use_numpy defaults to whether NumPy is installed."""
+        if use_numpy and numpy is None:
+            raise ImportError("NumPy is not installed")
+        self.hms = hms
+        self.use_numpy = numpy is not None if use_numpy is None else use_numpy
+        self.patients = hms.patients.add_index(
+            ColumnIndex(
+                ("age", "gender", "diagnosis"),
+                {
+                    "age": lambda patient: patient.age,
+                    "gender": lambda patient: patient.gender,
+                    "diagnosis": lambda patient: patient.diagnosis,
+                },
+                categories=("gender", "diagnosis"),
+            )
+        )
+        self.appointments = hms.appointments.add_index(
+            ColumnIndex(
+                ("doctor_id", "starts_at"),
+                {
+                    "doctor_id": lambda appointment: appointment.doctor_id,
+                    "day": lambda appointment: appointment.starts_at // DAY,
+                },
+            )
+        )
+        self.inventory = hms.inventory.add_index(
+            ColumnIndex(("quantity",), {"quantity": lambda item: item.quantity})
+        )
+        self.stock_flow = hms.inventory.add_index(StockFlowIndex(hms.inventory))
+        self._arrays = {}
+
+    def arrays(self, index):
+        """Return {column: numpy array} for a ColumnIndex, rebuilt only after it changes."""
+        cached = self._arrays.get(index)
+        if cached is None or cached[0] != index.version:
+            cached = self._arrays[index] = (
+                index.version,
+                {
+                    name: numpy.frombuffer(column, dtype=numpy.int64).copy()
+                    for name, column in index.columns.items()
+                },
+            )
+        return cached[1]
+
+    # Aggregates
+    def age_distribution(self, width=10):
+        """Return {"edges": bin starts, "counts": {gender: patients per bin}}."""
+        columns = self.patients.columns
+        genders = self.patients.categories["gender"]
+        if not columns["age"]:
+            return {"edges": [], "counts": {}}
+        if self.use_numpy:
+            arrays = self.arrays(self.patients)
+            bins = int(arrays["age"].max()) // width + 1
+            counts = numpy.bincount(
+                arrays["gender"] * bins + arrays["age"] // width,
+                minlength=len(genders) * bins,
+            ).reshape(len(genders), bins)
+            rows = counts.tolist()
+        else:
+            bins = max(columns["age"]) // width + 1
+            rows = [[0] * bins for _ in genders]
+            for code, age in zip(columns["gender"], columns["age"]):
+                rows[code][age // width] += 1
+        return {
+            "edges": list(range(0, bins * width, width)),
+            "counts": {gender: row for gender, row in zip(genders, rows) if any(row)},
+        }
+
+    def doctor_load(self):
+        """Return {(doctor_id, 'YYYY-MM-DD'): appointments} for every booked doctor-day."""
+        if not self.appointments:
+            return {}
+        if self.use_numpy:
+            arrays = self.arrays(self.appointments)
+            doctors, days = arrays["doctor_id"], arrays["day"]
+            first_day = int(days.min())
+            span = int(days.max()) - first_day + 1
+            keys = doctors * span + (days - first_day)
+            if (int(doctors.max()) + 1) * span <= 4 * len(keys) and doctors.min() >= 0:
+                counts = numpy.bincount(keys)
+                keys = numpy.flatnonzero(counts)
+                counts = counts[keys]
+            else:
+                keys, counts = numpy.unique(keys, return_counts=True)
+            pairs = zip(
+                zip((keys // span).tolist(), (keys % span + first_day).tolist()),
+                counts.tolist(),
+            )
+        else:
+            columns = self.appointments.columns
+            pairs = Counter(zip(columns["doctor_id"], columns["day"])).items()
+        dates = {}
+        load = {}
+        for (doctor_id, day), count in pairs:
+            date = dates.get(day)
+            if date is None:
+                date = dates[day] = from_timestamp(day * DAY).strftime("%Y-%m-%d")
+            load[doctor_id, date] = count
+        return load
+
+    def top_diagnoses(self, limit=10):
+        """Return the limit most common diagnoses as (diagnosis, patients), most first."""
+        names = self.patients.categories["diagnosis"]
+        if self.use_numpy:
+            counts = numpy.bincount(
+                self.arrays(self.patients)["diagnosis"], minlength=len(names)
+            ).tolist()
+        else:
+            counts = [0] * len(names)
+            for code in self.patients.columns["diagnosis"]:
+                counts[code] += 1
+        top = heapq.nsmallest(
+            limit,
+            ((code, count) for code, count in enumerate(counts) if count),
+            key=lambda pair: (-pair[1], pair[0]),
+        )
+        return [(names[code], count) for code, count in top]
+
+    def inventory_turnover(self, limit=10):
+        """Return stock turnover since the analytics were attached.
+
+        Turnover is units issued over average stock, with opening stock
+        taken as current stock plus issued minus received. The result has
+        totals plus the limit fastest-moving items as (item_id, turnover).
+        """
+        index = self.inventory
+        issued_by_item = self.stock_flow.issued
+        received_by_item = self.stock_flow.received
+        issued = sum(issued_by_item.values())
+        received = sum(received_by_item.values())
+        if self.use_numpy:
+            closing = int(self.arrays(index)["quantity"].sum())
+        else:
+            closing = sum(index.columns["quantity"])
+        opening = closing + issued - received
+        average = (opening + closing) / 2
+        rates = []
+        quantities = index.columns["quantity"]
+        for item_id, units in issued_by_item.items():
+            row = index.row(item_id)
+            if row is None:
+                continue
+            quantity = quantities[row]
+            item_average = quantity + (units - received_by_item.get(item_id, 0)) / 2
+            rates.append(
+                (units / item_average if item_average else float("inf"), item_id)
+            )
+        return {
+            "issued": issued,
+            "received": received,
+            "stock": closing,
+            "turnover": issued / average if average else 0.0,
+            "fastest": [
+                (item_id, rate) for rate, item_id in heapq.nlargest(limit, rates)
+            ],
+        }
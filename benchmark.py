@@ -0,0 +1,1048 @@
+import argparse
+import csv
+import functools
+import json
+import os
+import pickle
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+from main import (
+    Appointment,
+    Doctor,
+    HospitalManagementSystem,
+    Inventory,
+    Patient,
+    Staff,
+)
+import analytics
+from bulk import export_file, import_file
+from concurrency import ConcurrentHospitalManagementSystem
+import datagen
+from errors import IntegrityError
+from events import EventStream
+from indexes import DAY, NameIndex, ScheduleIndex
+from metrics import Metrics
+from output import Sink, StreamSink
+from query import Field
+from registry import Registry
+from sharding import ShardedHospitalManagementSystem
+import snapshot
+from storage import LogStorage
+
+# Utility: Timing
+# Every report() line, for --json output.
+RESULTS = []
+
+
+def timed(func, *args):
+    """Run func(*args) and return the elapsed wall-clock seconds."""
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def report(label, count, seconds):
+    """Print one benchmark line as operations per second."""
+    rate = count / seconds if seconds else float("inf")
+    RESULTS.append(
+        {"label": label, "count": count, "seconds": seconds, "ops_per_second": rate}
+    )
+    print(f"{label:<40} {count:>10,} ops  {seconds:8.3f}s  {rate:>14,.0f} ops/s")
+
+
+def make_patients(count):
+    """Build count synthetic patients with sequential IDs."""
+    return [
+        Patient(i, f"Patient {i}", 20 + i % 70, "MF"[i % 2], "Flu")
+        for i in range(count)
+    ]
+
+
+def make_doctors(count):
+    """Build count synthetic doctors with sequential IDs."""
+    return [Doctor(i, f"Doctor {i}", "GP", f"555-{i:04d}") for i in range(count)]
+
+
+# Benchmark: Registry
+def bench_registry(sizes):
+    """Measure Registry add and lookup throughput at each size."""
+    for size in sizes:
+        patients = make_patients(size)
+        registry = Registry("patient_id")
+
+        def add_all():
+            for patient in patients:
+                registry.add(patient)
+
+        def lookup_all():
+            for patient_id in range(size):
+                registry.get(patient_id)
+
+        report(f"registry add ({size:,})", size, timed(add_all))
+        report(f"registry lookup ({size:,})", size, timed(lookup_all))
+
+
+# Benchmark: Record Memory
+class LegacyPatient:
+    """Dict-backed patient record, as stored before the switch to __slots__."""
+
+    def __init__(self, patient_id, name, age, gender, diagnosis):
+        self.patient_id = patient_id
+        self.name = name
+        self.age = age
+        self.gender = gender
+        self.diagnosis = diagnosis
+
+
+def measure_memory(record_class, count):
+    """Return bytes allocated for count records of record_class, excluding field values."""
+    ids = list(range(count))
+    names = [f"Patient {i}" for i in ids]
+    tracemalloc.start()
+    records = [
+        record_class(ids[i], names[i], 20 + i % 70, "MF"[i % 2], "Flu")
+        for i in range(count)
+    ]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return current
+
+
+def bench_memory(sizes):
+    """Compare per-record memory of the legacy and slot-based layouts."""
+    for size in sizes:
+        legacy = measure_memory(LegacyPatient, size)
+        compact = measure_memory(Patient, size)
+        print(
+            f"{size:>10,} records  legacy {legacy / size:6.1f} B/rec  "
+            f"slots {compact / size:6.1f} B/rec  ({legacy / compact:.2f}x smaller)"
+        )
+
+
+# Benchmark: Journal Persistence
+def bench_persistence(sizes):
+    """Measure sustained journal writes and recovery time for each event count."""
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            storage = LogStorage(directory)
+            events = (
+                {"collection": "patients", "op": "add", "record": vars(patient)}
+                for patient in make_patients(size)
+            )
+
+            def write_all():
+                for event in events:
+                    storage.append(event)
+                storage.close()
+
+            report(f"journal writes ({size:,})", size, timed(write_all))
+            size_mb = os.path.getsize(storage.journal_path) / 1e6
+            print(f"{'journal size':<40} {size_mb:10.1f} MB")
+
+            hms = HospitalManagementSystem(LogStorage(directory))
+            report(f"journal recovery ({size:,})", size, timed(hms.recover))
+            assert len(hms.patients) == size
+            hms.close()
+
+
+# Benchmark: Snapshot Cold Start
+def bench_snapshot(sizes):
+    """Compare cold-start time of the binary snapshot with pickle and the JSON journal snapshot."""
+    for size in sizes:
+        hms = HospitalManagementSystem()
+        hms.bulk_add("patients", make_patients(size))
+        with tempfile.TemporaryDirectory() as directory:
+            binary_path = os.path.join(directory, "snapshot.bin")
+            pickle_path = os.path.join(directory, "patients.pickle")
+            report(
+                f"binary save ({size:,})", size, timed(snapshot.save, hms, binary_path)
+            )
+            with open(pickle_path, "wb") as file:
+                pickle.dump(list(hms.patients), file, pickle.HIGHEST_PROTOCOL)
+            storage = LogStorage(os.path.join(directory, "json"))
+            hms.storage = storage
+            hms.checkpoint()
+            storage.close()
+            binary_storage = LogStorage(os.path.join(directory, "binary"))
+            hms.storage = binary_storage
+            snapshot.checkpoint(hms)
+            binary_storage.close()
+            for label, path in (
+                ("binary", binary_path),
+                ("pickle", pickle_path),
+                ("json", storage.snapshot_path),
+            ):
+                print(
+                    f"{label + ' file size':<40} {os.path.getsize(path) / 1e6:10.1f} MB"
+                )
+
+            def open_mapped():
+                with snapshot.load(binary_path) as mapped:
+                    mapped["patients"].get(size // 2)
+
+            def decode_binary():
+                with snapshot.load(binary_path) as mapped:
+                    list(mapped["patients"])
+
+            def restore_binary():
+                snapshot.load(binary_path, HospitalManagementSystem())
+
+            def load_pickle():
+                with open(pickle_path, "rb") as file:
+                    pickle.load(file)
+
+            def recover_json():
+                HospitalManagementSystem(LogStorage(storage.directory)).recover()
+
+            def recover_binary():
+                directory = binary_storage.directory
+                snapshot.recover(HospitalManagementSystem(LogStorage(directory)))
+
+            seconds = timed(open_mapped)
+            print(
+                f"{f'mmap open + first get ({size:,})':<40} {seconds * 1000:10.2f} ms"
+            )
+            report(
+                f"binary decode, records only ({size:,})", size, timed(decode_binary)
+            )
+            report(f"pickle load, records only ({size:,})", size, timed(load_pickle))
+            report(
+                f"binary restore into system ({size:,})", size, timed(restore_binary)
+            )
+            report(f"json snapshot recovery ({size:,})", size, timed(recover_json))
+            report(f"binary snapshot recovery ({size:,})", size, timed(recover_binary))
+
+
+# Benchmark: Name Search
+FIRST_NAMES = [
+    "Ayesha",
+    "Rahim",
+    "Karim",
+    "Nusrat",
+    "Tanvir",
+    "Farhana",
+    "Mehedi",
+    "Sadia",
+]
+LAST_NAMES = [
+    "Rahman",
+    "Hossain",
+    "Islam",
+    "Ahmed",
+    "Chowdhury",
+    "Khan",
+    "Begum",
+    "Sarkar",
+]
+
+
+def bench_search(sizes, queries=1_000):
+    """Compare indexed name search with a lowercase-and-scan baseline."""
+    rng = random.Random(42)
+    for size in sizes:
+        registry = Registry("patient_id")
+        index = registry.add_index(NameIndex("name"))
+        for i in range(size):
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i}"
+            registry.add(Patient(i, name, 30, "F", "Flu"))
+        terms = [
+            f"{rng.choice(LAST_NAMES)} {rng.randrange(size)}" for _ in range(queries)
+        ]
+        scans = max(1, queries // 100)
+
+        def indexed():
+            for term in terms:
+                index.search(term)
+
+        def scanned():
+            for term in terms[:scans]:
+                [p for p in registry if term.lower() in p.name.lower()]
+
+        report(f"indexed search ({size:,})", queries, timed(indexed))
+        report(f"scan search ({size:,})", scans, timed(scanned))
+
+
+# Benchmark: Appointment Booking
+def bench_schedule(sizes, doctors=200):
+    """Measure conflict-checked booking and day/patient lookups."""
+    rng = random.Random(7)
+    for size in sizes:
+        registry = Registry("appointment_id")
+        schedule = registry.add_index(ScheduleIndex())
+        requests = [
+            Appointment(
+                i,
+                rng.randrange(size // 4 + 1),
+                rng.randrange(doctors),
+                f"2024-12-{rng.randint(1, 28):02d}",
+                f"{rng.randint(8, 19):02d}:{rng.randrange(0, 60, 15):02d}",
+            )
+            for i in range(size)
+        ]
+
+        def book_all():
+            for appointment in requests:
+                if not schedule.is_booked(appointment.doctor_id, appointment.starts_at):
+                    registry.add(appointment)
+
+        def lookup_all():
+            for appointment in requests:
+                schedule.doctor_day(appointment.doctor_id, appointment.starts_at // DAY)
+                schedule.patient_appointments(
+                    appointment.patient_id, appointment.starts_at
+                )
+
+        def range_all():
+            for appointment in requests[:1_000]:
+                schedule.between(appointment.starts_at, appointment.starts_at + 3600)
+
+        report(f"booking with conflict check ({size:,})", size, timed(book_all))
+        report(f"doctor-day + patient lookup ({size:,})", size, timed(lookup_all))
+        report(f"one-hour range query ({size:,})", min(size, 1_000), timed(range_all))
+
+
+# Benchmark: Bulk Import / Export
+def bench_bulk(sizes):
+    """Measure streaming CSV import and export of patients, in memory and journaled."""
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, "patients.csv")
+            with open(source, "w", newline="", encoding="utf-8") as file:
+                writer = csv.writer(file)
+                writer.writerow(Patient.FIELDS)
+                for patient in make_patients(size):
+                    writer.writerow(vars(patient).values())
+
+            hms = HospitalManagementSystem()
+            print(
+                f"import in memory ({size:,}): {import_file(hms, 'patients', source)}"
+            )
+            target = os.path.join(directory, "export.jsonl")
+            report(
+                f"export jsonl ({size:,})",
+                size,
+                timed(export_file, hms, "patients", target),
+            )
+
+            hms = HospitalManagementSystem(LogStorage(os.path.join(directory, "data")))
+            print(
+                f"import journaled ({size:,}): {import_file(hms, 'patients', source)}"
+            )
+            hms.close()
+
+
+# Benchmark: Concurrent Access
+def stress_concurrency(size, readers, seconds):
+    """Run readers against two pacing writers for seconds; return reads and problems."""
+    hms = ConcurrentHospitalManagementSystem()
+    hms.bulk_add("patients", make_patients(size))
+    stop = threading.Event()
+    reads = [0] * readers
+    problems = []
+
+    def writer(first):
+        patient_id = first
+        while not stop.is_set():
+            hms.add_patient(
+                Patient(patient_id, f"Patient {patient_id}", 30, "F", "Flu")
+            )
+            hms.delete_patient(patient_id)
+            patient_id += 1
+            stop.wait(0.001)
+
+    def reader(slot):
+        while not stop.is_set():
+            for patient in hms.search_patient_by_name("Patient 1", limit=5):
+                if patient is None or "patient 1" not in patient.name.lower():
+                    problems.append(patient)
+            reads[slot] += 1
+
+    threads = [
+        threading.Thread(target=writer, args=(size + i * 10**9,)) for i in (1, 2)
+    ]
+    threads += [
+        threading.Thread(target=reader, args=(slot,)) for slot in range(readers)
+    ]
+    for thread in threads:
+        thread.start()
+    stop.wait(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    if len(hms.patients) != size or set(hms.patient_names._values) != set(
+        hms.patients.ids()
+    ):
+        problems.append("registry and name index disagree")
+    return sum(reads), problems
+
+
+def bench_concurrency(sizes, seconds=2.0):
+    """Stress-test ConcurrentHospitalManagementSystem and report read scaling."""
+    for size in sizes:
+        for readers in (1, 2, 4, 8):
+            reads, problems = stress_concurrency(size, readers, seconds)
+            status = "consistent" if not problems else f"{len(problems)} PROBLEMS"
+            report(f"searches, {readers} reader threads ({size:,})", reads, seconds)
+            print(f"{'':<40} {status}")
+
+
+# Benchmark: Referential Integrity
+def bench_integrity(sizes, doctors=2_000, deletes=1_000):
+    """Measure foreign-key checked booking and cascading deletes against a full scan."""
+    rng = random.Random(11)
+    for size in sizes:
+        patients = size // 4 + 1
+        hms = HospitalManagementSystem()
+        hms.bulk_add("patients", make_patients(patients))
+        hms.bulk_add("doctors", make_doctors(doctors))
+        appointments = [
+            Appointment(i, rng.randrange(patients), i % doctors, "2024-12-01", "00:00")
+            for i in range(size)
+        ]
+        for i, appointment in enumerate(appointments):
+            appointment.starts_at += (i // doctors) * 900
+
+        def book_all():
+            for appointment in appointments:
+                hms.add_appointment(appointment)
+
+        victims = rng.sample(range(patients), min(deletes, patients))
+
+        def restrict_all():
+            for patient_id in victims:
+                try:
+                    hms.delete_patient(patient_id)
+                except IntegrityError:
+                    pass
+
+        def cascade_all():
+            for patient_id in victims:
+                hms.delete_patient(patient_id, cascade=True)
+
+        def scan_some():
+            for patient_id in victims[:scans]:
+                [a for a in hms.appointments if a.patient_id == patient_id]
+
+        scans = 3
+        report(f"FK-checked add_appointment ({size:,})", size, timed(book_all))
+        report(f"scan for orphans per delete ({size:,})", scans, timed(scan_some))
+        report(
+            f"restricted delete_patient ({size:,})", len(victims), timed(restrict_all)
+        )
+        cascaded = len(hms.appointments)
+        report(f"cascading delete_patient ({size:,})", len(victims), timed(cascade_all))
+        print(f"{'':<40} {cascaded - len(hms.appointments):,} appointments canceled")
+        report(
+            f"cascading delete_doctor ({size:,})",
+            10,
+            timed(hms.delete_doctor_many, range(10), True),
+        )
+
+
+# Benchmark: Batch Operations
+def bench_batch(sizes, doctors=200):
+    """Compare batch add/update/delete calls with one call per record, in memory and journaled."""
+    for size in sizes:
+        appointments = [
+            Appointment(i, i, i % doctors, "2024-12-01", "09:00") for i in range(size)
+        ]
+        for start, appointment in enumerate(appointments):
+            appointment.starts_at += (start // doctors) * 900
+        moves = {i: {"doctor_id": (i + 1) % doctors} for i in range(size)}
+        restocks = {i: {"quantity": i % 50} for i in range(size)}
+        for journaled in (False, True):
+            mode = "journaled" if journaled else "in memory"
+            with tempfile.TemporaryDirectory() as directory:
+                results = {}
+                for style in ("single", "batch"):
+                    storage = (
+                        LogStorage(os.path.join(directory, style))
+                        if journaled
+                        else None
+                    )
+                    hms = HospitalManagementSystem(storage)
+                    hms.bulk_add("patients", make_patients(size))
+                    hms.bulk_add("doctors", make_doctors(doctors))
+                    items = [Inventory(i, f"Item {i}", 100) for i in range(size)]
+                    if style == "single":
+                        steps = {
+                            "add_appointment": lambda: [
+                                hms.add_appointment(a) for a in appointments
+                            ],
+                            "update_inventory": lambda: [
+                                hms.update_inventory(i, fields["quantity"])
+                                for i, fields in restocks.items()
+                            ],
+                            "cancel_appointment": lambda: [
+                                hms.cancel_appointment(i) for i in range(size)
+                            ],
+                        }
+                    else:
+                        steps = {
+                            "add_appointment_many": lambda: hms.add_appointment_many(
+                                appointments
+                            ),
+                            "update_inventory_many": lambda: hms.update_inventory_many(
+                                restocks
+                            ),
+                            "cancel_appointment_many": lambda: hms.cancel_appointment_many(
+                                range(size)
+                            ),
+                        }
+                    hms.bulk_add("inventory", items)
+                    for label, step in steps.items():
+                        seconds = timed(step)
+                        results[label] = seconds
+                        report(f"{label}, {mode} ({size:,})", size, seconds)
+                    if style == "batch":
+                        hms.bulk_add("appointments", appointments)
+                        report(
+                            f"update_appointment_many, {mode} ({size:,})",
+                            size,
+                            timed(hms.update_appointment_many, moves),
+                        )
+                    hms.close()
+
+
+# Benchmark: Output Sinks
+def bench_output(sizes):
+    """Compare per-operation cost of printing each message with buffered and null sinks."""
+    for size in sizes:
+        with open(os.devnull, "w", encoding="utf-8") as devnull:
+            sinks = {
+                "print per op": StreamSink(devnull, buffer_size=1),
+                "buffered sink": StreamSink(devnull),
+                "null sink": Sink(),
+            }
+            names = [f"Patient {i}" for i in range(0, size, max(1, size // 1_000))]
+            for label, sink in sinks.items():
+                hms = HospitalManagementSystem(sink=sink)
+                patients = make_patients(size)
+
+                def add_all():
+                    for patient in patients:
+                        hms.add_patient(patient)
+                    sink.flush()
+
+                def search_all():
+                    for name in names:
+                        hms.search_patient_by_name(name, limit=5)
+                    sink.flush()
+
+                report(f"add_patient, {label} ({size:,})", size, timed(add_all))
+                report(f"search, {label} ({size:,})", len(names), timed(search_all))
+
+
+# Benchmark: Every Operation
+def bench_operations(sizes, calls=1_000, seed=0, repeat=5):
+    """Time every public operation against a generated dataset of each size.
+
+    Operations run in order on one system, so deletes remove what the
+    matching adds created and each round leaves the dataset unchanged.
+    The fastest of repeat rounds is reported, to keep runs comparable.
+    """
+    for size in sizes:
+        dataset = datagen.generate(size, seed)
+        hms = datagen.populate(HospitalManagementSystem(), dataset)
+        rng = random.Random(seed)
+        count = min(calls, size)
+        doctor_count = len(dataset["doctors"])
+        names = [patient.name for patient in rng.sample(dataset["patients"], count)]
+        patient_ids = [rng.randrange(size) for _ in range(count)]
+        doctor_ids = [rng.randrange(doctor_count) for _ in range(count)]
+        dates = [
+            appointment.date
+            for appointment in rng.sample(dataset["appointments"], count)
+        ]
+        new = range(10**9, 10**9 + count)
+        spare = range(2 * 10**9, 2 * 10**9 + count)
+        new_patients = [Patient(i, f"New Patient {i}", 30, "F", "Flu") for i in new]
+        new_doctors = [Doctor(i, f"New Doctor {i}", "GP", "555") for i in new]
+        new_appointments = [
+            Appointment(
+                i,
+                patient_ids[n],
+                n % doctor_count,
+                f"2030-01-{n // (doctor_count * len(datagen.SLOTS)) + 1:02d}",
+                datagen.SLOTS[n // doctor_count % len(datagen.SLOTS)],
+            )
+            for n, i in enumerate(new)
+        ]
+
+        def each(method, arguments):
+            return lambda: [method(*args) for args in arguments]
+
+        def page_all():
+            cursor = hms.page("patients", 100)[1]
+            while cursor is not None:
+                cursor = hms.page("patients", 100, cursor)[1]
+
+        operations = [
+            ("add_patient", count, each(hms.add_patient, [(p,) for p in new_patients])),
+            (
+                "search_patient_by_name",
+                count,
+                each(hms.search_patient_by_name, [(n,) for n in names]),
+            ),
+            (
+                "update_patient_many",
+                count,
+                lambda: hms.update_patient_many({i: {"age": 31} for i in new}),
+            ),
+            ("delete_patient", count, each(hms.delete_patient, [(i,) for i in new])),
+            (
+                "add_patient_many",
+                count,
+                lambda: hms.add_patient_many(
+                    Patient(i, "Spare", 30, "M", "Flu") for i in spare
+                ),
+            ),
+            ("delete_patient_many", count, lambda: hms.delete_patient_many(spare)),
+            (
+                "add_staff",
+                count,
+                each(
+                    hms.add_staff,
+                    [(Staff(i, "New Staff", "Nurse", "Night"),) for i in new],
+                ),
+            ),
+            (
+                "list_staff_by_role",
+                10,
+                each(
+                    hms.list_staff_by_role,
+                    [(role,) for role, _ in datagen.ROLES[:5]] * 2,
+                ),
+            ),
+            ("delete_staff", count, each(hms.delete_staff, [(i,) for i in new])),
+            ("add_doctor", count, each(hms.add_doctor, [(d,) for d in new_doctors])),
+            (
+                "edit_doctor",
+                count,
+                each(hms.edit_doctor, [(i, "Renamed") for i in new]),
+            ),
+            (
+                "list_doctors_by_designation",
+                10,
+                each(
+                    hms.list_doctors_by_designation,
+                    [(d,) for d, _ in datagen.DESIGNATIONS[:5]] * 2,
+                ),
+            ),
+            ("delete_doctor", count, each(hms.delete_doctor, [(i,) for i in new])),
+            (
+                "add_inventory",
+                count,
+                each(
+                    hms.add_inventory,
+                    [(Inventory(i, "New Item", 500, 10),) for i in new],
+                ),
+            ),
+            (
+                "update_inventory",
+                count,
+                each(hms.update_inventory, [(i, 400) for i in new]),
+            ),
+            (
+                "list_low_stock_items",
+                10,
+                each(
+                    hms.list_low_stock_items,
+                    [(threshold,) for threshold in range(5, 55, 5)],
+                ),
+            ),
+            (
+                "delete_inventory",
+                count,
+                each(hms.delete_inventory, [(i,) for i in new]),
+            ),
+            (
+                "add_appointment",
+                count,
+                each(hms.add_appointment, [(a,) for a in new_appointments]),
+            ),
+            (
+                "doctor_schedule",
+                count,
+                each(hms.doctor_schedule, list(zip(doctor_ids, dates))),
+            ),
+            (
+                "patient_appointments",
+                count,
+                each(hms.patient_appointments, [(i,) for i in patient_ids]),
+            ),
+            (
+                "appointments_between",
+                count,
+                each(
+                    hms.appointments_between,
+                    [(date, date, "09:00", "10:00") for date in dates],
+                ),
+            ),
+            (
+                "daily_schedule",
+                10,
+                each(hms.daily_schedule, [(date,) for date in dates[:10]]),
+            ),
+            (
+                "next_free_slot",
+                count,
+                each(hms.next_free_slot, list(zip(doctor_ids, dates))),
+            ),
+            (
+                "cancel_appointment",
+                count,
+                each(hms.cancel_appointment, [(i,) for i in new]),
+            ),
+            ("page through patients", size, page_all),
+        ]
+        best = {}
+        for _ in range(repeat):
+            for name, _, operation in operations:
+                seconds = timed(operation)
+                best[name] = min(best.get(name, seconds), seconds)
+        for name, operation_count, _ in operations:
+            report(f"{name} ({size:,})", operation_count, best[name])
+
+
+# Benchmark: Query Engine
+def bench_query(sizes, runs=20):
+    """Compare planned queries with the hand-written scans they replace."""
+    for size in sizes:
+        hms = datagen.populate(HospitalManagementSystem(), datagen.generate(size))
+        cases = [
+            (
+                "age > 65 and diagnosis (filtered scan)",
+                hms.query("patients").where(Field("age") > 65, diagnosis="Diabetes"),
+                lambda: [
+                    patient
+                    for patient in [p for p in hms.patients if p.age > 65]
+                    if patient.diagnosis.lower() == "diabetes"
+                ],
+            ),
+            (
+                "doctor_id == 3 (FieldIndex)",
+                hms.query("appointments").where(doctor_id=3),
+                lambda: [a for a in hms.appointments if a.doctor_id == 3],
+            ),
+            (
+                "quantity < 10 (StockIndex)",
+                hms.query("inventory").where(Field("quantity") < 10),
+                lambda: [item for item in hms.inventory if item.quantity < 10],
+            ),
+        ]
+        for label, query, scan in cases:
+            print(query.explain())
+            report(
+                f"query {label} ({size:,})",
+                runs,
+                timed(lambda: [query.run() for _ in range(runs)]),
+            )
+            report(
+                f"scan {label} ({size:,})",
+                runs,
+                timed(lambda: [scan() for _ in range(runs)]),
+            )
+
+
+# Benchmark: Analytics
+def bench_analytics(sizes, runs=5):
+    """Compare dashboard aggregates over columns (NumPy and pure Python) with record loops."""
+    for size in sizes:
+        hms = HospitalManagementSystem()
+        backends = {"python columns": analytics.Analytics(hms, use_numpy=False)}
+        if analytics.numpy is not None:
+            backends["numpy"] = analytics.Analytics(hms, use_numpy=True)
+        report(
+            f"populate with column indexes ({size:,})",
+            size,
+            timed(datagen.populate, hms, datagen.generate(size)),
+        )
+        for item_id in range(0, len(hms.inventory), 2):
+            hms.update_inventory(item_id, hms.inventory.get(item_id).quantity // 2)
+
+        def record_loops():
+            ages = {}
+            for patient in hms.patients:
+                bins = ages.setdefault(patient.gender, {})
+                bins[patient.age // 10] = bins.get(patient.age // 10, 0) + 1
+            load = {}
+            for appointment in hms.appointments:
+                key = (appointment.doctor_id, appointment.date)
+                load[key] = load.get(key, 0) + 1
+            diagnoses = {}
+            for patient in hms.patients:
+                diagnoses[patient.diagnosis] = diagnoses.get(patient.diagnosis, 0) + 1
+            sum(item.quantity for item in hms.inventory)
+
+        def dashboard(backend):
+            backend.age_distribution()
+            backend.doctor_load()
+            backend.top_diagnoses()
+            backend.inventory_turnover()
+
+        report(
+            f"dashboard, record loops ({size:,})",
+            runs,
+            timed(lambda: [record_loops() for _ in range(runs)]),
+        )
+        for label, backend in backends.items():
+            report(
+                f"dashboard, {label} ({size:,})",
+                runs,
+                timed(lambda: [dashboard(backend) for _ in range(runs)]),
+            )
+            for name in ("age_distribution", "doctor_load", "top_diagnoses"):
+                method = getattr(backend, name)
+                report(
+                    f"  {name}, {label} ({size:,})",
+                    runs,
+                    timed(lambda: [method() for _ in range(runs)]),
+                )
+
+
+# Benchmark: Metrics
+def bench_metrics(sizes):
+    """Measure the per-call overhead of metrics, disabled and enabled."""
+    for size in sizes:
+        names = [f"Patient {i}" for i in range(0, size, max(1, size // 1_000))]
+        for label in ("no metrics", "metrics disabled", "metrics enabled"):
+            hms = HospitalManagementSystem()
+            metrics = Metrics(hms)
+            if label != "no metrics":
+                metrics.enable()
+            if label == "metrics disabled":
+                metrics.disable()
+            patients = make_patients(size)
+
+            def add_all():
+                for patient in patients:
+                    hms.add_patient(patient)
+
+            def search_all():
+                for name in names:
+                    hms.search_patient_by_name(name, limit=5)
+
+            report(f"add_patient, {label} ({size:,})", size, timed(add_all))
+            report(f"search, {label} ({size:,})", len(names), timed(search_all))
+        print(metrics.report())
+
+
+# Benchmark: Events
+def bench_events(sizes, fanouts=(0, 1, 10, 100)):
+    """Measure writer throughput with an event stream and growing subscriber counts.
+
+    Delivery is timed from the first write until every handler has seen the
+    last event; lost counts events overwritten before a slow subscriber read them.
+    """
+    for size in sizes:
+        patients = make_patients(size)
+        hms = HospitalManagementSystem()
+        report(
+            f"add_patient, no stream ({size:,})",
+            size,
+            timed(lambda: [hms.add_patient(patient) for patient in patients]),
+        )
+        for fanout in fanouts:
+            stream = EventStream()
+            hms = HospitalManagementSystem(events=stream)
+            received = [0] * fanout
+
+            def handler(slot, event):
+                received[slot] += 1
+
+            subscriptions = [
+                stream.subscribe(functools.partial(handler, slot))
+                for slot in range(fanout)
+            ]
+            start = time.perf_counter()
+            for patient in patients:
+                hms.add_patient(patient)
+            written = time.perf_counter() - start
+            while any(s.position < stream.seq for s in subscriptions):
+                time.sleep(0.001)
+            delivered = time.perf_counter() - start
+            label = f"{fanout} subscribers ({size:,})"
+            report(f"add_patient, {label}", size, written)
+            if fanout:
+                report(f"delivery, {label}", size * fanout, delivered)
+                lost = sum(s.lost for s in subscriptions)
+                print(f"  received: {sum(received):,}, lost: {lost:,}")
+            for subscription in subscriptions:
+                subscription.close()
+
+
+# Benchmark: Summary
+def bench_summary(sizes, runs=100):
+    """Compare summary() over materialized views with recounting every record."""
+    for size in sizes:
+        hms = datagen.populate(HospitalManagementSystem(), datagen.generate(size))
+
+        def recount():
+            for registry, field in (
+                (hms.patients, "diagnosis"),
+                (hms.staff, "shift"),
+                (hms.doctors, "designation"),
+            ):
+                counts = {}
+                for record in registry:
+                    value = getattr(record, field)
+                    counts[value] = counts.get(value, 0) + 1
+            sum(item.quantity for item in hms.inventory)
+
+        report(
+            f"summary, full recount ({size:,})",
+            runs,
+            timed(lambda: [recount() for _ in range(runs)]),
+        )
+        report(
+            f"summary, materialized views ({size:,})",
+            runs,
+            timed(lambda: [hms.summary() for _ in range(runs)]),
+        )
+
+
+# Benchmark: Sharding
+def bench_sharding(sizes, chunk=10_000, searches=200, gets=1_000):
+    """Compare batch adds, fan-out searches and routed lookups across worker counts.
+
+    Worker count 0 is the single-process system, for reference.
+    """
+    for size in sizes:
+        patients = make_patients(size)
+        names = [f"Patient {i}" for i in range(0, size, max(1, size // searches))]
+        ids = random.Random(0).sample(range(size), min(gets, size))
+        for workers in (0, 1, 2, 4, 8):
+            if workers:
+                hms = ShardedHospitalManagementSystem(workers)
+                get = hms.get
+            else:
+                hms = HospitalManagementSystem()
+                get = lambda collection, record_id: hms.patients.get(record_id)
+            label = f"{workers} workers" if workers else "in process"
+
+            def add_all():
+                for start in range(0, size, chunk):
+                    hms.add_patient_many(patients[start : start + chunk])
+
+            def search_all():
+                for name in names:
+                    hms.search_patient_by_name(name, limit=5)
+
+            def get_all():
+                for record_id in ids:
+                    get("patients", record_id)
+
+            report(f"add_patient_many, {label} ({size:,})", size, timed(add_all))
+            report(f"search, {label} ({size:,})", len(names), timed(search_all))
+            report(f"get, {label} ({size:,})", len(ids), timed(get_all))
+            hms.close()
+
+
+BENCHMARKS = {
+    "analytics": bench_analytics,
+    "batch": bench_batch,
+    "concurrency": bench_concurrency,
+    "events": bench_events,
+    "bulk": bench_bulk,
+    "integrity": bench_integrity,
+    "memory": bench_memory,
+    "metrics": bench_metrics,
+    "operations": bench_operations,
+    "output": bench_output,
+    "persistence": bench_persistence,
+    "query": bench_query,
+    "registry": bench_registry,
+    "schedule": bench_schedule,
+    "search": bench_search,
+    "sharding": bench_sharding,
+    "snapshot": bench_snapshot,
+    "summary": bench_summary,
+}
+
+
+# Utility: Result Files
+def write_results(path, benchmark, sizes):
+    """Write every reported result, with the run's settings, as JSON."""
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(
+            {
+                "benchmark": benchmark,
+                "sizes": sizes,
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "results": RESULTS,
+            },
+            file,
+            indent=2,
+        )
+
+
+def compare(path, tolerance):
+    """Print each result's change against the run saved at path; return the regressions.
+
+    A result regresses when its rate falls more than tolerance below the
+    baseline's; labels missing from either run are skipped.
+    """
+    with open(path, encoding="utf-8") as file:
+        baseline = {
+            result["label"]: result["ops_per_second"]
+            for result in json.load(file)["results"]
+        }
+    regressions = []
+    for result in RESULTS:
+        before = baseline.get(result["label"])
+        if not before:
+            continue
+        change = result["ops_per_second"] / before - 1
+        regressed = change < -tolerance
+        if regressed:
+            regressions.append(result["label"])
+        print(
+            f"{result['label']:<40} {change:+8.1%}"
+            + ("  REGRESSION" if regressed else "")
+        )
+    print(f"{len(regressions)} regressions beyond {tolerance:.0%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Hospital Management System benchmarks"
+    )
+    parser.add_argument("benchmark", choices=sorted(BENCHMARKS))
+    parser.add_argument(
+        "--sizes",
+        type=lambda text: [int(size) for size in text.split(",")],
+        default=[10_000, 100_000, 1_000_000],
+        help="comma-separated record counts (default: 10000,100000,1000000)",
+    )
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    parser.add_argument(
+        "--compare", help="JSON results of an earlier run to compare against"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="slowdown counted as a regression by --compare (default: 0.1)",
+    )
+    args = parser.parse_args()
+    BENCHMARKS[args.benchmark](args.sizes)
+    if args.json:
+        write_results(args.json, args.benchmark, args.sizes)
+    if args.compare and compare(args.compare, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+import argparse
+import csv
+import itertools
+import json
+import os
+import time
+
+import snapshot
+from main import HospitalManagementSystem
+from storage import LogStorage
+
+
+def integer(value):
+    """Convert a CSV or JSON field to an int; raise ValueError if it is not a whole number."""
+    if isinstance(value, (bool, float)):
+        raise ValueError(f"invalid integer: {value!r}")
+    return int(value)
+
+
+def optional_int(value):
+    """Convert a possibly blank field to an int, or None when blank."""
+    return integer(value) if value not in ("", None) else None
+
+
+def text(value):
+    """Return a text field unchanged; raise TypeError if it is not a string."""
+    if not isinstance(value, str):
+        raise TypeError(f"expected text, got {value!r}")
+    return value
+
+
+# Field converters per collection; fields not listed must be strings.
+CONVERTERS = {
+    "patients": {"patient_id": integer, "age": integer},
+    "staff": {"staff_id": integer},
+    "doctors": {"doctor_id": integer},
+    "inventory": {
+        "item_id": integer,
+        "quantity": integer,
+        "reorder_level": optional_int,
+    },
+    "appointments": {
+        "appointment_id": integer,
+        "patient_id": integer,
+        "doctor_id": integer,
+    },
+}
+
+
+class ImportReport:
+    """Counts and timing for one bulk import."""
+
+    def __init__(self):
+        """Initialize an empty report."""
+        self.rows = 0
+        self.added = 0
+        self.errors = []
+        self.seconds = 0.0
+
+    @property
+    def rows_per_second(self):
+        """Rows processed per second of wall-clock time."""
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.rows:,} rows, {self.added:,} added, {len(self.errors):,} rejected "
+            f"in {self.seconds:.2f}s ({self.rows_per_second:,.0f} rows/s)"
+        )
+
+
+# Utility: Streaming Readers and Writers
+def _format(path):
+    """Return 'csv' or 'jsonl' based on the file extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".jsonl", ".ndjson"):
+        return "jsonl"
+    raise ValueError(f"Unsupported file type '{extension}'; use .csv or .jsonl")
+
+
+def read_rows(path):
+    """Yield one dict per CSV row or JSONL line, without loading the whole file.
+
+    A JSONL line that is not valid JSON yields a ValueError in its place,
+    which parse_records reports as a bad row.
+    """
+    with open(path, newline="", encoding="utf-8") as file:
+        if _format(path) == "csv":
+            yield from csv.DictReader(file)
+        else:
+            for line in file:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError as error:
+                        yield ValueError(f"invalid JSON: {error.msg}")
+
+
+def parse_records(collection, rows, errors):
+    """Yield records built from rows; append (row number, message) to errors for bad rows.
+
+    Every field is checked: integer fields must hold whole numbers and the
+    rest must be text, so a bad row never reaches the registries.
+    """
+    record_type = HospitalManagementSystem.RECORD_TYPES[collection]
+    converters = CONVERTERS[collection]
+    fields = record_type.FIELDS
+    for number, row in enumerate(rows, start=1):
+        try:
+            if isinstance(row, ValueError):
+                raise row
+            if not isinstance(row, dict):
+                raise TypeError(f"expected an object, got {row!r}")
+            values = {}
+            for field in fields:
+                if field in row:
+                    try:
+                        values[field] = converters.get(field, text)(row[field])
+                    except (TypeError, ValueError) as error:
+                        raise type(error)(f"{field}: {error}") from None
+            yield record_type(**values)
+        except (TypeError, ValueError) as error:
+            errors.append((number, str(error)))
+
+
+def chunked(iterable, size):
+    """Yield lists of up to size items from iterable."""
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+# Import / Export
+def import_chunks(hms, collection, path, report, chunk_size=10_000):
+    """Import a file one chunk at a time, yielding report after each chunk is added.
+
+    Callers can pause or stop between chunks; every chunk is added whole.
+    """
+    start = time.perf_counter()
+    for chunk in chunked(
+        parse_records(collection, read_rows(path), report.errors), chunk_size
+    ):
+        rejected = hms.bulk_add(collection, chunk)
+        report.added += len(chunk) - len(rejected)
+        report.errors.extend((vars(record), reason) for record, reason in rejected)
+        report.rows = report.added + len(report.errors)
+        report.seconds = time.perf_counter() - start
+        yield report
+    report.rows = report.added + len(report.errors)
+    report.seconds = time.perf_counter() - start
+
+
+def import_file(hms, collection, path, chunk_size=10_000):
+    """Stream records from a CSV or JSONL file into hms; return an ImportReport."""
+    report = ImportReport()
+    for _ in import_chunks(hms, collection, path, report, chunk_size):
+        pass
+    return report
+
+
+def export_file(hms, collection, path):
+    """Stream every record of a collection to a CSV or JSONL file; return the row count."""
+    records = getattr(hms, collection)
+    fields = HospitalManagementSystem.RECORD_TYPES[collection].FIELDS
+    count = 0
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        if _format(path) == "csv":
+            writer = csv.writer(file)
+            writer.writerow(fields)
+            for record in records:
+                writer.writerow([getattr(record, field) for field in fields])
+                count += 1
+        else:
+            for record in records:
+                file.write(json.dumps(vars(record)) + "\n")
+                count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import/export hospital records")
+    parser.add_argument("action", choices=["import", "export"])
+    parser.add_argument("collection", choices=sorted(CONVERTERS))
+    parser.add_argument("path", help="a .csv or .jsonl file")
+    parser.add_argument("--data", default="hospital_data", help="storage directory")
+    args = parser.parse_args()
+
+    hms = HospitalManagementSystem(LogStorage(args.data))
+    snapshot.recover(hms)
+    if args.action == "import":
+        report = import_file(hms, args.collection, args.path)
+        print(report)
+        for where, reason in report.errors[:10]:
+            print(f"  rejected {where}: {reason}")
+    else:
+        start = time.perf_counter()
+        count = export_file(hms, args.collection, args.path)
+        seconds = time.perf_counter() - start
+        print(f"{count:,} rows exported in {seconds:.2f}s")
+    hms.close()
+
+
+if __name__ == "__main__":
+    main()
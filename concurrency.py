@@ -0,0 +1,224 @@
+import functools
+import threading
+from contextlib import ExitStack, contextmanager
+
+from main import HospitalManagementSystem
+from query import Query
+
+
+class RWLock:
+    """Reader/writer lock: many concurrent readers or one writer.
+
+    Waiting writers block new readers, so a steady stream of searches
+    cannot starve an add or delete.
+    """
+
+    def __init__(self):
+        """Initialize an unlocked lock."""
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self):
+        """Hold the lock shared for the duration of the with-block."""
+        with self._condition:
+            while self._writer or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        """Hold the lock exclusively for the duration of the with-block."""
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = False
+                self._condition.notify_all()
+
+
+# Which collections each public method touches, and how: a {collection:
+# mode} dict, or just a mode for the collection named by the method's
+# collection argument (positional or keyword), in which case the collections
+# it is linked to by foreign keys are locked shared, since they are only
+# looked up, or a function of that collection returning the dict. Locked
+# methods may call one another: only the outermost call takes locks, so its
+# entry must cover everything the calls beneath it touch.
+READ, WRITE = "read", "write"
+ALL = tuple(HospitalManagementSystem.RECORD_TYPES)
+LINKED = {collection: {collection} for collection in ALL}
+for _source, _references in HospitalManagementSystem.REFERENCES.items():
+    for _target in _references.values():
+        LINKED[_source].add(_target)
+        LINKED[_target].add(_source)
+# The collections a delete from each collection can cascade into.
+DEPENDENTS = {collection: {collection} for collection in ALL}
+for _source, _references in HospitalManagementSystem.REFERENCES.items():
+    for _target in _references.values():
+        DEPENDENTS[_target].add(_source)
+READ_ALL = dict.fromkeys(ALL, READ)
+BOOKING = {"patients": READ, "doctors": READ, "appointments": WRITE}
+LOCKING = {
+    "add_patient": {"patients": WRITE},
+    "add_patient_many": {"patients": WRITE},
+    "update_patient_many": {"patients": WRITE},
+    "search_patient_by_name": {"patients": READ},
+    "delete_patient": {"patients": WRITE, "appointments": WRITE},
+    "delete_patient_many": {"patients": WRITE, "appointments": WRITE},
+    "add_staff": {"staff": WRITE},
+    "add_staff_many": {"staff": WRITE},
+    "update_staff_many": {"staff": WRITE},
+    "list_staff_by_role": {"staff": READ},
+    "delete_staff": {"staff": WRITE},
+    "delete_staff_many": {"staff": WRITE},
+    "add_doctor": {"doctors": WRITE},
+    "add_doctor_many": {"doctors": WRITE},
+    "update_doctor_many": {"doctors": WRITE},
+    "delete_doctor": {"doctors": WRITE, "appointments": WRITE},
+    "delete_doctor_many": {"doctors": WRITE, "appointments": WRITE},
+    "edit_doctor": {"doctors": WRITE},
+    "list_doctors_by_designation": {"doctors": READ},
+    "add_inventory": {"inventory": WRITE},
+    "add_inventory_many": {"inventory": WRITE},
+    "update_inventory_many": {"inventory": WRITE},
+    "update_inventory": {"inventory": WRITE},
+    "delete_inventory": {"inventory": WRITE},
+    "delete_inventory_many": {"inventory": WRITE},
+    "list_low_stock_items": {"inventory": READ},
+    "add_appointment": BOOKING,
+    "add_appointment_many": BOOKING,
+    "update_appointment_many": BOOKING,
+    "list_appointments": {"appointments": READ},
+    "doctor_schedule": {"appointments": READ},
+    "patient_appointments": {"appointments": READ},
+    "appointments_between": {"appointments": READ},
+    "daily_schedule": {"appointments": READ},
+    "next_free_slot": {"appointments": READ},
+    "cancel_appointment": {"appointments": WRITE},
+    "cancel_appointment_many": {"appointments": WRITE},
+    "bulk_add": WRITE,
+    "add_many": WRITE,
+    "update_many": WRITE,
+    "delete_many": lambda collection: dict.fromkeys(DEPENDENTS[collection], WRITE),
+    "validate_new": READ,
+    "page": READ,
+    "show_page": READ,
+    "summary": READ_ALL,
+    "show_summary": READ_ALL,
+    "show_all": READ_ALL,
+    "recover": dict.fromkeys(ALL, WRITE),
+    "checkpoint": READ_ALL,
+}
+
+
+def _locked(method, modes):
+    """Wrap method so it runs holding the collection locks modes describes."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        held = self._held
+        if getattr(held, "locked", False):
+            return method(self, *args, **kwargs)
+        if isinstance(modes, dict):
+            targets = modes
+        elif callable(modes):
+            targets = modes(args[0] if args else kwargs["collection"])
+        else:
+            collection = args[0] if args else kwargs["collection"]
+            targets = dict.fromkeys(LINKED[collection], READ)
+            targets[collection] = modes
+        with self.holding(targets):
+            held.locked = True
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                held.locked = False
+
+    return wrapper
+
+
+class ConcurrentHospitalManagementSystem(HospitalManagementSystem):
+    """HospitalManagementSystem that is safe to share between threads.
+
+    Each collection has its own RWLock: searches and listings take it
+    shared and never block one another, while adds, edits and deletes take
+    it exclusively, so writers only serialize with work on the same
+    collection. Multi-collection operations lock in a fixed order, and
+    collections they only look up, such as the patient and doctor a booking
+    names, are locked shared. Queries and iter_records() hold their
+    collection shared while they run.
+    """
+
+    def __init__(self, storage=None, sink=None, events=None):
+        """Initialize the system with one RWLock per collection."""
+        super().__init__(storage, sink, events)
+        self.locks = {collection: RWLock() for collection in ALL}
+        self._journal_lock = threading.Lock()
+        self._held = threading.local()
+
+    @contextmanager
+    def holding(self, modes):
+        """Hold each collection's lock in the mode {collection: mode} gives, in canonical order."""
+        with ExitStack() as stack:
+            for collection in ALL:
+                if collection in modes:
+                    lock = self.locks[collection]
+                    stack.enter_context(getattr(lock, modes[collection])())
+            yield
+
+    def locking(self, mode, *collections):
+        """Hold the named collections' locks (in canonical order) in mode."""
+        return self.holding(dict.fromkeys(collections, mode))
+
+    def reading(self, *collections):
+        """Hold collections shared, e.g. while iterating a registry directly."""
+        return self.locking(READ, *collections)
+
+    def iter_records(self, collection, after=None, fields=None):
+        """Like HospitalManagementSystem.iter_records, holding collection shared.
+
+        The lock is taken at the first row and released when the iterator is
+        exhausted or closed, so consume or close it before writing from the
+        same thread.
+        """
+        if getattr(self._held, "locked", False):
+            yield from super().iter_records(collection, after, fields)
+            return
+        with self.reading(collection):
+            yield from super().iter_records(collection, after, fields)
+
+    def query(self, collection):
+        """Return a Query over collection that runs holding it shared."""
+        return Query(
+            getattr(self, collection),
+            collection,
+            functools.partial(self.reading, collection),
+        )
+
+    def _journal(self, collection, op, **payload):
+        """Serialize journal appends, which all collections share."""
+        with self._journal_lock:
+            super()._journal(collection, op, **payload)
+
+
+for _name, _modes in LOCKING.items():
+    setattr(
+        ConcurrentHospitalManagementSystem,
+        _name,
+        _locked(getattr(HospitalManagementSystem, _name), _modes),
+    )
@@ -0,0 +1,406 @@
+import argparse
+import asyncio
+import contextlib
+import itertools
+import sys
+import threading
+import time
+
+import bulk
+import server
+import snapshot
+from errors import HospitalError
+from main import MENU_ACTIONS, HospitalManagementSystem, announce_low_stock
+from output import StreamSink
+from storage import LogStorage
+
+
+class Job:
+    """One background operation, with the progress counters it updates as it runs."""
+
+    def __init__(self, job_id, name, total=None, unit="records"):
+        """Initialize a job; total is how many units it expects to process, if known."""
+        self.job_id = job_id
+        self.name = name
+        self.total = total
+        self.unit = unit
+        self.done = 0
+        self.result = None
+        self.error = None
+        self.cancelled = False
+        self.task = None
+        self.started = time.perf_counter()
+        self.finished = None
+
+    @property
+    def status(self):
+        """Return 'running', 'done', 'cancelled' or 'failed'."""
+        if self.finished is None:
+            return "running"
+        if self.cancelled:
+            return "cancelled"
+        return "failed" if self.error is not None else "done"
+
+    def __str__(self):
+        progress = f"{self.done:,}"
+        if self.total:
+            progress += f"/{self.total:,} {self.unit} ({self.done / self.total:.0%})"
+        else:
+            progress += f" {self.unit}"
+        elapsed = (self.finished or time.perf_counter()) - self.started
+        return f"[{self.job_id}] {self.name}: {progress}, {elapsed:.1f}s, {self.status}"
+
+
+def _settle(future, line, error):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(line)
+
+
+class Console:
+    """Non-blocking menu front end that runs heavy operations as background jobs.
+
+    The menu offers main()'s record operations (MENU_ACTIONS) alongside the
+    jobs. The menu, the jobs and the optional network listener all run on one
+    event loop, so they share hms without locks; only reading the user's
+    input happens on another thread. Jobs work in chunks of chunk_size and
+    yield to the loop between chunks, so the menu and listener keep
+    responding, and a cancelled job stops at the next chunk boundary.
+    writable is cleared while a snapshot is saved: imports, menu and network
+    writes wait for it, so the snapshot sees a single consistent state.
+    """
+
+    def __init__(self, hms, sink, chunk_size=1_000):
+        """Initialize the console around a shared system and its output sink."""
+        self.hms = hms
+        self.sink = sink
+        self.chunk_size = chunk_size
+        self.jobs = {}
+        self.writable = asyncio.Event()
+        self.writable.set()
+        self._job_ids = itertools.count(1)
+        self._pauses = 0
+
+    # Background Jobs
+    def start(self, name, work, *args, total=None, unit="records"):
+        """Run work(job, *args) as a background job; return the Job."""
+        job = Job(next(self._job_ids), name, total, unit)
+        self.jobs[job.job_id] = job
+        job.task = asyncio.create_task(self._run(job, work(job, *args)))
+        return job
+
+    async def _run(self, job, work):
+        """Await a job's coroutine and report how it ended."""
+        try:
+            job.result = await work
+        except asyncio.CancelledError:
+            job.cancelled = True
+        except (HospitalError, OSError, ValueError, TypeError, KeyError) as error:
+            job.error = error
+        finally:
+            job.finished = time.perf_counter()
+        message = f"\n{job}"
+        if job.error is not None:
+            message += f": {job.error}"
+        elif job.result is not None:
+            message += f": {job.result}"
+        self.sink.write(message)
+        self.sink.flush()
+
+    def cancel(self, job_id):
+        """Cancel a running job; return False if there is no such running job."""
+        job = self.jobs.get(job_id)
+        if job is None or job.finished is not None:
+            return False
+        job.task.cancel()
+        return True
+
+    async def stop(self):
+        """Cancel every running job and wait for them to wind down."""
+        tasks = [job.task for job in self.jobs.values() if job.finished is None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    @contextlib.asynccontextmanager
+    async def paused_writes(self):
+        """Hold back imports and network writes for the duration of the block."""
+        self._pauses += 1
+        self.writable.clear()
+        try:
+            yield
+        finally:
+            self._pauses -= 1
+            if not self._pauses:
+                self.writable.set()
+
+    async def import_file(self, job, collection, path):
+        """Job: bulk-import a CSV or JSONL file one chunk at a time."""
+        report = bulk.ImportReport()
+        chunks = bulk.import_chunks(self.hms, collection, path, report, self.chunk_size)
+        with contextlib.closing(chunks):
+            while True:
+                await self.writable.wait()
+                if next(chunks, None) is None:
+                    break
+                job.done = report.rows
+                await asyncio.sleep(0)
+        job.done = report.rows
+        return report
+
+    async def show_all(self, job):
+        """Job: display every collection in full, a page at a time."""
+        for collection in self.hms.RECORD_TYPES:
+            self.hms.display_header(collection.title())
+            cursor = None
+            while True:
+                rows, cursor = self.hms.page(collection, self.chunk_size, cursor)
+                for row in rows:
+                    self.sink.write(row)
+                self.sink.flush()
+                job.done += len(rows)
+                await asyncio.sleep(0)
+                if cursor is None:
+                    break
+        return f"{job.done:,} records shown"
+
+    async def scan_low_stock(self, job, threshold=None):
+        """Job: list items below their reorder level, or below threshold if given.
+
+        A threshold is answered from the stock index, fetching the items a
+        chunk at a time; reorder levels differ per item, so they need a scan.
+        Writes can run between chunks, so items deleted or restocked after
+        the index was read are skipped.
+        """
+        if threshold is not None:
+            item_ids = self.hms.stock.below(threshold)
+            job.total = len(item_ids)
+            found = []
+            for start in range(0, len(item_ids), self.chunk_size):
+                chunk = item_ids[start : start + self.chunk_size]
+                found.extend(
+                    item
+                    for item in map(self.hms.inventory.get, chunk)
+                    if item is not None and item.quantity < threshold
+                )
+                job.done += len(chunk)
+                await asyncio.sleep(0)
+            return self._show_low_stock(found)
+        found = []
+        cursor = None
+        while True:
+            chunk = list(
+                itertools.islice(self.hms.inventory.scan(cursor), self.chunk_size)
+            )
+            if not chunk:
+                break
+            cursor = chunk[-1][0]
+            found.extend(item for _, item in chunk if item.needs_reorder())
+            job.done += len(chunk)
+            await asyncio.sleep(0)
+        return self._show_low_stock(found)
+
+    def _show_low_stock(self, found):
+        """Display the items a low-stock scan found; return the job's result."""
+        self.hms.display_header("Low Stock Items")
+        if found:
+            self.sink.write_records(found)
+        else:
+            self.sink.write("No items found with low stock.")
+        return f"{len(found):,} low-stock items"
+
+    async def save_snapshot(self, job, path):
+        """Job: write a binary snapshot while writes are held back."""
+        async with self.paused_writes():
+            steps = snapshot.save_steps(self.hms, path, step=1 << 16)
+            with contextlib.closing(steps):
+                for count in steps:
+                    job.done = count
+                    await asyncio.sleep(0)
+        return f"saved to {path}"
+
+    # Menu
+    async def perform(self, steps, writes):
+        """Run a started menu action, answering its prompts without blocking the loop.
+
+        A writing action resumes only while writes are allowed, so it never
+        changes hms in the middle of a snapshot.
+        """
+        answer = None
+        with contextlib.closing(steps):
+            while True:
+                if writes:
+                    await self.writable.wait()
+                try:
+                    prompt = steps.send(answer)
+                except StopIteration:
+                    return
+                answer = await self.ask(prompt)
+
+    async def ask(self, prompt):
+        """Flush output, then read one line on a daemon thread without blocking the loop."""
+        self.sink.flush()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def read():
+            try:
+                line = input(prompt)
+            except (EOFError, KeyboardInterrupt) as error:
+                loop.call_soon_threadsafe(_settle, future, None, error)
+            else:
+                loop.call_soon_threadsafe(_settle, future, line, None)
+
+        threading.Thread(target=read, name="console-input", daemon=True).start()
+        return await future
+
+    async def run(self):
+        """Log in, then serve the menu until the user exits."""
+        hms, say = self.hms, self.sink.write
+        hms.display_header("Welcome to the Hospital Management System")
+        for _ in range(3):
+            username = await self.ask("Enter username: ")
+            password = await self.ask("Enter password: ")
+            if username == "jadu" and password == hms.admin_password:
+                say("\n✅ Login successful!")
+                break
+        else:
+            say("\n❌ Too many failed attempts. Exiting.")
+            return
+
+        announce_low_stock(hms)
+        first = len(MENU_ACTIONS)
+        while True:
+            hms.display_header("Main Menu")
+            for number, (label, _, _) in enumerate(MENU_ACTIONS, 1):
+                say(f"{number}. {label}")
+            say(f"{first + 1}. Import File (background)")
+            say(f"{first + 2}. Show All Information (background)")
+            say(f"{first + 3}. Scan Low Stock (background)")
+            say(f"{first + 4}. Save Snapshot (background)")
+            say(f"{first + 5}. Show Summary")
+            say(f"{first + 6}. List Jobs")
+            say(f"{first + 7}. Cancel Job")
+            say(f"{first + 8}. Exit")
+
+            try:
+                choice = int(await self.ask("Enter your choice: "))
+                if 1 <= choice <= first:
+                    _, action, writes = MENU_ACTIONS[choice - 1]
+                    await self.perform(action(hms), writes)
+
+                elif choice == first + 1:
+                    collection = await self.ask(
+                        f"Collection ({', '.join(hms.RECORD_TYPES)}): "
+                    )
+                    if collection not in hms.RECORD_TYPES:
+                        say("\n❌ Unknown collection!")
+                        continue
+                    path = await self.ask("File path (.csv or .jsonl): ")
+                    job = self.start(
+                        f"import {collection}", self.import_file, collection, path
+                    )
+                    say(f"\n▶ Started job {job.job_id}.")
+
+                elif choice == first + 2:
+                    total = sum(len(getattr(hms, name)) for name in hms.RECORD_TYPES)
+                    job = self.start("show all", self.show_all, total=total)
+                    say(f"\n▶ Started job {job.job_id}.")
+
+                elif choice == first + 3:
+                    threshold = await self.ask(
+                        "Stock threshold (leave blank for reorder levels): "
+                    )
+                    job = self.start(
+                        "low-stock scan",
+                        self.scan_low_stock,
+                        int(threshold) if threshold else None,
+                        total=len(hms.inventory),
+                        unit="items",
+                    )
+                    say(f"\n▶ Started job {job.job_id}.")
+
+                elif choice == first + 4:
+                    path = await self.ask("Snapshot path: ")
+                    total = sum(len(getattr(hms, name)) for name in hms.RECORD_TYPES)
+                    job = self.start("snapshot", self.save_snapshot, path, total=total)
+                    say(f"\n▶ Started job {job.job_id}.")
+
+                elif choice == first + 5:
+                    hms.show_summary()
+
+                elif choice == first + 6:
+                    hms.display_header("Jobs")
+                    for job in self.jobs.values():
+                        say(job)
+                    if not self.jobs:
+                        say("No jobs yet.")
+
+                elif choice == first + 7:
+                    job_id = int(await self.ask("Enter job ID to cancel: "))
+                    if self.cancel(job_id):
+                        say(f"\n✅ Cancelling job {job_id}.")
+                    else:
+                        say("\n❌ No such running job!")
+
+                elif choice == first + 8:
+                    say("\nExiting the system. Goodbye!")
+                    return
+
+                else:
+                    say("\n❌ Invalid choice! Please try again.")
+            except ValueError:
+                say("\n❌ Please enter a number!")
+            except HospitalError as error:
+                say(f"Error: {error}")
+            except (EOFError, KeyboardInterrupt):
+                return
+
+
+async def run(hms, sink, host="127.0.0.1", port=None):
+    """Run the console, plus a network listener on host:port if port is given."""
+    console = Console(hms, sink)
+    flusher = asyncio.create_task(server.flush_periodically(hms))
+    listener = None
+    if port is not None:
+        listener = await server.start(hms, host, port, console.writable)
+        sink.write(f"Serving Hospital Management System on http://{host}:{port}/")
+    try:
+        await console.run()
+    finally:
+        await console.stop()
+        if listener is not None:
+            listener.close()
+            await listener.wait_closed()
+        flusher.cancel()
+        sink.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Hospital Management System console with background jobs"
+    )
+    parser.add_argument("--data", default="hospital_data", help="storage directory")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument(
+        "--listen", type=int, metavar="PORT", help="also serve HTTP on this port"
+    )
+    args = parser.parse_args()
+
+    sink = StreamSink(sys.stdout)
+    hms = HospitalManagementSystem(LogStorage(args.data), sink)
+    snapshot.recover(hms)
+    try:
+        asyncio.run(run(hms, sink, args.host, args.listen))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        snapshot.checkpoint(hms)
+        hms.close()
+
+
+if __name__ == "__main__":
+    main()
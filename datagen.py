@@ -0,0 +1,237 @@
+import argparse
+import datetime
+import os
+import random
+import time
+
+from bulk import export_file
+from main import (
+    Appointment,
+    Doctor,
+    HospitalManagementSystem,
+    Inventory,
+    Patient,
+    Staff,
+)
+
+FIRST_NAMES = [
+    "Ayesha",
+    "Rahim",
+    "Karim",
+    "Nusrat",
+    "Tanvir",
+    "Farhana",
+    "Mehedi",
+    "Sadia",
+    "Imran",
+    "Taslima",
+    "Arif",
+    "Shirin",
+]
+LAST_NAMES = [
+    "Rahman",
+    "Hossain",
+    "Islam",
+    "Ahmed",
+    "Chowdhury",
+    "Khan",
+    "Begum",
+    "Sarkar",
+    "Akter",
+    "Uddin",
+]
+# (value, relative weight) pairs, so common cases dominate as they do in practice.
+DIAGNOSES = [
+    ("Flu", 20),
+    ("Fever", 15),
+    ("Hypertension", 12),
+    ("Diabetes", 10),
+    ("Asthma", 6),
+    ("Fracture", 5),
+    ("Migraine", 5),
+    ("Gastritis", 5),
+    ("Pneumonia", 3),
+    ("Dengue", 3),
+    ("Appendicitis", 1),
+]
+ROLES = [
+    ("Nurse", 50),
+    ("Receptionist", 12),
+    ("Technician", 12),
+    ("Pharmacist", 8),
+    ("Cleaner", 12),
+    ("Accountant", 3),
+]
+SHIFTS = [("Morning", 45), ("Evening", 35), ("Night", 20)]
+DESIGNATIONS = [
+    ("General Physician", 30),
+    ("Pediatrician", 12),
+    ("Cardiologist", 10),
+    ("Orthopedic", 10),
+    ("Gynecologist", 10),
+    ("Neurologist", 6),
+    ("Dermatologist", 8),
+    ("Surgeon", 14),
+]
+SUPPLIES = [
+    "Paracetamol",
+    "Amoxicillin",
+    "Insulin",
+    "Saline",
+    "Syringe",
+    "Gauze",
+    "Gloves",
+    "Mask",
+    "Bandage",
+    "Catheter",
+    "Antiseptic",
+    "Omeprazole",
+]
+# Records per collection for each unit of scale (patients).
+RATIOS = {
+    "patients": 1,
+    "staff": 0.1,
+    "doctors": 0.02,
+    "inventory": 0.05,
+    "appointments": 2,
+}
+FIRST_DAY = datetime.date(2025, 1, 6)
+SLOTS = [f"{hour:02d}:{minute:02d}" for hour in range(9, 17) for minute in (0, 30)]
+
+
+def _weighted(rng, pairs, count):
+    """Draw count values from (value, weight) pairs."""
+    values, weights = zip(*pairs)
+    return rng.choices(values, weights, k=count)
+
+
+def _name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+# Generators
+def patients(rng, count):
+    """Return count patients with weighted diagnoses and ages from 0 to 95."""
+    diagnoses = _weighted(rng, DIAGNOSES, count)
+    return [
+        Patient(
+            i,
+            _name(rng),
+            min(95, int(rng.triangular(0, 95, 40))),
+            rng.choice("MF"),
+            diagnosis,
+        )
+        for i, diagnosis in enumerate(diagnoses)
+    ]
+
+
+def staff(rng, count):
+    """Return count staff members with weighted roles and shifts."""
+    roles = _weighted(rng, ROLES, count)
+    shifts = _weighted(rng, SHIFTS, count)
+    return [
+        Staff(i, _name(rng), role, shift)
+        for i, (role, shift) in enumerate(zip(roles, shifts))
+    ]
+
+
+def doctors(rng, count):
+    """Return count doctors with weighted designations."""
+    designations = _weighted(rng, DESIGNATIONS, count)
+    return [
+        Doctor(i, f"Dr. {_name(rng)}", designation, f"01{rng.randrange(10**9):09d}")
+        for i, designation in enumerate(designations)
+    ]
+
+
+def inventory(rng, count):
+    """Return count items; about one in ten has no reorder level and some are low."""
+    return [
+        Inventory(
+            i,
+            f"{SUPPLIES[i % len(SUPPLIES)]} {i // len(SUPPLIES) + 1}",
+            rng.randrange(500),
+            None if rng.random() < 0.1 else rng.randrange(20, 100, 10),
+        )
+        for i in range(count)
+    ]
+
+
+def appointments(rng, count, patient_count, doctor_count):
+    """Return count conflict-free appointments in 30-minute slots from 09:00 to 17:00.
+
+    Enough consecutive days are used to keep doctors about half booked.
+    A fifth of the patients account for most of the bookings.
+    """
+    days = max(1, -(-count * 2 // (doctor_count * len(SLOTS))))
+    dates = [
+        (FIRST_DAY + datetime.timedelta(days=day)).isoformat() for day in range(days)
+    ]
+    frequent = max(1, patient_count // 5)
+    taken = set()
+    result = []
+    while len(result) < count:
+        slot = (
+            rng.randrange(doctor_count),
+            rng.randrange(days),
+            rng.randrange(len(SLOTS)),
+        )
+        if slot in taken:
+            continue
+        taken.add(slot)
+        doctor_id, day, time_slot = slot
+        patient_id = rng.randrange(frequent if rng.random() < 0.8 else patient_count)
+        result.append(
+            Appointment(
+                len(result), patient_id, doctor_id, dates[day], SLOTS[time_slot]
+            )
+        )
+    return result
+
+
+def generate(scale, seed=0):
+    """Return {collection: records} for scale patients; the same seed gives the same data.
+
+    Other collections are sized by RATIOS, with at least one record each.
+    """
+    rng = random.Random(seed)
+    counts = {
+        collection: max(1, int(scale * ratio)) for collection, ratio in RATIOS.items()
+    }
+    return {
+        "patients": patients(rng, counts["patients"]),
+        "staff": staff(rng, counts["staff"]),
+        "doctors": doctors(rng, counts["doctors"]),
+        "inventory": inventory(rng, counts["inventory"]),
+        "appointments": appointments(
+            rng, counts["appointments"], counts["patients"], counts["doctors"]
+        ),
+    }
+
+
+def populate(hms, dataset):
+    """Load a generated dataset into hms, referenced collections first; return hms."""
+    for collection in HospitalManagementSystem.RECORD_TYPES:
+        hms.bulk_add(collection, dataset[collection])
+    return hms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic hospital data")
+    parser.add_argument("directory", help="where to write one file per collection")
+    parser.add_argument("--scale", type=int, default=10_000, help="number of patients")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    hms = populate(HospitalManagementSystem(), generate(args.scale, args.seed))
+    os.makedirs(args.directory, exist_ok=True)
+    for collection in hms.RECORD_TYPES:
+        path = os.path.join(args.directory, f"{collection}.{args.format}")
+        print(f"{collection}: {export_file(hms, collection, path):,} rows -> {path}")
+    print(f"Generated in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
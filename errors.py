@@ -0,0 +1,26 @@
+class HospitalError(Exception):
+    """Base class for errors raised by HospitalManagementSystem operations.
+
+    record_ids lists the offending IDs when a whole batch was rejected.
+    """
+
+    def __init__(self, message, record_ids=()):
+        """Initialize the error with a message and the IDs it concerns."""
+        super().__init__(message)
+        self.record_ids = list(record_ids)
+
+
+class DuplicateRecordError(HospitalError):
+    """A record with the same ID already exists in the collection."""
+
+
+class RecordNotFoundError(HospitalError):
+    """No record with the given ID exists in the collection."""
+
+
+class SchedulingConflictError(HospitalError):
+    """The doctor already has an appointment at the requested date and time."""
+
+
+class IntegrityError(HospitalError):
+    """A foreign key names a missing record, or a delete would orphan referencing records."""
@@ -0,0 +1,268 @@
+import asyncio
+import threading
+import time
+
+
+# Event Types
+class ChangeEvent:
+    """One committed change to one record.
+
+    seq numbers are assigned by the stream in publish order, starting at 1,
+    so a consumer can resume after the last seq it handled.
+    """
+
+    __slots__ = ("seq", "collection", "record_id", "time")
+
+    def __init__(self, collection, record_id):
+        """Initialize an event; the stream assigns seq when it is published."""
+        self.seq = None
+        self.collection = collection
+        self.record_id = record_id
+        self.time = time.time()
+
+    def __repr__(self):
+        return (
+            f"{type(self).__name__}(seq={self.seq}, "
+            f"collection={self.collection!r}, record_id={self.record_id!r})"
+        )
+
+
+class RecordAdded(ChangeEvent):
+    """A record was added; record holds its fields."""
+
+    __slots__ = ("record",)
+
+    def __init__(self, collection, record_id, record):
+        super().__init__(collection, record_id)
+        self.record = record
+
+
+class RecordUpdated(ChangeEvent):
+    """A record was edited; fields holds the changed values, record all of them afterwards."""
+
+    __slots__ = ("fields", "record")
+
+    def __init__(self, collection, record_id, fields, record):
+        super().__init__(collection, record_id)
+        self.fields = fields
+        self.record = record
+
+
+class RecordRemoved(ChangeEvent):
+    """A record was deleted or canceled."""
+
+    __slots__ = ()
+
+
+# Subscriptions
+class Subscription:
+    """A consumer's cursor into an EventStream.
+
+    Pull with poll() (never blocks), wait() (blocks the consumer's thread)
+    or ``async for event in subscription`` (awaits on the consumer's event
+    loop). lost counts events that were overwritten before this consumer
+    read them, because it fell more than the stream's capacity behind, and
+    failures counts exceptions its handler raised (delivery carries on).
+    """
+
+    def __init__(self, stream, after, collections, kinds, handler):
+        """Initialize a cursor after seq after; see EventStream.subscribe."""
+        self.stream = stream
+        self.position = after
+        self.collections = set(collections) if collections is not None else None
+        self.kinds = tuple(kinds) if kinds is not None else None
+        self.handler = handler
+        self.lost = 0
+        self.failures = 0
+
+    def poll(self, limit=None):
+        """Return the matching events published since the last call, oldest first."""
+        events, lost = self.stream.read(self.position, limit)
+        self.lost += lost
+        if not events:
+            return events
+        self.position = events[-1].seq
+        if self.collections is not None:
+            events = [event for event in events if event.collection in self.collections]
+        if self.kinds is not None:
+            events = [event for event in events if isinstance(event, self.kinds)]
+        return events
+
+    def wait(self, timeout=None, limit=None):
+        """Return new matching events, blocking up to timeout seconds for some to arrive."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            events = self.poll(limit)
+            if events:
+                return events
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return events
+            self.stream._wait(self.position, remaining)
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        while True:
+            events = self.poll()
+            if not events:
+                await self.stream._wait_async(self.position)
+                continue
+            for event in events:
+                yield event
+
+    def close(self):
+        """Stop delivery to this subscription."""
+        self.stream.unsubscribe(self)
+
+
+class EventStream:
+    """Bounded in-process publish/subscribe stream of ChangeEvents.
+
+    Events live in a ring buffer of capacity slots indexed by seq, so the
+    newest capacity events can be re-read by any consumer. Publishing only
+    stores the event and flags it as pending; the writer never waits for
+    consumers. A daemon dispatcher thread, started on first need, calls
+    handler subscriptions and wakes waiting consumers in batches. A
+    consumer that falls more than capacity events behind skips ahead and
+    has the gap counted in its lost attribute.
+    """
+
+    def __init__(self, capacity=65536):
+        """Initialize an empty stream holding up to capacity events."""
+        self.capacity = capacity
+        self.seq = 0
+        self._ring = [None] * capacity
+        self._lock = threading.Lock()
+        self._pending = threading.Event()
+        self._condition = threading.Condition()
+        self._subscriptions = []
+        self._async_waiters = []
+        self._dispatcher = None
+
+    # Publishing
+    def publish(self, event):
+        """Assign the event the next seq and store it; return the seq."""
+        with self._lock:
+            self.seq += 1
+            event.seq = self.seq
+            self._ring[self.seq % self.capacity] = event
+        if self._dispatcher is not None and not self._pending.is_set():
+            self._pending.set()
+        return event.seq
+
+    def publish_change(self, registry, collection, op, record, records, payload):
+        """Publish the typed events for one journaled mutation (see HospitalManagementSystem._journal)."""
+        publish = self.publish
+        if op == "add":
+            publish(
+                RecordAdded(collection, getattr(record, registry.key), vars(record))
+            )
+        elif op == "add_many":
+            key = registry.key
+            for added in records:
+                publish(RecordAdded(collection, getattr(added, key), vars(added)))
+        elif op == "update":
+            record_id = payload["id"]
+            updated = registry.get(record_id)
+            publish(
+                RecordUpdated(collection, record_id, payload["fields"], vars(updated))
+            )
+        elif op == "update_many":
+            for update in payload["updates"]:
+                updated = registry.get(update["id"])
+                publish(
+                    RecordUpdated(
+                        collection, update["id"], update["fields"], vars(updated)
+                    )
+                )
+        elif op == "remove":
+            publish(RecordRemoved(collection, payload["id"]))
+        elif op == "remove_many":
+            for record_id in payload["ids"]:
+                publish(RecordRemoved(collection, record_id))
+
+    # Reading
+    def read(self, after=0, limit=None):
+        """Return (events with seq > after still buffered, how many older ones were lost)."""
+        with self._lock:
+            latest = self.seq
+            oldest = max(1, latest - self.capacity + 1)
+            start = max(after + 1, oldest)
+            end = latest if limit is None else min(latest, start + limit - 1)
+            ring, capacity = self._ring, self.capacity
+            events = [ring[seq % capacity] for seq in range(start, end + 1)]
+        return events, max(0, oldest - after - 1)
+
+    def subscribe(self, handler=None, collections=None, kinds=None, after=None):
+        """Return a Subscription to events after seq after (default: from now on).
+
+        collections and kinds (event classes) restrict what it sees. With
+        a handler, the dispatcher thread calls handler(event) for each event
+        and the subscription should not also be polled.
+        """
+        subscription = Subscription(
+            self, self.seq if after is None else after, collections, kinds, handler
+        )
+        with self._condition:
+            self._subscriptions.append(subscription)
+        self._start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Stop delivering to a subscription."""
+        with self._condition:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    # Delivery
+    def _start(self):
+        """Start the dispatcher thread if it is not running."""
+        with self._condition:
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(
+                    target=self._dispatch, name="event-dispatcher", daemon=True
+                )
+                self._dispatcher.start()
+                self._pending.set()
+
+    def _dispatch(self):
+        """Deliver pending events to handlers and wake waiting consumers, forever."""
+        while True:
+            self._pending.wait()
+            self._pending.clear()
+            with self._condition:
+                subscriptions = [s for s in self._subscriptions if s.handler]
+                waiters, self._async_waiters = self._async_waiters, []
+                self._condition.notify_all()
+            for loop, future in waiters:
+                loop.call_soon_threadsafe(_resolve, future)
+            for subscription in subscriptions:
+                for event in subscription.poll():
+                    try:
+                        subscription.handler(event)
+                    except Exception:
+                        subscription.failures += 1
+
+    def _wait(self, after, timeout):
+        """Block until an event with seq > after may be available."""
+        with self._condition:
+            if self.seq <= after:
+                self._condition.wait(timeout)
+
+    async def _wait_async(self, after):
+        """Await until an event with seq > after may be available."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._condition:
+            if self.seq > after:
+                return
+            self._async_waiters.append((loop, future))
+        self._start()
+        await future
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
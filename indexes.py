@@ -0,0 +1,414 @@
+import heapq
+from bisect import bisect_left, insort
+
+
+def normalize(value):
+    """Return the case-normalized form used as an index key."""
+    return value.lower() if isinstance(value, str) else value
+
+
+class FieldIndex:
+    """Hash index mapping a case-normalized field value to the IDs holding it.
+
+    IDs within a bucket keep insertion order, so a lookup costs O(result size).
+    """
+
+    def __init__(self, field):
+        """Initialize an empty index over the given attribute."""
+        self.field = field
+        self.fields = {field}
+        self._buckets = {}
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def insert(self, record_id, record):
+        """Add the record's ID to the bucket for its field value."""
+        key = normalize(getattr(record, self.field))
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            self._buckets[key] = {record_id: None}
+        else:
+            bucket[record_id] = None
+
+    def remove(self, record_id, record):
+        """Drop the record's ID from the bucket for its field value."""
+        key = normalize(getattr(record, self.field))
+        bucket = self._buckets[key]
+        del bucket[record_id]
+        if not bucket:
+            del self._buckets[key]
+
+    def clear(self):
+        """Remove every bucket."""
+        self._buckets.clear()
+
+    def lookup(self, value):
+        """Return the IDs whose field equals value, ignoring case for strings."""
+        return list(self._buckets.get(normalize(value), ()))
+
+    def count(self, value):
+        """Return how many IDs have field equal to value, without copying them."""
+        return len(self._buckets.get(normalize(value), ()))
+
+    def values(self):
+        """Return a view of the distinct normalized values."""
+        return self._buckets.keys()
+
+
+class StockIndex:
+    """Inventory item IDs kept sorted by quantity.
+
+    "Items below N" is one bisection plus a slice, O(log n + k). Batches of
+    BULK_THRESHOLD or more changes re-sort or filter the list once instead of
+    shifting it per item.
+    """
+
+    BULK_THRESHOLD = 64
+
+    def __init__(self, field="quantity"):
+        """Initialize an empty index ordered by the given numeric attribute."""
+        self.field = field
+        self.fields = {field}
+        self._entries = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    def insert(self, record_id, record):
+        """Place the item at its quantity's position."""
+        insort(self._entries, (getattr(record, self.field), record_id))
+
+    def remove(self, record_id, record):
+        """Take the item out of the ordering."""
+        entries = self._entries
+        del entries[bisect_left(entries, (getattr(record, self.field), record_id))]
+
+    def insert_many(self, pairs):
+        """Place many items at once, merging them in with one sort when there are several.
+
+        If a quantity cannot be ordered, the index is left unchanged.
+        """
+        if len(pairs) < self.BULK_THRESHOLD:
+            done = 0
+            try:
+                for record_id, record in pairs:
+                    self.insert(record_id, record)
+                    done += 1
+            except TypeError:
+                for record_id, record in pairs[:done]:
+                    self.remove(record_id, record)
+                raise
+            return
+        field = self.field
+        merged = self._entries + [
+            (getattr(record, field), record_id) for record_id, record in pairs
+        ]
+        merged.sort()
+        self._entries = merged
+
+    def remove_many(self, pairs):
+        """Take many items out of the ordering in a single filtering pass."""
+        if len(pairs) < self.BULK_THRESHOLD:
+            for record_id, record in pairs:
+                self.remove(record_id, record)
+            return
+        field = self.field
+        doomed = {(getattr(record, field), record_id) for record_id, record in pairs}
+        self._entries = [entry for entry in self._entries if entry not in doomed]
+
+    def clear(self):
+        """Remove every entry."""
+        self._entries.clear()
+
+    def count_below(self, threshold):
+        """Return how many items have quantity below threshold, in O(log n)."""
+        return bisect_left(self._entries, (threshold,))
+
+    def below(self, threshold):
+        """Return IDs of items whose quantity is below threshold, lowest first."""
+        entries = self._entries
+        return [
+            record_id for _, record_id in entries[: bisect_left(entries, (threshold,))]
+        ]
+
+
+class NameIndex:
+    """Trigram inverted index answering case-insensitive substring and prefix queries.
+
+    Each value is lowercased and padded with two start markers, so a prefix
+    query becomes an ordinary trigram lookup. Queries intersect the posting
+    sets of their trigrams, smallest first, and verify the few survivors.
+    Substring queries shorter than three characters have no trigram and fall
+    back to a scan of the pre-lowercased values.
+    """
+
+    START = "\x02\x02"
+
+    def __init__(self, field):
+        """Initialize an empty index over the given text attribute."""
+        self.field = field
+        self.fields = {field}
+        self._values = {}
+        self._postings = {}
+
+    def __len__(self):
+        return len(self._values)
+
+    @staticmethod
+    def _trigrams(text):
+        return {text[i : i + 3] for i in range(len(text) - 2)}
+
+    def insert(self, record_id, record):
+        """Index the record's text under its ID."""
+        value = getattr(record, self.field).lower()
+        self._values[record_id] = value
+        postings = self._postings
+        for gram in self._trigrams(self.START + value):
+            ids = postings.get(gram)
+            if ids is None:
+                postings[gram] = {record_id}
+            else:
+                ids.add(record_id)
+
+    def remove(self, record_id, record):
+        """Drop the record's ID from every posting set it appears in."""
+        value = self._values.pop(record_id, None)
+        if value is None:
+            return
+        postings = self._postings
+        for gram in self._trigrams(self.START + value):
+            ids = postings[gram]
+            ids.discard(record_id)
+            if not ids:
+                del postings[gram]
+
+    def clear(self):
+        """Remove every indexed value."""
+        self._values.clear()
+        self._postings.clear()
+
+    def _candidates(self, pattern):
+        """Return IDs whose value may contain pattern, or None if it is too short to index."""
+        grams = self._trigrams(pattern)
+        if not grams:
+            return None
+        postings = []
+        for gram in grams:
+            ids = self._postings.get(gram)
+            if not ids:
+                return set()
+            postings.append(ids)
+        postings.sort(key=len)
+        return postings[0].intersection(*postings[1:])
+
+    def search(self, text, prefix=False, limit=20, after=None):
+        """Return up to limit matching IDs in ascending order, starting after the given ID.
+
+        Pass the last ID of one page as ``after`` to fetch the next page.
+        """
+        query = text.lower()
+        if prefix:
+            matches = str.startswith
+            candidates = self._candidates(self.START + query)
+        else:
+            matches = str.__contains__
+            candidates = self._candidates(query)
+        values = self._values
+        if candidates is None:
+            candidates = values
+        found = (
+            record_id
+            for record_id in candidates
+            if (after is None or record_id > after)
+            and matches(values[record_id], query)
+        )
+        return heapq.nsmallest(limit, found)
+
+
+class CountIndex:
+    """Materialized count of records per case-normalized field value.
+
+    Each insert or remove adjusts one counter, so the summary is always
+    current and reading it costs O(distinct values), whatever the number of
+    records. A value is reported in the spelling it was first seen with.
+    """
+
+    def __init__(self, field):
+        """Initialize empty counts over the given attribute."""
+        self.field = field
+        self.fields = {field}
+        self._counts = {}
+
+    def __len__(self):
+        return len(self._counts)
+
+    def insert(self, record_id, record):
+        """Count the record under its field value."""
+        value = getattr(record, self.field)
+        key = normalize(value)
+        entry = self._counts.get(key)
+        if entry is None:
+            self._counts[key] = [value, 1]
+        else:
+            entry[1] += 1
+
+    def remove(self, record_id, record):
+        """Stop counting the record, dropping values no record holds any more."""
+        key = normalize(getattr(record, self.field))
+        entry = self._counts[key]
+        entry[1] -= 1
+        if not entry[1]:
+            del self._counts[key]
+
+    def clear(self):
+        """Reset every count."""
+        self._counts.clear()
+
+    def count(self, value):
+        """Return how many records have field equal to value, ignoring case for strings."""
+        entry = self._counts.get(normalize(value))
+        return entry[1] if entry is not None else 0
+
+    def counts(self):
+        """Return {value: records}, most common first."""
+        return dict(sorted(self._counts.values(), key=lambda entry: -entry[1]))
+
+
+class SumIndex:
+    """Materialized running total of a numeric field over all records."""
+
+    def __init__(self, field):
+        """Initialize a zero total over the given attribute."""
+        self.field = field
+        self.fields = {field}
+        self.total = 0
+
+    def insert(self, record_id, record):
+        """Add the record's value to the total."""
+        self.total += getattr(record, self.field)
+
+    def remove(self, record_id, record):
+        """Subtract the record's value from the total."""
+        self.total -= getattr(record, self.field)
+
+    def clear(self):
+        """Reset the total."""
+        self.total = 0
+
+
+DAY = 24 * 60 * 60
+
+
+class ScheduleIndex:
+    """Appointment slots ordered by start time (epoch seconds).
+
+    Keeps time-sorted slot lists per (doctor, day) and per patient, plus a
+    calendar of per-day slot lists behind a sorted list of days. Conflict
+    checks, range starts and day lookups are bisections, so booking and
+    range queries cost O(log n + k).
+    """
+
+    def __init__(self):
+        """Initialize empty doctor-day, patient and calendar slot lists."""
+        self.fields = {"patient_id", "doctor_id", "starts_at"}
+        self._doctor_days = {}
+        self._patients = {}
+        self._calendar = {}
+        self._days = []
+
+    def __len__(self):
+        return len(self._days)
+
+    @staticmethod
+    def _discard(slots, entry):
+        """Remove entry from a sorted slot list."""
+        del slots[bisect_left(slots, entry)]
+
+    def insert(self, record_id, record):
+        """Place the appointment in its doctor's day, its patient's list and the calendar."""
+        entry = (record.starts_at, record_id)
+        day = record.starts_at // DAY
+        insort(self._doctor_days.setdefault((record.doctor_id, day), []), entry)
+        insort(self._patients.setdefault(record.patient_id, []), entry)
+        slots = self._calendar.get(day)
+        if slots is None:
+            self._calendar[day] = [entry]
+            insort(self._days, day)
+        else:
+            insort(slots, entry)
+
+    def remove(self, record_id, record):
+        """Take the appointment out of every slot list."""
+        entry = (record.starts_at, record_id)
+        day = record.starts_at // DAY
+        for slot_lists, key in (
+            (self._doctor_days, (record.doctor_id, day)),
+            (self._patients, record.patient_id),
+            (self._calendar, day),
+        ):
+            slots = slot_lists[key]
+            self._discard(slots, entry)
+            if not slots:
+                del slot_lists[key]
+        if day not in self._calendar:
+            self._discard(self._days, day)
+
+    def clear(self):
+        """Remove every slot."""
+        self._doctor_days.clear()
+        self._patients.clear()
+        self._calendar.clear()
+        self._days.clear()
+
+    def booking(self, doctor_id, starts_at):
+        """Return the ID of the doctor's appointment starting at starts_at, or None."""
+        slots = self._doctor_days.get((doctor_id, starts_at // DAY))
+        if not slots:
+            return None
+        position = bisect_left(slots, (starts_at,))
+        if position < len(slots) and slots[position][0] == starts_at:
+            return slots[position][1]
+        return None
+
+    def is_booked(self, doctor_id, starts_at):
+        """Return True if the doctor already has an appointment starting at starts_at."""
+        return self.booking(doctor_id, starts_at) is not None
+
+    def doctor_day(self, doctor_id, day):
+        """Return the doctor's appointment IDs on day (epoch days), sorted by time."""
+        slots = self._doctor_days.get((doctor_id, day), ())
+        return [record_id for _, record_id in slots]
+
+    def patient_appointments(self, patient_id, since=None):
+        """Return the patient's appointment IDs starting at or after since, in time order."""
+        slots = self._patients.get(patient_id, ())
+        start = bisect_left(slots, (since,)) if since is not None else 0
+        return [record_id for _, record_id in slots[start:]]
+
+    def between(self, start, end):
+        """Return IDs of appointments starting in [start, end), in time order."""
+        found = []
+        days = self._days
+        position = bisect_left(days, start // DAY)
+        while position < len(days) and days[position] * DAY < end:
+            slots = self._calendar[days[position]]
+            first = bisect_left(slots, (start,))
+            last = bisect_left(slots, (end,))
+            found.extend(record_id for _, record_id in slots[first:last])
+            position += 1
+        return found
+
+    def next_free_slot(self, doctor_id, day, opens=9 * 60, closes=17 * 60, step=30):
+        """Return the start (epoch seconds) of the doctor's first free slot on day, or None.
+
+        opens, closes and step are in minutes; slots run from opens to closes.
+        """
+        booked = {
+            starts_at for starts_at, _ in self._doctor_days.get((doctor_id, day), ())
+        }
+        for minutes in range(opens, closes, step):
+            starts_at = day * DAY + minutes * 60
+            if starts_at not in booked:
+                return starts_at
+        return None
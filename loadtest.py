@@ -0,0 +1,120 @@
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+# Utility: Minimal Keep-Alive HTTP Client
+async def request(reader, writer, method, path, body=None):
+    """Send one request on an open connection and return (status, body bytes)."""
+    payload = json.dumps(body).encode() if body is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: loadtest\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n\r\n".encode()
+        + payload
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+def percentile(samples, fraction):
+    """Return the given percentile (0-1) of a sorted list."""
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+
+async def client(host, port, worker, requests, latencies):
+    """Run one connection's share of writes followed by reads."""
+    reader, writer = await asyncio.open_connection(host, port)
+    first = worker * requests
+
+    async def timed_request(kind, method, path, body=None):
+        start = time.perf_counter()
+        status, _ = await request(reader, writer, method, path, body)
+        latencies[kind].append(time.perf_counter() - start)
+        if status >= 400:
+            latencies["errors"].append(status)
+
+    for patient_id in range(first, first + requests):
+        patient = {
+            "patient_id": patient_id,
+            "name": f"Load Patient {patient_id}",
+            "age": 40,
+            "gender": "F",
+            "diagnosis": "Flu",
+        }
+        await timed_request("write", "POST", "/api/patients", patient)
+    for patient_id in range(first, first + requests):
+        await timed_request("read", "GET", f"/api/patients/{patient_id}")
+    writer.close()
+
+
+async def run(host, port, connections, requests):
+    """Drive the server with concurrent keep-alive connections and print a report."""
+    latencies = {"write": [], "read": [], "errors": []}
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            client(host, port, worker, requests, latencies)
+            for worker in range(connections)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    total = connections * requests * 2
+    print(
+        f"{connections} connections, {total:,} requests in {elapsed:.2f}s "
+        f"({total / elapsed:,.0f} req/s overall), {len(latencies['errors'])} errors"
+    )
+    for kind in ("write", "read"):
+        samples = sorted(latencies[kind])
+        print(
+            f"{kind:>5}: {len(samples):,} requests  "
+            f"p50 {percentile(samples, 0.50) * 1000:6.2f} ms  "
+            f"p99 {percentile(samples, 0.99) * 1000:6.2f} ms  "
+            f"max {samples[-1] * 1000:6.2f} ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the hospital HTTP server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--connections", type=int, default=50)
+    parser.add_argument(
+        "--requests", type=int, default=200, help="per connection and kind"
+    )
+    parser.add_argument(
+        "--spawn",
+        action="store_true",
+        help="start a server with a fresh data directory",
+    )
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn:
+        data = tempfile.mkdtemp()
+        server = subprocess.Popen(
+            [sys.executable, "server.py", "--port", str(args.port), "--data", data],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stdout=subprocess.DEVNULL,
+        )
+        time.sleep(1)
+    try:
+        asyncio.run(run(args.host, args.port, args.connections, args.requests))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,92 @@
 import datetime
+import itertools
+import re
+import sys
+
+from errors import (
+    DuplicateRecordError,
+    HospitalError,
+    IntegrityError,
+    RecordNotFoundError,
+    SchedulingConflictError,
+)
+from indexes import (
+    DAY,
+    CountIndex,
+    NameIndex,
+    ScheduleIndex,
+    StockIndex,
+    SumIndex,
+)
+from metrics import Metrics
+from output import Sink, StreamSink
+from query import Query
+from registry import Registry
+from storage import LogStorage, Storage
+
+EPOCH = datetime.datetime(1970, 1, 1)
+DATE_TIME = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2} [0-9]{2}:[0-9]{2}")
+
+
+# Fields holding ints, per collection; every other editable field holds text.
+INT_FIELDS = {
+    "patients": {"age"},
+    "inventory": {"quantity", "reorder_level"},
+    "appointments": {"patient_id", "doctor_id", "starts_at"},
+}
+OPTIONAL_FIELDS = {"inventory": {"reorder_level"}}
+
+
+def check_value(collection, field, value):
+    """Raise ValueError unless value has the type collection's field holds."""
+    if value is None and field in OPTIONAL_FIELDS.get(collection, ()):
+        return
+    if field in INT_FIELDS.get(collection, ()):
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise ValueError(
+                f"{collection} {field} must be a whole number, got {value!r}"
+            )
+    elif not isinstance(value, str):
+        raise ValueError(f"{collection} {field} must be text, got {value!r}")
+
+
+# Utility: Timestamps
+def to_timestamp(date, time="00:00"):
+    """Parse 'YYYY-MM-DD' and 'HH:MM' into epoch seconds; raise ValueError if invalid.
+
+    Only that exact format is accepted: seconds or a UTC offset would be
+    lost when the appointment is written back out as date and time.
+    """
+    text = f"{date} {time}"
+    if not DATE_TIME.fullmatch(text):
+        raise ValueError(f"Expected 'YYYY-MM-DD HH:MM', got {text!r}")
+    moment = datetime.datetime.fromisoformat(text)
+    return int((moment - EPOCH).total_seconds())
+
+
+def from_timestamp(timestamp):
+    """Convert epoch seconds back into a datetime."""
+    return EPOCH + datetime.timedelta(seconds=timestamp)
 
 
 # Class Definitions
-class Patient:
+class Record:
+    """Base class for compact, slot-based hospital records.
+
+    FIELDS lists the constructor arguments; vars(record) reports them.
+    """
+
+    __slots__ = FIELDS = ()
+
+    @property
+    def __dict__(self):
+        """Expose field values as a dict so vars(record) keeps working."""
+        return {name: getattr(self, name) for name in self.FIELDS}
+
+
+class Patient(Record):
+    __slots__ = FIELDS = ("patient_id", "name", "age", "gender", "diagnosis")
+
     def __init__(self, patient_id, name, age, gender, diagnosis):
         """Initialize Patient with ID, name, age, gender, and diagnosis."""
         self.patient_id = patient_id
@@ -12,7 +96,9 @@ class Patient:
         self.diagnosis = diagnosis
 
 
-class Staff:
+class Staff(Record):
+    __slots__ = FIELDS = ("staff_id", "name", "role", "shift")
+
     def __init__(self, staff_id, name, role, shift):
         """Initialize Staff with ID, name, role, and shift."""
         self.staff_id = staff_id
@@ -21,7 +107,9 @@ class Staff:
         self.shift = shift
 
 
-class Doctor:
+class Doctor(Record):
+    __slots__ = FIELDS = ("doctor_id", "name", "designation", "phone")
+
     def __init__(self, doctor_id, name, designation, phone):
         """Initialize Doctor with ID, name, designation, and phone."""
         self.doctor_id = doctor_id
@@ -30,294 +118,1135 @@ class Doctor:
         self.phone = phone
 
 
-class Inventory:
-    def __init__(self, item_id, item_name, quantity):
-        """Initialize Inventory with ID, name, and quantity."""
+class Inventory(Record):
+    __slots__ = FIELDS = ("item_id", "item_name", "quantity", "reorder_level")
+
+    def __init__(self, item_id, item_name, quantity, reorder_level=None):
+        """Initialize Inventory with ID, name, quantity, and optional reorder level."""
         self.item_id = item_id
         self.item_name = item_name
         self.quantity = quantity
+        self.reorder_level = reorder_level
 
+    def needs_reorder(self):
+        """Return True if the quantity is below the item's reorder level."""
+        return self.reorder_level is not None and self.quantity < self.reorder_level
+
+
+class Appointment(Record):
+    __slots__ = ("appointment_id", "patient_id", "doctor_id", "starts_at")
+    FIELDS = ("appointment_id", "patient_id", "doctor_id", "date", "time")
 
-class Appointment:
     def __init__(self, appointment_id, patient_id, doctor_id, date, time):
-        """Initialize Appointment with ID, patient ID, doctor ID, date, and time."""
+        """Initialize Appointment with ID, patient ID, doctor ID, date, and time.
+
+        date ('YYYY-MM-DD') and time ('HH:MM') are parsed once into starts_at,
+        in epoch seconds; invalid values raise ValueError.
+        """
         self.appointment_id = appointment_id
         self.patient_id = patient_id
         self.doctor_id = doctor_id
-        self.date = date
-        self.time = time
+        self.starts_at = to_timestamp(date, time)
+
+    @property
+    def date(self):
+        """Appointment date as 'YYYY-MM-DD'."""
+        return from_timestamp(self.starts_at).strftime("%Y-%m-%d")
+
+    @property
+    def time(self):
+        """Appointment time as 'HH:MM'."""
+        return from_timestamp(self.starts_at).strftime("%H:%M")
 
 
 # Main Hospital Management System
 class HospitalManagementSystem:
-    def __init__(self):
-        """Initialize lists for managing patients, staff, doctors, inventory, and appointments."""
-        self.patients = []
-        self.staff = []
-        self.doctors = []
-        self.inventory = []
-        self.appointments = []
+    RECORD_TYPES = {
+        "patients": Patient,
+        "staff": Staff,
+        "doctors": Doctor,
+        "inventory": Inventory,
+        "appointments": Appointment,
+    }
+    # Foreign keys: collection -> {field: collection holding the referenced ID}
+    REFERENCES = {
+        "appointments": {"patient_id": "patients", "doctor_id": "doctors"},
+    }
+
+    def __init__(self, storage=None, sink=None, events=None):
+        """Initialize registries for managing patients, staff, doctors, inventory, and appointments.
+
+        Operations return their result or raise a HospitalError; messages and
+        listings go to sink, which discards them unless one is given. Every
+        committed change is also published to events, an EventStream, if given.
+        """
+        self.storage = storage if storage is not None else Storage()
+        self.sink = sink if sink is not None else Sink()
+        self.events = events
+        self._journaling = storage is not None
+        self.patients = Registry("patient_id")
+        self.staff = Registry("staff_id")
+        self.doctors = Registry("doctor_id")
+        self.inventory = Registry("item_id")
+        self.appointments = Registry("appointment_id")
         self.admin_password = "12345"  # Default password for admin login
+        self.patient_names = self.patients.add_index(NameIndex("name"))
+        self.staff.create_index("role")
+        self.doctors.create_index("designation")
+        self.schedule = self.appointments.add_index(ScheduleIndex())
+        self.stock = self.inventory.add_index(StockIndex())
+        self.diagnosis_counts = self.patients.add_index(CountIndex("diagnosis"))
+        self.shift_counts = self.staff.add_index(CountIndex("shift"))
+        self.designation_counts = self.doctors.add_index(CountIndex("designation"))
+        self.total_stock = self.inventory.add_index(SumIndex("quantity"))
+        for collection, references in self.REFERENCES.items():
+            for field in references:
+                getattr(self, collection).create_index(field)
+        self.low_stock_listeners = []
 
     # Utility: Display Decorated Header
     def display_header(self, text):
         """Display a styled header for section titles."""
-        print("\n" + "=" * 50)
-        print(f"{text.center(50)}")
-        print("=" * 50)
+        self.sink.write("\n" + "=" * 50)
+        self.sink.write(text.center(50))
+        self.sink.write("=" * 50)
+
+    def _show(self, records, empty_message):
+        """Display records, or empty_message if there are none; return them."""
+        if records:
+            self.sink.write_records(records)
+        else:
+            self.sink.write(empty_message)
+        return records
+
+    # Persistence Methods
+    def _journal(self, collection, op, record=None, records=None, **payload):
+        """Record a successful mutation with the storage backend and event stream, if any."""
+        if self.events is not None:
+            self.events.publish_change(
+                getattr(self, collection), collection, op, record, records, payload
+            )
+        if not self._journaling:
+            return
+        if record is not None:
+            payload["record"] = vars(record)
+        if records is not None:
+            payload["records"] = [vars(record) for record in records]
+        payload["collection"] = collection
+        payload["op"] = op
+        self.storage.append(payload)
+
+    def _apply(self, event):
+        """Apply one journaled event directly to its registry."""
+        collection = event["collection"]
+        registry = getattr(self, collection)
+        op = event["op"]
+        if op == "add":
+            registry.add(self.RECORD_TYPES[collection](**event["record"]))
+        elif op == "add_many":
+            record_type = self.RECORD_TYPES[collection]
+            for fields in event["records"]:
+                registry.add(record_type(**fields))
+        elif op == "update":
+            registry.update(event["id"], **event["fields"])
+        elif op == "update_many":
+            for update in event["updates"]:
+                registry.update(update["id"], **update["fields"])
+        elif op == "remove":
+            registry.remove(event["id"])
+        elif op == "remove_many":
+            registry.remove_many(event["ids"])
+
+    def recover(self, after=None):
+        """Rebuild state from the storage snapshot plus journal tail; return events applied.
+
+        With after, apply only the journal events after that sequence number,
+        on top of state already restored (see snapshot.recover).
+        """
+        count = 0
+        for event in self.storage.replay(after):
+            self._apply(event)
+            count += 1
+        return count
+
+    def checkpoint(self):
+        """Write a snapshot of every collection so recovery can skip the old journal."""
+        self.storage.write_snapshot(
+            {"collection": collection, "op": "add", "record": vars(record)}
+            for collection in self.RECORD_TYPES
+            for record in getattr(self, collection)
+        )
+
+    def close(self):
+        """Flush pending journal writes and release the storage backend."""
+        self.storage.close()
+
+    # Referential Integrity
+    def _dangling(self, collection, record_id, values):
+        """Yield (record_id, field, value, target) for foreign keys in values naming no record."""
+        for field, target in self.REFERENCES.get(collection, {}).items():
+            if field in values:
+                value = values[field]
+                if value not in getattr(self, target):
+                    yield record_id, field, value, target
+
+    def _check_references(self, collection, rows):
+        """Raise IntegrityError unless every foreign key in (record_id, values) rows exists."""
+        broken = [
+            dangling
+            for record_id, values in rows
+            for dangling in self._dangling(collection, record_id, values)
+        ]
+        if len(broken) == 1:
+            _, field, value, target = broken[0]
+            raise IntegrityError(
+                f"{field} {value} not found in {target}!", [broken[0][0]]
+            )
+        if broken:
+            raise IntegrityError(
+                f"{len(broken)} references from {collection} not found!",
+                [record_id for record_id, _, _, _ in broken],
+            )
+
+    def _release(self, collection, record_ids, cascade):
+        """Make record_ids safe to delete from collection.
 
-    # Utility: Check for Duplicates
-    def _check_duplicate(self, items, key, value):
-        """Check if an item with the given key-value pair exists in a list."""
-        return any(getattr(item, key) == value for item in items)
+        Records elsewhere that refer to them block the delete with an
+        IntegrityError listing the blocked IDs, or with cascade=True are
+        deleted first (recursively), found through the reverse indexes.
+        """
+        for source, references in self.REFERENCES.items():
+            registry = getattr(self, source)
+            for field, target in references.items():
+                if target != collection:
+                    continue
+                index = registry.field_indexes[field]
+                if not cascade:
+                    blocked = [
+                        record_id for record_id in record_ids if index.count(record_id)
+                    ]
+                    if len(blocked) == 1:
+                        raise IntegrityError(
+                            f"ID {blocked[0]} in {collection} is still referenced by {source}!",
+                            blocked,
+                        )
+                    if blocked:
+                        raise IntegrityError(
+                            f"{len(blocked)} IDs in {collection} are still referenced by {source}!",
+                            blocked,
+                        )
+                    continue
+                dependents = [
+                    dependent
+                    for record_id in record_ids
+                    for dependent in index.lookup(record_id)
+                ]
+                if dependents:
+                    self._release(source, dependents, cascade)
+                    registry.remove_many(dependents)
+                    self._journal(source, "remove_many", ids=dependents)
+                    self.sink.write(
+                        f"\n✅ {len(dependents)} {source} deleted along with them."
+                    )
+
+    # Bulk Methods
+    def bulk_add(self, collection, records):
+        """Insert records into a collection without per-record output.
+
+        Applies the same checks as the add_* methods and returns a list of
+        (record, reason) pairs for the records that were rejected.
+        """
+        registry = getattr(self, collection)
+        references = self.REFERENCES.get(collection, {})
+        rejected = []
+        for record in records:
+            missing = next(
+                (
+                    f"{field} {getattr(record, field)} not found in {target}"
+                    for field, target in references.items()
+                    if getattr(record, field) not in getattr(self, target)
+                ),
+                None,
+            )
+            if missing is not None:
+                rejected.append((record, missing))
+            elif collection == "appointments" and self.schedule.is_booked(
+                record.doctor_id, record.starts_at
+            ):
+                rejected.append((record, "doctor already booked at this date and time"))
+            elif not registry.add(record):
+                rejected.append((record, "ID already exists"))
+            else:
+                self._journal(collection, "add", record=record)
+                if collection == "inventory" and record.needs_reorder():
+                    self._notify_low_stock(record)
+        return rejected
+
+    # Batch Methods
+    def add_many(self, collection, records):
+        """Add a batch of records all-or-nothing; return them as a list.
+
+        The whole batch is validated in one pass before anything changes.
+        DuplicateRecordError lists IDs that are taken or repeated within the
+        batch and IntegrityError those naming a missing patient or doctor;
+        for appointments, SchedulingConflictError lists those whose doctor is
+        already booked at that time, by an existing appointment or by another
+        one in the batch.
+        """
+        records = list(records)
+        self.validate_new(collection, records)
+        getattr(self, collection).add_many(records)
+        self._journal(collection, "add_many", records=records)
+        self.sink.write(f"\n✅ {len(records)} {collection} added successfully!")
+        if collection == "inventory":
+            for record in records:
+                if record.needs_reorder():
+                    self._notify_low_stock(record)
+        return records
+
+    def validate_new(self, collection, records):
+        """Raise the error add_many would raise for records, without adding any."""
+        registry = getattr(self, collection)
+        key = registry.key
+        if collection in self.REFERENCES:
+            self._check_references(
+                collection, ((getattr(record, key), vars(record)) for record in records)
+            )
+        if collection == "appointments":
+            self._check_slots(
+                {
+                    record.appointment_id: (record.doctor_id, record.starts_at)
+                    for record in records
+                }
+            )
+        ids = [getattr(record, key) for record in records]
+        if len(set(ids)) != len(ids) or not registry.ids().isdisjoint(ids):
+            seen = set()
+            duplicates = []
+            for record_id in ids:
+                if record_id in registry or record_id in seen:
+                    duplicates.append(record_id)
+                seen.add(record_id)
+            raise DuplicateRecordError(
+                f"{len(duplicates)} IDs already exist in {collection} or repeat in the batch!",
+                duplicates,
+            )
+
+    def update_many(self, collection, updates):
+        """Apply {record_id: {field: new value}} updates all-or-nothing; return the records.
+
+        RecordNotFoundError lists IDs that do not exist, IntegrityError those
+        whose new foreign keys name missing records, and ValueError reports
+        fields that cannot be changed (unknown fields and the ID) or values
+        of the wrong type.
+        Appointments take patient_id, doctor_id, date and time; moves are
+        checked for conflicts as in add_many, counting the batch's own moves.
+        """
+        registry = getattr(self, collection)
+        editable = set(self.RECORD_TYPES[collection].FIELDS) - {registry.key}
+        missing = [record_id for record_id in updates if record_id not in registry]
+        if missing:
+            raise RecordNotFoundError(
+                f"{len(missing)} IDs not found in {collection}!", missing
+            )
+        for fields in updates.values():
+            unknown = fields.keys() - editable
+            if unknown:
+                raise ValueError(
+                    f"Cannot update {collection} fields: {', '.join(sorted(unknown))}"
+                )
+            for name, value in fields.items():
+                check_value(collection, name, value)
+        self._check_references(collection, updates.items())
+        if collection == "appointments":
+            updates = self._reschedule(updates)
+        if collection == "inventory":
+            was_low = {
+                item_id
+                for item_id in updates
+                if self.inventory.get(item_id).needs_reorder()
+            }
+        records = registry.update_many(updates)
+        self._journal(
+            collection,
+            "update_many",
+            updates=[
+                {"id": record_id, "fields": fields}
+                for record_id, fields in updates.items()
+            ],
+        )
+        self.sink.write(f"\n✅ {len(records)} {collection} updated successfully!")
+        if collection == "inventory":
+            for item in records:
+                if item.item_id not in was_low and item.needs_reorder():
+                    self._notify_low_stock(item)
+        return records
+
+    def delete_many(self, collection, record_ids, cascade=False):
+        """Delete a batch of records all-or-nothing; return them as a list.
+
+        RecordNotFoundError lists IDs that do not exist and IntegrityError
+        those other records still refer to, unless cascade is set, in which
+        case the referring records are deleted first.
+        """
+        record_ids = list(record_ids)
+        registry = getattr(self, collection)
+        missing = [record_id for record_id in record_ids if record_id not in registry]
+        if missing:
+            raise RecordNotFoundError(
+                f"{len(missing)} IDs not found in {collection}!", missing
+            )
+        self._release(collection, record_ids, cascade)
+        removed = registry.remove_many(record_ids)
+        self._journal(
+            collection,
+            "remove_many",
+            ids=[getattr(record, registry.key) for record in removed],
+        )
+        self.sink.write(f"\n✅ {len(removed)} {collection} deleted successfully!")
+        return removed
+
+    def _reschedule(self, updates):
+        """Turn appointment date/time updates into starts_at and check the new slots."""
+        converted = {}
+        targets = {}
+        for appointment_id, fields in updates.items():
+            appointment = self.appointments.get(appointment_id)
+            fields = dict(fields)
+            if "date" in fields or "time" in fields:
+                fields["starts_at"] = to_timestamp(
+                    fields.pop("date", appointment.date),
+                    fields.pop("time", appointment.time),
+                )
+            converted[appointment_id] = fields
+            targets[appointment_id] = (
+                fields.get("doctor_id", appointment.doctor_id),
+                fields.get("starts_at", appointment.starts_at),
+            )
+        self._check_slots(targets)
+        return converted
+
+    def _check_slots(self, targets):
+        """Raise SchedulingConflictError unless every target slot is free.
+
+        targets maps appointment IDs to (doctor_id, starts_at). A slot is free
+        if no other target claims it and it is unbooked or held by one of the
+        targeted appointments, which is moving away.
+        """
+        claimed = set()
+        conflicts = []
+        for appointment_id, slot in targets.items():
+            holder = self.schedule.booking(*slot)
+            if slot in claimed or (holder is not None and holder not in targets):
+                conflicts.append(appointment_id)
+            claimed.add(slot)
+        if conflicts:
+            raise SchedulingConflictError(
+                f"{len(conflicts)} appointments clash with a booked date and time!",
+                conflicts,
+            )
+
+    # Listing Methods
+    def iter_records(self, collection, after=None, fields=None):
+        """Lazily yield (cursor, row) pairs for a collection in insertion order.
+
+        Rows are dicts of the given fields (default: all of them). Pass the
+        last cursor seen as ``after`` to resume where a previous pass stopped.
+        """
+        scan = getattr(self, collection).scan(after)
+        if fields is None:
+            for cursor, record in scan:
+                yield cursor, vars(record)
+        else:
+            for cursor, record in scan:
+                yield cursor, {name: getattr(record, name) for name in fields}
+
+    def page(self, collection, limit=20, after=None, fields=None):
+        """Return (rows, next_cursor) for one page; next_cursor is None on the last page."""
+        rows = []
+        next_cursor = None
+        for cursor, row in itertools.islice(
+            self.iter_records(collection, after, fields), limit + 1
+        ):
+            if len(rows) == limit:
+                return rows, next_cursor
+            rows.append(row)
+            next_cursor = cursor
+        return rows, None
+
+    def show_page(self, collection, title, limit=20, after=None, fields=None):
+        """Display one page of a collection; return the next page's cursor."""
+        self.display_header(title)
+        rows, cursor = self.page(collection, limit, after, fields)
+        if rows:
+            for row in rows:
+                self.sink.write(row)
+        else:
+            self.sink.write(f"No {collection} to show.")
+        return cursor
+
+    def summary(self):
+        """Return dashboard counts, read from views kept current on every change.
+
+        Costs O(distinct diagnoses, shifts and designations), not O(records).
+        """
+        return {
+            "counts": {
+                collection: len(getattr(self, collection))
+                for collection in self.RECORD_TYPES
+            },
+            "patients_per_diagnosis": self.diagnosis_counts.counts(),
+            "staff_per_shift": self.shift_counts.counts(),
+            "doctors_per_designation": self.designation_counts.counts(),
+            "total_stock": self.total_stock.total,
+        }
+
+    def show_summary(self):
+        """Display the dashboard counts; return them."""
+        summary = self.summary()
+        self.display_header("Summary")
+        for collection, count in summary["counts"].items():
+            self.sink.write(f"{collection.title()}: {count}")
+        for title, name in (
+            ("Patients per diagnosis", "patients_per_diagnosis"),
+            ("Staff per shift", "staff_per_shift"),
+            ("Doctors per designation", "doctors_per_designation"),
+        ):
+            self.sink.write(f"{title}:")
+            for value, count in summary[name].items():
+                self.sink.write(f"  {value}: {count}")
+        self.sink.write(f"Total stock: {summary['total_stock']}")
+        return summary
+
+    def show_all(self, limit=20):
+        """Display the summary and the first page of every collection; return each next-page cursor."""
+        self.show_summary()
+        return {
+            collection: self.show_page(collection, collection.title(), limit)
+            for collection in self.RECORD_TYPES
+        }
+
+    def query(self, collection):
+        """Return a Query over collection; see query.Query."""
+        return Query(getattr(self, collection), collection)
 
     # Patient Methods
     def add_patient(self, patient):
-        """Add a new patient if the ID is unique."""
-        if self._check_duplicate(self.patients, "patient_id", patient.patient_id):
-            print("Error: Patient with this ID already exists!")
-        else:
-            self.patients.append(patient)
-            print("\n✅ Patient added successfully!")
+        """Add a new patient and return it; raise DuplicateRecordError if the ID is taken."""
+        if not self.patients.add(patient):
+            raise DuplicateRecordError("Patient with this ID already exists!")
+        self._journal("patients", "add", record=patient)
+        self.sink.write("\n✅ Patient added successfully!")
+        return patient
+
+    def add_patient_many(self, patients):
+        """Add many patients all-or-nothing; see add_many."""
+        return self.add_many("patients", patients)
+
+    def update_patient_many(self, updates):
+        """Update many patients all-or-nothing from {ID: {field: value}}; see update_many."""
+        return self.update_many("patients", updates)
 
-    def search_patient_by_name(self, name):
-        """Search and display patients by name."""
+    def search_patient_by_name(self, name, prefix=False, limit=20, after=None):
+        """Search and display one page of patients by name; return that page.
+
+        Matching is case-insensitive, on a substring or (with prefix=True) a
+        name prefix. Pages are ordered by patient ID; pass the last ID of a
+        page as ``after`` to fetch the next one.
+        """
         self.display_header(f"Search Results for '{name}'")
-        found = [p for p in self.patients if name.lower() in p.name.lower()]
-        if found:
-            for patient in found:
-                print(vars(patient))
-        else:
-            print("No patients found with that name.")
+        found = [
+            self.patients.get(patient_id)
+            for patient_id in self.patient_names.search(name, prefix, limit, after)
+        ]
+        return self._show(
+            found,
+            (
+                "No patients found with that name."
+                if after is None
+                else "No more patients found with that name."
+            ),
+        )
+
+    def delete_patient(self, patient_id, cascade=False):
+        """Delete a patient by ID; return True if it existed.
 
-    def delete_patient(self, patient_id):
-        """Delete a patient by ID."""
-        self.patients = [p for p in self.patients if p.patient_id != patient_id]
-        print("\n✅ Patient deleted successfully!")
+        Raises IntegrityError if appointments still refer to the patient,
+        unless cascade is set, in which case they are canceled first.
+        """
+        if patient_id not in self.patients:
+            self.sink.write("\n❌ Patient not found!")
+            return False
+        self._release("patients", [patient_id], cascade)
+        self.patients.remove(patient_id)
+        self._journal("patients", "remove", id=patient_id)
+        self.sink.write("\n✅ Patient deleted successfully!")
+        return True
+
+    def delete_patient_many(self, patient_ids, cascade=False):
+        """Delete many patients all-or-nothing; see delete_many."""
+        return self.delete_many("patients", patient_ids, cascade)
 
     # Staff Methods
     def add_staff(self, staff):
-        """Add a new staff member if the ID is unique."""
-        if self._check_duplicate(self.staff, "staff_id", staff.staff_id):
-            print("Error: Staff with this ID already exists!")
-        else:
-            self.staff.append(staff)
-            print("\n✅ Staff added successfully!")
+        """Add a new staff member and return it; raise DuplicateRecordError if the ID is taken."""
+        if not self.staff.add(staff):
+            raise DuplicateRecordError("Staff with this ID already exists!")
+        self._journal("staff", "add", record=staff)
+        self.sink.write("\n✅ Staff added successfully!")
+        return staff
+
+    def add_staff_many(self, staff):
+        """Add many staff members all-or-nothing; see add_many."""
+        return self.add_many("staff", staff)
+
+    def update_staff_many(self, updates):
+        """Update many staff members all-or-nothing from {ID: {field: value}}; see update_many."""
+        return self.update_many("staff", updates)
 
     def list_staff_by_role(self, role):
-        """List all staff members with a specific role."""
+        """List all staff members with a specific role; return them."""
         self.display_header(f"Staff Members with Role: {role}")
-        found = [s for s in self.staff if s.role.lower() == role.lower()]
-        if found:
-            for staff in found:
-                print(vars(staff))
-        else:
-            print(f"No staff members found with role '{role}'.")
+        return self._show(
+            self.staff.find("role", role),
+            f"No staff members found with role '{role}'.",
+        )
 
     def delete_staff(self, staff_id):
-        """Delete a staff member by ID."""
-        self.staff = [s for s in self.staff if s.staff_id != staff_id]
-        print("\n✅ Staff deleted successfully!")
+        """Delete a staff member by ID; return True if it existed."""
+        if self.staff.remove(staff_id) is None:
+            self.sink.write("\n❌ Staff not found!")
+            return False
+        self._journal("staff", "remove", id=staff_id)
+        self.sink.write("\n✅ Staff deleted successfully!")
+        return True
+
+    def delete_staff_many(self, staff_ids):
+        """Delete many staff members all-or-nothing; see delete_many."""
+        return self.delete_many("staff", staff_ids)
 
     # Doctor Methods
     def add_doctor(self, doctor):
-        """Add a new doctor if the ID is unique."""
-        if self._check_duplicate(self.doctors, "doctor_id", doctor.doctor_id):
-            print("Error: Doctor with this ID already exists!")
-        else:
-            self.doctors.append(doctor)
-            print("\n✅ Doctor added successfully!")
+        """Add a new doctor and return it; raise DuplicateRecordError if the ID is taken."""
+        if not self.doctors.add(doctor):
+            raise DuplicateRecordError("Doctor with this ID already exists!")
+        self._journal("doctors", "add", record=doctor)
+        self.sink.write("\n✅ Doctor added successfully!")
+        return doctor
+
+    def add_doctor_many(self, doctors):
+        """Add many doctors all-or-nothing; see add_many."""
+        return self.add_many("doctors", doctors)
 
-    def delete_doctor(self, doctor_id):
-        """Delete a doctor by ID."""
-        self.doctors = [doc for doc in self.doctors if doc.doctor_id != doctor_id]
-        print("\n✅ Doctor deleted successfully!")
+    def update_doctor_many(self, updates):
+        """Update many doctors all-or-nothing from {ID: {field: value}}; see update_many."""
+        return self.update_many("doctors", updates)
+
+    def delete_doctor(self, doctor_id, cascade=False):
+        """Delete a doctor by ID; return True if it existed.
+
+        Raises IntegrityError if appointments still refer to the doctor,
+        unless cascade is set, in which case they are canceled first.
+        """
+        if doctor_id not in self.doctors:
+            self.sink.write("\n❌ Doctor not found!")
+            return False
+        self._release("doctors", [doctor_id], cascade)
+        self.doctors.remove(doctor_id)
+        self._journal("doctors", "remove", id=doctor_id)
+        self.sink.write("\n✅ Doctor deleted successfully!")
+        return True
+
+    def delete_doctor_many(self, doctor_ids, cascade=False):
+        """Delete many doctors all-or-nothing; see delete_many."""
+        return self.delete_many("doctors", doctor_ids, cascade)
 
     def edit_doctor(
         self, doctor_id, new_name=None, new_designation=None, new_phone=None
     ):
-        """Edit doctor details."""
-        for doctor in self.doctors:
-            if doctor.doctor_id == doctor_id:
-                if new_name:
-                    doctor.name = new_name
-                if new_designation:
-                    doctor.designation = new_designation
-                if new_phone:
-                    doctor.phone = new_phone
-                print("\n✅ Doctor details updated successfully!")
-                return
-        print("\n❌ Doctor not found!")
+        """Edit doctor details and return the doctor; raise RecordNotFoundError if missing."""
+        changes = {}
+        if new_name:
+            changes["name"] = new_name
+        if new_designation:
+            changes["designation"] = new_designation
+        if new_phone:
+            changes["phone"] = new_phone
+        for name, value in changes.items():
+            check_value("doctors", name, value)
+        doctor = self.doctors.update(doctor_id, **changes)
+        if doctor is None:
+            raise RecordNotFoundError("Doctor not found!")
+        self._journal("doctors", "update", id=doctor_id, fields=changes)
+        self.sink.write("\n✅ Doctor details updated successfully!")
+        return doctor
 
     def list_doctors_by_designation(self, designation):
-        """List all doctors with a specific designation."""
+        """List all doctors with a specific designation; return them."""
         self.display_header(f"Doctors with Designation: {designation}")
-        found = [
-            d for d in self.doctors if d.designation.lower() == designation.lower()
-        ]
-        if found:
-            for doctor in found:
-                print(vars(doctor))
-        else:
-            print(f"No doctors found with designation '{designation}'.")
+        return self._show(
+            self.doctors.find("designation", designation),
+            f"No doctors found with designation '{designation}'.",
+        )
 
     # Inventory Methods
+    def _notify_low_stock(self, item):
+        """Call every low-stock listener with an item that fell below its reorder level."""
+        for listener in self.low_stock_listeners:
+            listener(item)
+
     def add_inventory(self, item):
-        """Add a new inventory item if the ID is unique."""
-        if self._check_duplicate(self.inventory, "item_id", item.item_id):
-            print("Error: Inventory item with this ID already exists!")
-        else:
-            self.inventory.append(item)
-            print("\n✅ Inventory item added successfully!")
-
-    def update_inventory(self, item_id, new_quantity=None):
-        """Update inventory item quantity."""
-        for item in self.inventory:
-            if item.item_id == item_id:
-                if new_quantity is not None:
-                    item.quantity = new_quantity
-                print("\n✅ Inventory item updated successfully!")
-                return
-        print("\n❌ Inventory item not found!")
+        """Add a new inventory item and return it; raise DuplicateRecordError if the ID is taken."""
+        if not self.inventory.add(item):
+            raise DuplicateRecordError("Inventory item with this ID already exists!")
+        self._journal("inventory", "add", record=item)
+        self.sink.write("\n✅ Inventory item added successfully!")
+        if item.needs_reorder():
+            self._notify_low_stock(item)
+        return item
+
+    def add_inventory_many(self, items):
+        """Add many inventory items all-or-nothing; see add_many."""
+        return self.add_many("inventory", items)
+
+    def update_inventory_many(self, updates):
+        """Update many inventory items all-or-nothing from {ID: {field: value}}; see update_many."""
+        return self.update_many("inventory", updates)
+
+    def update_inventory(self, item_id, new_quantity=None, new_reorder_level=None):
+        """Update inventory item quantity and/or reorder level; return the item.
+
+        Raises RecordNotFoundError if there is no such item and ValueError
+        if a value is not a whole number. Low-stock
+        listeners fire when the item drops below its reorder level.
+        """
+        item = self.inventory.get(item_id)
+        if item is None:
+            raise RecordNotFoundError("Inventory item not found!")
+        was_low = item.needs_reorder()
+        changes = {}
+        if new_quantity is not None:
+            changes["quantity"] = new_quantity
+        if new_reorder_level is not None:
+            changes["reorder_level"] = new_reorder_level
+        for name, value in changes.items():
+            check_value("inventory", name, value)
+        self.inventory.update(item_id, **changes)
+        self._journal("inventory", "update", id=item_id, fields=changes)
+        self.sink.write("\n✅ Inventory item updated successfully!")
+        if not was_low and item.needs_reorder():
+            self._notify_low_stock(item)
+        return item
 
     def delete_inventory(self, item_id):
-        """Delete an inventory item by ID."""
-        self.inventory = [item for item in self.inventory if item.item_id != item_id]
-        print("\n✅ Inventory item deleted successfully!")
+        """Delete an inventory item by ID; return True if it existed."""
+        if self.inventory.remove(item_id) is None:
+            self.sink.write("\n❌ Inventory item not found!")
+            return False
+        self._journal("inventory", "remove", id=item_id)
+        self.sink.write("\n✅ Inventory item deleted successfully!")
+        return True
+
+    def delete_inventory_many(self, item_ids):
+        """Delete many inventory items all-or-nothing; see delete_many."""
+        return self.delete_many("inventory", item_ids)
 
     def list_low_stock_items(self, threshold):
-        """List inventory items with stock below a certain threshold."""
+        """List inventory items with stock below a certain threshold; return them."""
         self.display_header(f"Inventory Items with Stock Below {threshold}")
-        low_stock = [item for item in self.inventory if item.quantity < threshold]
-        if low_stock:
-            for item in low_stock:
-                print(vars(item))
-        else:
-            print("No items found with low stock.")
+        return self._show(
+            [self.inventory.get(item_id) for item_id in self.stock.below(threshold)],
+            "No items found with low stock.",
+        )
 
     # Appointment Methods
     def add_appointment(self, appointment):
-        """Add a new appointment if the ID is unique."""
-        if self._check_duplicate(
-            self.appointments, "appointment_id", appointment.appointment_id
+        """Add a new appointment and return it.
+
+        Raises IntegrityError if the patient or doctor does not exist,
+        SchedulingConflictError if the doctor is already booked at that
+        time, or DuplicateRecordError if the ID is taken.
+        """
+        if (
+            appointment.patient_id not in self.patients
+            or appointment.doctor_id not in self.doctors
         ):
-            print("Error: Appointment with this ID already exists!")
-        else:
-            self.appointments.append(appointment)
-            print("\n✅ Appointment added successfully!")
+            self._check_references(
+                "appointments", [(appointment.appointment_id, vars(appointment))]
+            )
+        if self.schedule.is_booked(appointment.doctor_id, appointment.starts_at):
+            raise SchedulingConflictError(
+                "Doctor is already booked at this date and time!"
+            )
+        if not self.appointments.add(appointment):
+            raise DuplicateRecordError("Appointment with this ID already exists!")
+        self._journal("appointments", "add", record=appointment)
+        self.sink.write("\n✅ Appointment added successfully!")
+        return appointment
+
+    def add_appointment_many(self, appointments):
+        """Add many appointments all-or-nothing; see add_many."""
+        return self.add_many("appointments", appointments)
+
+    def update_appointment_many(self, updates):
+        """Update many appointments all-or-nothing from {ID: {field: value}}; see update_many."""
+        return self.update_many("appointments", updates)
+
+    def list_appointments(self, limit=20, after=None, fields=None):
+        """Display one page of appointments; return the next page's cursor (None at the end)."""
+        return self.show_page(
+            "appointments", "List of Appointments", limit, after, fields
+        )
+
+    def _show_appointments(self, appointment_ids, empty_message):
+        """Display the given appointments in order and return them."""
+        return self._show(
+            [
+                self.appointments.get(appointment_id)
+                for appointment_id in appointment_ids
+            ],
+            empty_message,
+        )
+
+    def doctor_schedule(self, doctor_id, date):
+        """Display and return a doctor's appointments on date, sorted by time."""
+        self.display_header(f"Schedule for Doctor {doctor_id} on {date}")
+        day = to_timestamp(date) // DAY
+        return self._show_appointments(
+            self.schedule.doctor_day(doctor_id, day),
+            "No appointments booked for that day.",
+        )
+
+    def patient_appointments(self, patient_id, date=None, time="00:00"):
+        """Display and return a patient's appointments from date/time onwards."""
+        self.display_header(f"Appointments for Patient {patient_id}")
+        since = to_timestamp(date, time) if date is not None else None
+        return self._show_appointments(
+            self.schedule.patient_appointments(patient_id, since),
+            "No upcoming appointments found for that patient.",
+        )
+
+    def appointments_between(
+        self, start_date, end_date, start_time="00:00", end_time="00:00"
+    ):
+        """Display and return appointments starting in [start, end), sorted by time."""
+        start = to_timestamp(start_date, start_time)
+        end = to_timestamp(end_date, end_time)
+        self.display_header(
+            f"Appointments from {start_date} {start_time} to {end_date} {end_time}"
+        )
+        return self._show_appointments(
+            self.schedule.between(start, end), "No appointments found in that range."
+        )
+
+    def daily_schedule(self, date=None):
+        """Display and return all appointments on date (default today), sorted by time."""
+        if date is None:
+            date = datetime.date.today().isoformat()
+        self.display_header(f"Schedule for {date}")
+        start = to_timestamp(date)
+        return self._show_appointments(
+            self.schedule.between(start, start + DAY),
+            "No appointments booked for that day.",
+        )
 
-    def list_appointments(self):
-        """Display all appointments."""
-        self.display_header("List of Appointments")
-        for appointment in self.appointments:
-            print(vars(appointment))
+    def next_free_slot(self, doctor_id, date):
+        """Display and return the doctor's first free 'HH:MM' slot on date, or None."""
+        starts_at = self.schedule.next_free_slot(doctor_id, to_timestamp(date) // DAY)
+        if starts_at is None:
+            self.sink.write(f"\n❌ Doctor {doctor_id} has no free slots on {date}.")
+            return None
+        slot = from_timestamp(starts_at).strftime("%H:%M")
+        self.sink.write(f"\nNext free slot for Doctor {doctor_id} on {date}: {slot}")
+        return slot
 
     def cancel_appointment(self, appointment_id):
-        """Cancel an appointment by ID."""
-        self.appointments = [
-            app for app in self.appointments if app.appointment_id != appointment_id
-        ]
-        print("\n✅ Appointment canceled successfully!")
+        """Cancel an appointment by ID; return True if it existed."""
+        if self.appointments.remove(appointment_id) is None:
+            self.sink.write("\n❌ Appointment not found!")
+            return False
+        self._journal("appointments", "remove", id=appointment_id)
+        self.sink.write("\n✅ Appointment canceled successfully!")
+        return True
+
+    def cancel_appointment_many(self, appointment_ids):
+        """Cancel many appointments all-or-nothing; see delete_many."""
+        return self.delete_many("appointments", appointment_ids)
+
+
+# Menu Actions
+# Each action is a generator that yields its prompts and is sent the user's
+# answers, so the blocking menu below and the asyncio console can both
+# drive it; run_action() is the blocking driver.
+def page_through(hms, collection, title):
+    """Show a collection one page at a time until the user stops or it runs out."""
+    cursor = hms.show_page(collection, title)
+    while cursor is not None and (yield "Show more? (y/n): ").lower() == "y":
+        cursor = hms.show_page(collection, title, after=cursor)
+
+
+def add_patient(hms):
+    """Ask for a new patient's details and add it."""
+    hms.display_header("Add Patient")
+    patient_id = int((yield "Enter patient ID: "))
+    name = yield "Enter patient name: "
+    age = int((yield "Enter patient age: "))
+    gender = yield "Enter patient gender: "
+    diagnosis = yield "Enter patient diagnosis: "
+    hms.add_patient(Patient(patient_id, name, age, gender, diagnosis))
+
+
+def search_patients(hms):
+    """Search patients by name, a page at a time."""
+    name = yield "Enter patient name to search: "
+    found = hms.search_patient_by_name(name)
+    while len(found) == 20 and (yield "Show more? (y/n): ").lower() == "y":
+        found = hms.search_patient_by_name(name, after=found[-1].patient_id)
+
+
+def add_staff(hms):
+    """Ask for a new staff member's details and add it."""
+    staff_id = int((yield "Enter staff ID: "))
+    name = yield "Enter staff name: "
+    role = yield "Enter staff role: "
+    shift = yield "Enter staff shift: "
+    hms.add_staff(Staff(staff_id, name, role, shift))
+
+
+def list_staff(hms):
+    """List staff with a given role."""
+    role = yield "Enter role to filter staff by: "
+    hms.list_staff_by_role(role)
+
+
+def add_doctor(hms):
+    """Ask for a new doctor's details and add it."""
+    doctor_id = int((yield "Enter doctor ID: "))
+    name = yield "Enter doctor name: "
+    designation = yield "Enter doctor designation: "
+    phone = yield "Enter doctor phone: "
+    hms.add_doctor(Doctor(doctor_id, name, designation, phone))
+
+
+def list_doctors(hms):
+    """List doctors with a given designation."""
+    designation = yield "Enter designation to filter doctors by: "
+    hms.list_doctors_by_designation(designation)
+
+
+def edit_doctor(hms):
+    """Change a doctor's name, designation or phone."""
+    doctor_id = int((yield "Enter doctor ID to edit: "))
+    name = yield "Enter new name (leave blank to keep): "
+    designation = yield "Enter new designation (leave blank to keep): "
+    phone = yield "Enter new phone (leave blank to keep): "
+    hms.edit_doctor(doctor_id, name, designation, phone)
+
+
+def add_inventory(hms):
+    """Ask for a new inventory item's details and add it."""
+    item_id = int((yield "Enter item ID: "))
+    item_name = yield "Enter item name: "
+    quantity = int((yield "Enter item quantity: "))
+    reorder_level = yield "Enter reorder level (leave blank to skip): "
+    hms.add_inventory(
+        Inventory(
+            item_id,
+            item_name,
+            quantity,
+            int(reorder_level) if reorder_level else None,
+        )
+    )
+
+
+def update_inventory(hms):
+    """Change an item's quantity or reorder level."""
+    item_id = int((yield "Enter item ID to update: "))
+    quantity = yield "Enter new quantity (leave blank to keep): "
+    reorder_level = yield "Enter new reorder level (leave blank to keep): "
+    hms.update_inventory(
+        item_id,
+        int(quantity) if quantity else None,
+        int(reorder_level) if reorder_level else None,
+    )
+
+
+def list_low_stock(hms):
+    """List items with stock below a given threshold."""
+    threshold = int((yield "Enter stock threshold: "))
+    hms.list_low_stock_items(threshold)
+
+
+def add_appointment(hms):
+    """Ask for a new appointment's details and book it."""
+    appointment_id = int((yield "Enter appointment ID: "))
+    patient_id = int((yield "Enter patient ID: "))
+    doctor_id = int((yield "Enter doctor ID: "))
+    date = yield "Enter appointment date (YYYY-MM-DD): "
+    time = yield "Enter appointment time (HH:MM): "
+    try:
+        appointment = Appointment(appointment_id, patient_id, doctor_id, date, time)
+    except ValueError:
+        hms.sink.write("\n❌ Invalid date or time!")
+    else:
+        hms.add_appointment(appointment)
+
+
+def cancel_appointment(hms):
+    """Cancel an appointment by ID."""
+    appointment_id = int((yield "Enter appointment ID to cancel: "))
+    hms.cancel_appointment(appointment_id)
+
+
+def list_appointments(hms):
+    """Show all appointments, a page at a time."""
+    yield from page_through(hms, "appointments", "List of Appointments")
+
+
+def delete_record(method, label, cascades):
+    """Return an action deleting one record by ID with hms.<method>."""
+
+    def delete(hms):
+        """Ask for an ID (and, if it can cascade, whether to cascade), then delete."""
+        record_id = int((yield f"Enter {label} ID to delete: "))
+        remove = getattr(hms, method)
+        if not cascades:
+            remove(record_id)
+            return
+        answer = yield "Also cancel their appointments? (y/n): "
+        remove(record_id, cascade=answer.lower() == "y")
+
+    return delete
+
+
+# (menu label, action, whether it writes): the record operations both menus offer.
+MENU_ACTIONS = (
+    ("Add Patient", add_patient, True),
+    ("Search Patient by Name", search_patients, False),
+    ("Add Staff", add_staff, True),
+    ("List Staff by Role", list_staff, False),
+    ("Add Doctor", add_doctor, True),
+    ("List Doctors by Designation", list_doctors, False),
+    ("Add Inventory", add_inventory, True),
+    ("List Low Stock Items", list_low_stock, False),
+    ("Add Appointment", add_appointment, True),
+    ("Cancel Appointment", cancel_appointment, True),
+    ("Edit Doctor", edit_doctor, True),
+    ("Update Inventory", update_inventory, True),
+    ("Delete Patient", delete_record("delete_patient", "patient", True), True),
+    ("Delete Staff", delete_record("delete_staff", "staff", False), True),
+    ("Delete Doctor", delete_record("delete_doctor", "doctor", True), True),
+    ("Delete Inventory Item", delete_record("delete_inventory", "item", False), True),
+    ("List All Appointments", list_appointments, False),
+)
+
+
+def run_action(steps, ask):
+    """Run a started menu action to completion, answering each prompt with ask(prompt)."""
+    answer = None
+    while True:
+        try:
+            prompt = steps.send(answer)
+        except StopIteration:
+            return
+        answer = ask(prompt)
+
+
+def announce_low_stock(hms):
+    """Print a warning whenever an item falls below its reorder level."""
+    hms.low_stock_listeners.append(
+        lambda item: hms.sink.write(
+            f"⚠️  Low stock: {item.item_name} ({item.quantity} left, "
+            f"reorder level {item.reorder_level})"
+        )
+    )
 
 
 # Main Function with Login
 def main():
-    hms = HospitalManagementSystem()
+    import snapshot  # snapshot imports this module
+
+    sink = StreamSink(sys.stdout)
+    say = sink.write
+    hms = HospitalManagementSystem(LogStorage("hospital_data"), sink)
+    snapshot.recover(hms)
+    metrics = Metrics(hms)
+
+    def ask(prompt):
+        """Flush buffered output, then read one line from the user."""
+        sink.flush()
+        return input(prompt)
+
     hms.display_header("Welcome to the Hospital Management System")
 
     # Login Process
     for _ in range(3):
-        username = input("Enter username: ")
-        password = input("Enter password: ")
+        username = ask("Enter username: ")
+        password = ask("Enter password: ")
         if username == "jadu" and password == hms.admin_password:
-            print("\n✅ Login successful!")
+            say("\n✅ Login successful!")
             break
     else:
-        print("\n❌ Too many failed attempts. Exiting.")
+        say("\n❌ Too many failed attempts. Exiting.")
+        sink.flush()
         return
 
+    announce_low_stock(hms)
+
     # Main Menu
+    first = len(MENU_ACTIONS)
     while True:
         hms.display_header("Main Menu")
-        print("1. Add Patient")
-        print("2. Search Patient by Name")
-        print("3. Add Staff")
-        print("4. List Staff by Role")
-        print("5. Add Doctor")
-        print("6. List Doctors by Designation")
-        print("7. Add Inventory")
-        print("8. List Low Stock Items")
-        print("9. Add Appointment")
-        print("10. Cancel Appointment")
-        print("11. Exit")
-
-        choice = int(input("Enter your choice: "))
-
-        if choice == 1:
-            hms.display_header("Add Patient")
-            patient_id = int(input("Enter patient ID: "))
-            name = input("Enter patient name: ")
-            age = int(input("Enter patient age: "))
-            gender = input("Enter patient gender: ")
-            diagnosis = input("Enter patient diagnosis: ")
-            hms.add_patient(Patient(patient_id, name, age, gender, diagnosis))
-
-        elif choice == 2:
-            name = input("Enter patient name to search: ")
-            hms.search_patient_by_name(name)
-
-        elif choice == 3:
-            staff_id = int(input("Enter staff ID: "))
-            name = input("Enter staff name: ")
-            role = input("Enter staff role: ")
-            shift = input("Enter staff shift: ")
-            hms.add_staff(Staff(staff_id, name, role, shift))
-
-        elif choice == 4:
-            role = input("Enter role to filter staff by: ")
-            hms.list_staff_by_role(role)
-
-        elif choice == 5:
-            doctor_id = int(input("Enter doctor ID: "))
-            name = input("Enter doctor name: ")
-            designation = input("Enter doctor designation: ")
-            phone = input("Enter doctor phone: ")
-            hms.add_doctor(Doctor(doctor_id, name, designation, phone))
-
-        elif choice == 6:
-            designation = input("Enter designation to filter doctors by: ")
-            hms.list_doctors_by_designation(designation)
-
-        elif choice == 7:
-            item_id = int(input("Enter item ID: "))
-            item_name = input("Enter item name: ")
-            quantity = int(input("Enter item quantity: "))
-            hms.add_inventory(Inventory(item_id, item_name, quantity))
-
-        elif choice == 8:
-            threshold = int(input("Enter stock threshold: "))
-            hms.list_low_stock_items(threshold)
-
-        elif choice == 9:
-            appointment_id = int(input("Enter appointment ID: "))
-            patient_id = int(input("Enter patient ID: "))
-            doctor_id = int(input("Enter doctor ID: "))
-            date = input("Enter appointment date (YYYY-MM-DD): ")
-            time = input("Enter appointment time (HH:MM): ")
-            hms.add_appointment(
-                Appointment(appointment_id, patient_id, doctor_id, date, time)
-            )
+        for number, (label, _, _) in enumerate(MENU_ACTIONS, 1):
+            say(f"{number}. {label}")
+        say(f"{first + 1}. Show All Information")
+        say(f"{first + 2}. {'Disable' if metrics.enabled else 'Enable'} Metrics")
+        say(f"{first + 3}. {'Stop' if metrics.profiling else 'Start'} Profiling")
+        say(f"{first + 4}. Exit")
 
-        elif choice == 10:
-            appointment_id = int(input("Enter appointment ID to cancel: "))
-            hms.cancel_appointment(appointment_id)
+        choice = int(ask("Enter your choice: "))
 
-        elif choice == 11:
-            print("\nExiting the system. Goodbye!")
-            break
+        try:
+            if 1 <= choice <= first:
+                run_action(MENU_ACTIONS[choice - 1][1](hms), ask)
 
-        else:
-            print("\n❌ Invalid choice! Please try again.")
+            elif choice == first + 1:
+                hms.show_summary()
+                for collection in hms.RECORD_TYPES:
+                    run_action(page_through(hms, collection, collection.title()), ask)
+
+            elif choice == first + 2:
+                if metrics.enabled:
+                    metrics.disable()
+                    hms.display_header("Operation Metrics")
+                    say(metrics.report())
+                else:
+                    metrics.enable()
+                    say("\n✅ Metrics enabled; disable them to see the report.")
+
+            elif choice == first + 3:
+                if metrics.profiling:
+                    hms.display_header("Profile")
+                    say(metrics.stop_profile())
+                else:
+                    metrics.start_profile()
+                    say("\n✅ Profiling started; stop it to see the results.")
+
+            elif choice == first + 4:
+                if metrics.profiling:
+                    metrics.stop_profile()
+                snapshot.checkpoint(hms)
+                hms.close()
+                say("\nExiting the system. Goodbye!")
+                sink.flush()
+                break
+
+            else:
+                say("\n❌ Invalid choice! Please try again.")
+        except HospitalError as error:
+            say(f"Error: {error}")
+
+        hms.storage.flush()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,203 @@
+import cProfile
+import functools
+import io
+import pstats
+import time
+from bisect import bisect_left
+
+# Latency bucket upper bounds: 1 µs to about 18 minutes, four per doubling,
+# so a percentile read from its bucket is at most 19% above the true value.
+BOUNDS = [1e-6 * 2 ** (step / 4) for step in range(120)]
+QUANTILES = (0.5, 0.95, 0.99)
+# Methods whose names start with one of these are instrumented by default.
+INSTRUMENTED = ("add_", "search_", "list_", "delete_", "edit_", "update_", "cancel_")
+
+
+class OperationStats:
+    """Call count, error count and latency histogram of one method."""
+
+    __slots__ = ("buckets", "calls", "errors", "total", "maximum")
+
+    def __init__(self):
+        """Initialize empty statistics."""
+        self.buckets = [0] * (len(BOUNDS) + 1)
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def observe(self, seconds):
+        """Record one call that took seconds."""
+        self.buckets[bisect_left(BOUNDS, seconds)] += 1
+        self.calls += 1
+        self.total += seconds
+        if seconds > self.maximum:
+            self.maximum = seconds
+
+    def quantile(self, fraction):
+        """Return the latency below which fraction of calls fell (0.0 if none)."""
+        rank = fraction * self.calls
+        seen = 0
+        for position, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= rank:
+                if position == len(BOUNDS):
+                    return self.maximum
+                return min(BOUNDS[position], self.maximum)
+        return 0.0
+
+
+class Metrics:
+    """Opt-in per-operation metrics and profiling for a HospitalManagementSystem.
+
+    enable() shadows each instrumented method on the instance with a
+    wrapper that counts calls and errors and records latency; disable()
+    removes the wrappers again, so a system without metrics enabled runs
+    its own methods untouched. Nested calls (add_patient_many calling
+    add_many) are each timed, inclusive of the calls beneath them. The
+    wrappers take no lock, so counts may drift slightly when many threads
+    share a ConcurrentHospitalManagementSystem.
+    """
+
+    def __init__(self, hms, methods=None):
+        """Initialize metrics for hms over methods (default: every add/search/list/delete/edit/update/cancel method)."""
+        self.hms = hms
+        self.methods = (
+            methods
+            if methods is not None
+            else sorted(
+                name
+                for name in dir(type(hms))
+                if name.startswith(INSTRUMENTED) and callable(getattr(type(hms), name))
+            )
+        )
+        self.operations = {}
+        self._profiler = None
+
+    @property
+    def enabled(self):
+        """Whether the timing wrappers are installed."""
+        return any(name in vars(self.hms) for name in self.methods)
+
+    @property
+    def profiling(self):
+        """Whether a cProfile session is running."""
+        return self._profiler is not None
+
+    # Instrumentation
+    def _wrap(self, name, method):
+        """Return method wrapped to record its calls in self.operations[name]."""
+        stats = self.operations.setdefault(name, OperationStats())
+        clock = time.perf_counter
+
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            except Exception:
+                stats.errors += 1
+                raise
+            finally:
+                stats.observe(clock() - start)
+
+        return wrapper
+
+    def enable(self):
+        """Start recording every instrumented method."""
+        if self.enabled:
+            return
+        for name in self.methods:
+            setattr(self.hms, name, self._wrap(name, getattr(self.hms, name)))
+
+    def disable(self):
+        """Stop recording; collected statistics are kept until reset()."""
+        for name in self.methods:
+            vars(self.hms).pop(name, None)
+
+    def reset(self):
+        """Discard collected statistics."""
+        for stats in self.operations.values():
+            stats.__init__()
+
+    def collection_sizes(self):
+        """Return the number of records in each collection."""
+        return {
+            collection: len(getattr(self.hms, collection))
+            for collection in self.hms.RECORD_TYPES
+        }
+
+    # Export
+    def report(self):
+        """Return a plain-text table of calls, errors and latency percentiles."""
+        lines = [
+            f"{'operation':<32} {'calls':>10} {'errors':>7} "
+            f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+        ]
+        for name, stats in sorted(self.operations.items()):
+            if not stats.calls:
+                continue
+            p50, p95, p99 = (stats.quantile(q) * 1000 for q in QUANTILES)
+            lines.append(
+                f"{name:<32} {stats.calls:>10,} {stats.errors:>7,} "
+                f"{p50:>9.3f} {p95:>9.3f} {p99:>9.3f}"
+            )
+        lines.append("")
+        for collection, size in self.collection_sizes().items():
+            lines.append(f"{collection:<32} {size:>10,} records")
+        return "\n".join(lines)
+
+    def prometheus(self):
+        """Return the metrics in the Prometheus text exposition format."""
+        operations = sorted(
+            (name, stats) for name, stats in self.operations.items() if stats.calls
+        )
+        lines = [
+            "# HELP hms_operation_duration_seconds Latency of HospitalManagementSystem operations.",
+            "# TYPE hms_operation_duration_seconds summary",
+        ]
+        for name, stats in operations:
+            label = f'operation="{name}"'
+            for fraction in QUANTILES:
+                lines.append(
+                    f'hms_operation_duration_seconds{{{label},quantile="{fraction}"}} '
+                    f"{stats.quantile(fraction):.9f}"
+                )
+            lines.append(
+                f"hms_operation_duration_seconds_sum{{{label}}} {stats.total:.9f}"
+            )
+            lines.append(
+                f"hms_operation_duration_seconds_count{{{label}}} {stats.calls}"
+            )
+        lines += [
+            "# HELP hms_operation_errors_total Operations that raised an exception.",
+            "# TYPE hms_operation_errors_total counter",
+        ]
+        for name, stats in operations:
+            lines.append(
+                f'hms_operation_errors_total{{operation="{name}"}} {stats.errors}'
+            )
+        lines += [
+            "# HELP hms_collection_size Records currently held in each collection.",
+            "# TYPE hms_collection_size gauge",
+        ]
+        for collection, size in self.collection_sizes().items():
+            lines.append(f'hms_collection_size{{collection="{collection}"}} {size}')
+        return "\n".join(lines) + "\n"
+
+    # Profiling
+    def start_profile(self):
+        """Start a cProfile session covering everything the process runs."""
+        if self._profiler is None:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def stop_profile(self, sort="cumulative", limit=20):
+        """Stop the cProfile session; return its top limit functions by sort as text."""
+        profiler, self._profiler = self._profiler, None
+        if profiler is None:
+            return ""
+        profiler.disable()
+        stream = io.StringIO()
+        pstats.Stats(profiler, stream=stream).sort_stats(sort).print_stats(limit)
+        return stream.getvalue()
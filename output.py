@@ -0,0 +1,52 @@
+import sys
+
+
+class Sink:
+    """Output sink interface; the default implementation discards everything.
+
+    HospitalManagementSystem reports progress messages and listings here
+    instead of printing, so library and server callers pay no I/O per call.
+    """
+
+    def write(self, line):
+        """Emit one line of output (any object; it is shown as str(line))."""
+
+    def write_records(self, records):
+        """Emit one line per record, showing its field values."""
+
+    def flush(self):
+        """Deliver any buffered output."""
+
+
+class StreamSink(Sink):
+    """Buffers output lines and writes them to a text stream in batches.
+
+    Lines are formatted and written together once buffer_size are pending or
+    flush() is called, so an interactive caller should flush before it
+    prompts. Not safe for concurrent writers without external locking.
+    """
+
+    def __init__(self, stream=None, buffer_size=256):
+        """Initialize a sink writing to stream (default: sys.stdout)."""
+        self.stream = stream if stream is not None else sys.stdout
+        self.buffer_size = buffer_size
+        self._lines = []
+
+    def write(self, line):
+        """Buffer a line, flushing once the buffer is full."""
+        self._lines.append(line)
+        if len(self._lines) >= self.buffer_size:
+            self.flush()
+
+    def write_records(self, records):
+        """Buffer each record's field dict, flushing once the buffer is full."""
+        self._lines.extend(map(vars, records))
+        if len(self._lines) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """Write every buffered line with a single stream write."""
+        if self._lines:
+            self.stream.write("\n".join(map(str, self._lines)) + "\n")
+            self._lines.clear()
+        self.stream.flush()
@@ -0,0 +1,474 @@
+import contextlib
+import functools
+import heapq
+import itertools
+import keyword
+import operator
+
+from indexes import FieldIndex, NameIndex, ScheduleIndex, StockIndex, normalize
+
+# Bounds for open-ended appointment time ranges, in epoch seconds.
+EARLIEST, LATEST = -(2**62), 2**62
+
+
+# Predicates
+class Predicate:
+    """A condition on one record; combine them with &, | and ~."""
+
+    def __and__(self, other):
+        return All(self, other)
+
+    def __or__(self, other):
+        return Any(self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+    def conjuncts(self):
+        """Return the predicates that must all hold for this one to hold."""
+        return [self]
+
+    def compile(self):
+        """Return a function of one record that evaluates this predicate."""
+        raise NotImplementedError
+
+
+def _filter(predicates):
+    """Return a function yielding the records of an iterable that satisfy every predicate.
+
+    Each predicate becomes one filter() stage, so the chain runs without a
+    Python-level loop of its own.
+    """
+    tests = [predicate.compile() for predicate in predicates]
+
+    def matching(records):
+        for test in tests:
+            records = filter(test, records)
+        return records
+
+    return matching
+
+
+def _both(first, second):
+    return lambda record: first(record) and second(record)
+
+
+def _either(first, second):
+    return lambda record: first(record) or second(record)
+
+
+class Compare(Predicate):
+    """One field tested against a value.
+
+    ==, != and one_of ignore case for strings, like Registry.find, and
+    contains/startswith ignore case, like name search. Ordering tests are
+    false for a None field.
+    """
+
+    # Test factories: each takes a field getter and the operand and returns
+    # a function of one record.
+    TESTS = {
+        "==": lambda get, c: lambda r: get(r) == c,
+        "!=": lambda get, c: lambda r: get(r) != c,
+        "<": lambda get, c: lambda r: (v := get(r)) is not None and v < c,
+        "<=": lambda get, c: lambda r: (v := get(r)) is not None and v <= c,
+        ">": lambda get, c: lambda r: (v := get(r)) is not None and v > c,
+        ">=": lambda get, c: lambda r: (v := get(r)) is not None and v >= c,
+        "in": lambda get, c: lambda r: normalize(get(r)) in c,
+        "contains": lambda get, c: lambda r: (
+            (v := get(r)) is not None and c in v.lower()
+        ),
+        "startswith": lambda get, c: lambda r: (
+            (v := get(r)) is not None and v.lower().startswith(c)
+        ),
+    }
+    # Case-insensitive equality, used when the operand is a string.
+    TEXT_TESTS = {
+        "==": lambda get, c: lambda r: isinstance(v := get(r), str) and v.lower() == c,
+        "!=": lambda get, c: lambda r: not (
+            isinstance(v := get(r), str) and v.lower() == c
+        ),
+    }
+
+    def __init__(self, field, op, value):
+        """Initialize a test of field with op ("==", "<", "in", "contains", ...) against value."""
+        if op not in self.TESTS:
+            raise ValueError(f"Unknown operator '{op}'")
+        if not field.isidentifier() or keyword.iskeyword(field):
+            raise ValueError(f"Invalid field name '{field}'")
+        self.field = field
+        self.op = op
+        self.value = value
+
+    def __repr__(self):
+        return f"{self.field} {self.op} {self.value!r}"
+
+    def operand(self):
+        """Return value in the form the test compares against."""
+        if self.op in ("==", "!="):
+            return normalize(self.value)
+        if self.op == "in":
+            return {normalize(value) for value in self.value}
+        if self.op in ("contains", "startswith"):
+            return self.value.lower()
+        return self.value
+
+    def compile(self):
+        operand = self.operand()
+        tests = self.TEXT_TESTS if isinstance(operand, str) else {}
+        factory = tests.get(self.op, self.TESTS[self.op])
+        return factory(operator.attrgetter(self.field), operand)
+
+
+class All(Predicate):
+    """Holds when every part holds."""
+
+    def __init__(self, *parts):
+        """Initialize the conjunction of parts."""
+        self.parts = parts
+
+    def __repr__(self):
+        return "(" + " and ".join(map(repr, self.parts)) + ")"
+
+    def conjuncts(self):
+        return [conjunct for part in self.parts for conjunct in part.conjuncts()]
+
+    def compile(self):
+        return functools.reduce(_both, [part.compile() for part in self.parts])
+
+
+class Any(Predicate):
+    """Holds when at least one part holds."""
+
+    def __init__(self, *parts):
+        """Initialize the disjunction of parts."""
+        self.parts = parts
+
+    def __repr__(self):
+        return "(" + " or ".join(map(repr, self.parts)) + ")"
+
+    def compile(self):
+        return functools.reduce(_either, [part.compile() for part in self.parts])
+
+
+class Not(Predicate):
+    """Holds when its part does not."""
+
+    def __init__(self, part):
+        """Initialize the negation of part."""
+        self.part = part
+
+    def __repr__(self):
+        return f"not {self.part!r}"
+
+    def compile(self):
+        test = self.part.compile()
+        return lambda record: not test(record)
+
+
+class Field:
+    """Builds predicates on one field: Field("age") > 65, Field("name").contains("ali")."""
+
+    __hash__ = None
+
+    def __init__(self, name):
+        """Initialize a reference to the named field."""
+        self.name = name
+
+    def __eq__(self, value):
+        return Compare(self.name, "==", value)
+
+    def __ne__(self, value):
+        return Compare(self.name, "!=", value)
+
+    def __lt__(self, value):
+        return Compare(self.name, "<", value)
+
+    def __le__(self, value):
+        return Compare(self.name, "<=", value)
+
+    def __gt__(self, value):
+        return Compare(self.name, ">", value)
+
+    def __ge__(self, value):
+        return Compare(self.name, ">=", value)
+
+    def one_of(self, values):
+        """Match records whose field equals any of values."""
+        return Compare(self.name, "in", list(values))
+
+    def contains(self, text):
+        """Match records whose field contains text, ignoring case."""
+        return Compare(self.name, "contains", text)
+
+    def startswith(self, text):
+        """Match records whose field starts with text, ignoring case."""
+        return Compare(self.name, "startswith", text)
+
+
+# Planning
+class Access:
+    """One way to produce candidate IDs, with the conjuncts it fully answers.
+
+    cost is the exact number of candidates when it is cheap to know, or
+    None when it is only known by running the lookup.
+    """
+
+    def __init__(self, description, cost, fetch, answers):
+        """Initialize an access path; fetch() returns the candidate IDs."""
+        self.description = description
+        self.cost = cost
+        self.fetch = fetch
+        self.answers = answers
+
+
+def _paths(registry, conjuncts):
+    """Yield every index access path that answers some of conjuncts."""
+    comparisons = [part for part in conjuncts if isinstance(part, Compare)]
+    for part in comparisons:
+        if part.field == registry.key and part.op in ("==", "in"):
+            ids = [part.value] if part.op == "==" else list(dict.fromkeys(part.value))
+            yield Access(
+                f"ID lookup {part!r}",
+                len(ids),
+                lambda ids=ids: [
+                    record_id for record_id in ids if record_id in registry
+                ],
+                [part],
+            )
+    for index in registry.indexes:
+        if isinstance(index, FieldIndex):
+            for part in comparisons:
+                if part.field == index.field and part.op in ("==", "in"):
+                    values = [part.value] if part.op == "==" else part.value
+                    values = list(
+                        {normalize(value): value for value in values}.values()
+                    )
+                    yield Access(
+                        f"FieldIndex({index.field}) {part!r}",
+                        sum(map(index.count, values)),
+                        lambda index=index, values=values: [
+                            record_id
+                            for value in values
+                            for record_id in index.lookup(value)
+                        ],
+                        [part],
+                    )
+        elif isinstance(index, StockIndex):
+            for part in comparisons:
+                if part.field != index.field:
+                    continue
+                if part.op == "<":
+                    bound = part.value
+                elif part.op == "<=" and isinstance(part.value, int):
+                    bound = part.value + 1
+                else:
+                    continue
+                yield Access(
+                    f"StockIndex({index.field}) {part!r}",
+                    index.count_below(bound),
+                    lambda index=index, bound=bound: index.below(bound),
+                    [part],
+                )
+        elif isinstance(index, NameIndex):
+            for part in comparisons:
+                if part.field == index.field and part.op in ("contains", "startswith"):
+                    yield Access(
+                        f"NameIndex({index.field}) {part!r}",
+                        None,
+                        lambda index=index, part=part: index.search(
+                            part.value, part.op == "startswith", len(index)
+                        ),
+                        [part],
+                    )
+        elif isinstance(index, ScheduleIndex):
+            bounds = [
+                part
+                for part in comparisons
+                if part.field == "starts_at" and part.op in ("<", "<=", ">", ">=")
+            ]
+            if bounds:
+                # Only whole-number > and <= bounds can be made exact with +1;
+                # other values narrow the range but stay in the residual filter.
+                start, end = EARLIEST, LATEST
+                answered = []
+                for part in bounds:
+                    exact = part.op in (">=", "<") or isinstance(part.value, int)
+                    if part.op == ">=":
+                        start = max(start, part.value)
+                    elif part.op == ">":
+                        start = max(start, part.value + 1 if exact else part.value)
+                    elif part.op == "<":
+                        end = min(end, part.value)
+                    elif exact:
+                        end = min(end, part.value + 1)
+                    else:
+                        continue
+                    if exact:
+                        answered.append(part)
+                yield Access(
+                    "ScheduleIndex " + " and ".join(map(repr, bounds)),
+                    None,
+                    lambda index=index, start=start, end=end: index.between(start, end),
+                    answered,
+                )
+
+
+def _choose(paths):
+    """Pick the path with the fewest known candidates, else the first unknown one."""
+    known = [path for path in paths if path.cost is not None]
+    if known:
+        return min(known, key=lambda path: path.cost)
+    return paths[0] if paths else None
+
+
+class Plan:
+    """How a query will run: an access path (or a full scan) plus a residual filter."""
+
+    def __init__(self, registry, access, residual):
+        """Initialize the plan; residual is the list of conjuncts left to test per record."""
+        self.registry = registry
+        self.access = access
+        self.residual = residual
+        self.filter = _filter(residual) if residual else None
+
+    def records(self):
+        """Yield the matching records, in index order or insertion order for a scan."""
+        registry = self.registry
+        if self.access is None:
+            candidates = iter(registry)
+        else:
+            candidates = map(registry.get, self.access.fetch())
+        if self.filter is None:
+            return candidates
+        return self.filter(candidates)
+
+
+class Query:
+    """A composable read-only query over one collection.
+
+    Build one with HospitalManagementSystem.query(collection) and chain
+    where(), order_by(), limit() and select(); each returns a new Query.
+    Running it plans the filter: among the ID and secondary indexes that
+    can answer part of it, the one with the fewest candidates is used and
+    the rest of the filter is tested in one pass over those candidates;
+    with no usable index, the whole collection is scanned once. explain()
+    shows the plan. guard, if given, returns a context manager that is held
+    while the query runs, such as a read lock on the collection.
+    """
+
+    def __init__(self, registry, name, guard=contextlib.nullcontext):
+        """Initialize a query matching every record of registry (named name)."""
+        self.registry = registry
+        self.name = name
+        self.guard = guard
+        self._predicates = ()
+        self._order = ()
+        self._descending = False
+        self._limit = None
+        self._fields = None
+
+    def _replace(self, **changes):
+        query = Query.__new__(Query)
+        query.__dict__.update(self.__dict__, **changes)
+        return query
+
+    def where(self, *predicates, **equals):
+        """Also require each predicate, and each field=value given as a keyword."""
+        predicates += tuple(
+            Compare(field, "==", value) for field, value in equals.items()
+        )
+        return self._replace(_predicates=self._predicates + predicates)
+
+    def order_by(self, *fields, descending=False):
+        """Sort results by fields (None values last, or first when descending)."""
+        return self._replace(_order=fields, _descending=descending)
+
+    def limit(self, count):
+        """Return at most count results."""
+        return self._replace(_limit=count)
+
+    def select(self, *fields):
+        """Return dicts of just these fields instead of records."""
+        return self._replace(_fields=fields)
+
+    def plan(self):
+        """Choose an access path for the current filter; return the Plan."""
+        conjuncts = [
+            conjunct
+            for predicate in self._predicates
+            for conjunct in predicate.conjuncts()
+        ]
+        access = _choose(list(_paths(self.registry, conjuncts)))
+        answered = access.answers if access is not None else []
+        residual = [
+            conjunct
+            for conjunct in conjuncts
+            if not any(conjunct is part for part in answered)
+        ]
+        return Plan(self.registry, access, residual)
+
+    def __iter__(self):
+        return iter(self.run())
+
+    def run(self):
+        """Execute the query; return a list of records (or dicts after select())."""
+        with self.guard():
+            return self._run()
+
+    def _run(self):
+        records = self.plan().records()
+        if self._order:
+            get = operator.attrgetter(*self._order)
+            if len(self._order) == 1:
+                key = lambda record: ((value := get(record)) is None, value)
+            else:
+                key = lambda record: tuple(
+                    (value is None, value) for value in get(record)
+                )
+            if self._limit is None:
+                records = sorted(records, key=key, reverse=self._descending)
+            elif self._descending:
+                records = heapq.nlargest(self._limit, records, key=key)
+            else:
+                records = heapq.nsmallest(self._limit, records, key=key)
+        elif self._limit is not None:
+            records = itertools.islice(records, self._limit)
+        if self._fields is None:
+            return list(records)
+        fields = self._fields
+        return [
+            {field: getattr(record, field) for field in fields} for record in records
+        ]
+
+    def count(self):
+        """Return how many records match, ignoring order, limit and select."""
+        with self.guard():
+            return sum(1 for _ in self.plan().records())
+
+    def explain(self):
+        """Describe how the query would run, one step per line."""
+        with self.guard():
+            return self._explain()
+
+    def _explain(self):
+        plan = self.plan()
+        lines = [f"query {self.name}"]
+        if plan.access is None:
+            lines.append(f"  access: full scan of {len(self.registry):,} records")
+        else:
+            cost = plan.access.cost
+            lines.append(
+                f"  access: {plan.access.description}"
+                + ("" if cost is None else f" ({cost:,} candidates)")
+            )
+        if plan.residual:
+            lines.append("  filter: " + " and ".join(map(repr, plan.residual)))
+        if self._order:
+            direction = " descending" if self._descending else ""
+            lines.append(f"  order: {', '.join(self._order)}{direction}")
+        if self._limit is not None:
+            lines.append(f"  limit: {self._limit}")
+        if self._fields is not None:
+            lines.append(f"  select: {', '.join(self._fields)}")
+        return "\n".join(lines)
@@ -0,0 +1,305 @@
+from bisect import bisect_left, bisect_right
+
+from indexes import FieldIndex, normalize
+
+
+def _insert_all(index, pairs):
+    """Insert (record_id, record) pairs into an index, in bulk if it supports that.
+
+    If an insert raises, the pairs already inserted are removed again, so
+    the index is left as it was.
+    """
+    insert_many = getattr(index, "insert_many", None)
+    if insert_many is not None:
+        insert_many(pairs)
+        return
+    done = 0
+    try:
+        for record_id, record in pairs:
+            index.insert(record_id, record)
+            done += 1
+    except Exception:
+        for record_id, record in pairs[:done]:
+            index.remove(record_id, record)
+        raise
+
+
+def _remove_all(index, pairs):
+    """Remove (record_id, record) pairs from an index, in bulk if it supports that."""
+    remove_many = getattr(index, "remove_many", None)
+    if remove_many is not None:
+        remove_many(pairs)
+    else:
+        for record_id, record in pairs:
+            index.remove(record_id, record)
+
+
+class Registry:
+    """Insertion-ordered collection of records keyed by their primary ID.
+
+    Secondary indexes attached with add_index() are kept in sync on every
+    add, update and remove. An index exposes a ``fields`` set naming the
+    attributes it depends on, plus ``insert(record_id, record)``,
+    ``remove(record_id, record)`` and ``clear()``. Indexes may also offer
+    ``insert_many(pairs)`` and ``remove_many(pairs)`` over (record_id,
+    record) pairs, which batch operations use in place of one call per record.
+    An insert or insert_many that raises must leave its index unchanged;
+    the registry then undoes the other indexes and stores nothing.
+
+    Every record also gets a monotonically increasing sequence number that
+    serves as a stable pagination cursor: scan(after=cursor) resumes right
+    after it even if records were deleted in between. Deleted slots are
+    tombstoned and compacted once they make up half of the order list.
+    """
+
+    def __init__(self, key):
+        """Initialize an empty registry keyed on the given attribute name."""
+        self.key = key
+        self._records = {}
+        self._indexes = []
+        self.field_indexes = {}
+        self._sequence = {}
+        self._order_seqs = []
+        self._order_ids = []
+        self._next_seq = 0
+        self._tombstones = 0
+
+    def __len__(self):
+        return len(self._records)
+
+    def __iter__(self):
+        return iter(self._records.values())
+
+    def __contains__(self, record_id):
+        return record_id in self._records
+
+    def __repr__(self):
+        return f"Registry(key={self.key!r}, size={len(self._records)})"
+
+    @property
+    def indexes(self):
+        """Return the attached secondary indexes."""
+        return tuple(self._indexes)
+
+    def add_index(self, index):
+        """Attach a secondary index and populate it from the current records."""
+        for record_id, record in self._records.items():
+            index.insert(record_id, record)
+        self._indexes.append(index)
+        return index
+
+    def create_index(self, field):
+        """Declare a FieldIndex on field (once) so find() on it costs O(result size)."""
+        index = self.field_indexes.get(field)
+        if index is None:
+            index = self.field_indexes[field] = self.add_index(FieldIndex(field))
+        return index
+
+    def find(self, field, value):
+        """Return records whose field equals value, ignoring case for strings.
+
+        Uses the FieldIndex declared on field, or scans when there is none.
+        """
+        index = self.field_indexes.get(field)
+        if index is not None:
+            return [self._records[record_id] for record_id in index.lookup(value)]
+        value = normalize(value)
+        return [
+            record
+            for record in self._records.values()
+            if normalize(getattr(record, field)) == value
+        ]
+
+    def get(self, record_id, default=None):
+        """Return the record with the given ID, or default if it is missing."""
+        return self._records.get(record_id, default)
+
+    def ids(self):
+        """Return a view of all IDs in insertion order."""
+        return self._records.keys()
+
+    def add(self, record):
+        """Insert a record; return False if its ID is already taken.
+
+        The indexes are updated first; if one raises, the others are rolled
+        back and the exception propagates with the registry unchanged.
+        """
+        record_id = getattr(record, self.key)
+        if record_id in self._records:
+            return False
+        indexes = self._indexes
+        done = 0
+        try:
+            for index in indexes:
+                index.insert(record_id, record)
+                done += 1
+        except Exception:
+            for index in indexes[:done]:
+                index.remove(record_id, record)
+            raise
+        self._records[record_id] = record
+        self._sequence[record_id] = self._next_seq
+        self._order_seqs.append(self._next_seq)
+        self._order_ids.append(record_id)
+        self._next_seq += 1
+        return True
+
+    def add_many(self, records):
+        """Insert every record, or none if an ID is taken or repeated; return whether they were."""
+        key = self.key
+        pairs = [(getattr(record, key), record) for record in records]
+        ids = [record_id for record_id, _ in pairs]
+        if len(set(ids)) != len(ids) or not self._records.keys().isdisjoint(ids):
+            return False
+        done = []
+        try:
+            for index in self._indexes:
+                _insert_all(index, pairs)
+                done.append(index)
+        except Exception:
+            for index in done:
+                _remove_all(index, pairs)
+            raise
+        first = self._next_seq
+        self._next_seq += len(pairs)
+        self._records.update(pairs)
+        self._sequence.update(zip(ids, range(first, self._next_seq)))
+        self._order_seqs.extend(range(first, self._next_seq))
+        self._order_ids.extend(ids)
+        return True
+
+    def update(self, record_id, **fields):
+        """Set the given fields on a record; return the record, or None if missing.
+
+        If an index rejects the new values, the old ones are put back and
+        re-indexed before the exception propagates.
+        """
+        record = self._records.get(record_id)
+        if record is None:
+            return None
+        old = {name: getattr(record, name) for name in fields}
+        affected = [
+            index for index in self._indexes if not index.fields.isdisjoint(fields)
+        ]
+        for index in affected:
+            index.remove(record_id, record)
+        done = 0
+        try:
+            for name, value in fields.items():
+                setattr(record, name, value)
+            for index in affected:
+                index.insert(record_id, record)
+                done += 1
+        except Exception:
+            for index in affected[:done]:
+                index.remove(record_id, record)
+            for name, value in old.items():
+                setattr(record, name, value)
+            for index in affected:
+                index.insert(record_id, record)
+            raise
+        return record
+
+    def update_many(self, updates):
+        """Apply {record_id: {field: value}} updates; return the records, or None if any is missing.
+
+        Each index re-indexes only the records whose changes touch its fields.
+        If an index rejects the new values, every record gets its old values
+        back and is re-indexed before the exception propagates.
+        """
+        records = self._records
+        if not records.keys() >= updates.keys():
+            return None
+        changed = [
+            (record_id, records[record_id], fields)
+            for record_id, fields in updates.items()
+        ]
+        old = [
+            (record, {name: getattr(record, name) for name in fields})
+            for _, record, fields in changed
+        ]
+        affected = []
+        for index in self._indexes:
+            pairs = [
+                (record_id, record)
+                for record_id, record, fields in changed
+                if not index.fields.isdisjoint(fields)
+            ]
+            if pairs:
+                _remove_all(index, pairs)
+                affected.append((index, pairs))
+        done = []
+        try:
+            for _, record, fields in changed:
+                for name, value in fields.items():
+                    setattr(record, name, value)
+            for index, pairs in affected:
+                _insert_all(index, pairs)
+                done.append((index, pairs))
+        except Exception:
+            for index, pairs in done:
+                _remove_all(index, pairs)
+            for record, values in old:
+                for name, value in values.items():
+                    setattr(record, name, value)
+            for index, pairs in affected:
+                _insert_all(index, pairs)
+            raise
+        return [record for _, record, _ in changed]
+
+    def remove(self, record_id):
+        """Remove a record by ID; return it, or None if it was not present."""
+        record = self._records.pop(record_id, None)
+        if record is not None:
+            self._forget(record_id)
+            for index in self._indexes:
+                index.remove(record_id, record)
+        return record
+
+    def remove_many(self, record_ids):
+        """Remove every listed ID in one pass; return the records that existed."""
+        pop = self._records.pop
+        pairs = []
+        for record_id in record_ids:
+            record = pop(record_id, None)
+            if record is not None:
+                self._forget(record_id)
+                pairs.append((record_id, record))
+        for index in self._indexes:
+            _remove_all(index, pairs)
+        return [record for _, record in pairs]
+
+    def _forget(self, record_id):
+        """Tombstone a removed record's slot, compacting when half the slots are dead."""
+        seq = self._sequence.pop(record_id)
+        self._order_ids[bisect_left(self._order_seqs, seq)] = None
+        self._tombstones += 1
+        if self._tombstones * 2 > len(self._order_ids):
+            live = [
+                (seq, record_id)
+                for seq, record_id in zip(self._order_seqs, self._order_ids)
+                if record_id is not None
+            ]
+            self._order_seqs = [seq for seq, _ in live]
+            self._order_ids = [record_id for _, record_id in live]
+            self._tombstones = 0
+
+    def scan(self, after=None):
+        """Lazily yield (cursor, record) pairs in insertion order, after the given cursor."""
+        position = 0 if after is None else bisect_right(self._order_seqs, after)
+        seqs, ids, records = self._order_seqs, self._order_ids, self._records
+        while position < len(ids):
+            record = records.get(ids[position])
+            if record is not None:
+                yield seqs[position], record
+            position += 1
+
+    def clear(self):
+        """Remove every record."""
+        self._records.clear()
+        self._sequence.clear()
+        self._order_seqs = []
+        self._order_ids = []
+        self._tombstones = 0
+        for index in self._indexes:
+            index.clear()
@@ -0,0 +1,388 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import signal
+from urllib.parse import parse_qs, urlsplit
+
+import snapshot
+from bulk import integer, parse_records
+from errors import HospitalError, RecordNotFoundError
+from indexes import DAY
+from main import HospitalManagementSystem, to_timestamp
+from storage import LogStorage
+
+PAGE_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+HOME_PAGE = "Home.html"
+MAX_BODY = 1024 * 1024
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+APPOINTMENT_FILTERS = {"doctor_id", "patient_id", "date"}
+CASCADING = {
+    target
+    for references in HospitalManagementSystem.REFERENCES.values()
+    for target in references.values()
+}
+STATUS_TEXT = {
+    200: "OK",
+    201: "Created",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class HTTPError(Exception):
+    """An error reported to the client with an HTTP status code."""
+
+    def __init__(self, status, message):
+        """Initialize the error with a status code and message."""
+        super().__init__(message)
+        self.status = status
+
+
+class HospitalServer:
+    """Asyncio HTTP/1.1 server exposing HospitalManagementSystem as JSON endpoints.
+
+    Every connection is a coroutine on one event loop, so requests are
+    applied to the shared system one at a time without locking. Routes:
+
+        GET    /                       Home.html (any repo .html page by name)
+        GET    /api/summary            dashboard counts (see HospitalManagementSystem.summary)
+        GET    /api/<collection>       one page of rows, filtered by query parameters
+        POST   /api/<collection>       add a record from a JSON body
+        GET    /api/<collection>/<id>  fetch one record
+        PATCH  /api/doctors/<id>       edit_doctor (name, designation, phone)
+        PATCH  /api/inventory/<id>     update_inventory (quantity, reorder_level)
+        DELETE /api/<collection>/<id>  delete or cancel one record; ?cascade=1 also
+                                       cancels a patient's or doctor's appointments
+    """
+
+    def __init__(self, hms, pages=PAGE_DIRECTORY, writable=None):
+        """Initialize the server around a shared HospitalManagementSystem.
+
+        If writable, an asyncio.Event, is given, requests other than GET wait
+        until it is set, so another task on the loop can pause changes.
+        """
+        self.hms = hms
+        self.pages = pages
+        self.writable = writable
+        self._page_cache = {}
+        self._adders = {
+            "patients": hms.add_patient,
+            "staff": hms.add_staff,
+            "doctors": hms.add_doctor,
+            "inventory": hms.add_inventory,
+            "appointments": hms.add_appointment,
+        }
+        self._deleters = {
+            "patients": hms.delete_patient,
+            "staff": hms.delete_staff,
+            "doctors": hms.delete_doctor,
+            "inventory": hms.delete_inventory,
+            "appointments": hms.cancel_appointment,
+        }
+
+    # Connection Handling
+    async def handle_connection(self, reader, writer):
+        """Serve keep-alive requests on one connection until the client closes it."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get("content-length", 0))
+                except ValueError:
+                    break
+                if length > MAX_BODY:
+                    status, content_type, payload = self._error(413, "Body too large")
+                    keep_alive = False
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    if self.writable is not None and method != "GET":
+                        await self.writable.wait()
+                    status, content_type, payload = self.dispatch(method, target, body)
+                    keep_alive = (
+                        version == "HTTP/1.1"
+                        and headers.get("connection", "").lower() != "close"
+                    )
+                head = (
+                    f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                )
+                writer.write(head.encode("latin-1") + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def dispatch(self, method, target, body):
+        """Route one request; return (status, content type, payload bytes)."""
+        url = urlsplit(target)
+        parts = [part for part in url.path.split("/") if part]
+        try:
+            if parts[:1] == ["api"]:
+                status, data = self.api(method, parts[1:], parse_qs(url.query), body)
+                return status, "application/json", json.dumps(data).encode()
+            return 200, "text/html; charset=utf-8", self.page(method, parts)
+        except HTTPError as error:
+            return self._error(error.status, str(error))
+        except Exception:
+            return self._error(500, "Internal server error")
+
+    @staticmethod
+    def _error(status, message):
+        return status, "application/json", json.dumps({"error": message}).encode()
+
+    # Static Pages
+    def page(self, method, parts):
+        """Return the bytes of a repository HTML page."""
+        if method != "GET":
+            raise HTTPError(405, "Pages only support GET")
+        name = parts[0] if parts else HOME_PAGE
+        if len(parts) > 1 or not name.endswith(".html"):
+            raise HTTPError(404, "Page not found")
+        if name not in self._page_cache:
+            path = os.path.join(self.pages, name)
+            if not os.path.isfile(path):
+                raise HTTPError(404, "Page not found")
+            with open(path, "rb") as file:
+                self._page_cache[name] = file.read()
+        return self._page_cache[name]
+
+    # JSON API
+    def api(self, method, parts, query, body):
+        """Handle /api/summary and /api/<collection>[/<id>]; return (status, JSON-ready data)."""
+        if parts == ["summary"]:
+            if method != "GET":
+                raise HTTPError(405, "Method not allowed")
+            return 200, self.hms.summary()
+        if not parts or parts[0] not in HospitalManagementSystem.RECORD_TYPES:
+            raise HTTPError(404, "Unknown collection")
+        collection = parts[0]
+        if len(parts) == 1:
+            if method == "GET":
+                return 200, self.query(collection, query)
+            if method == "POST":
+                return 201, vars(self.create(collection, self._json(body)))
+        elif len(parts) == 2:
+            record_id = self._int(parts[1], "ID")
+            if method == "GET":
+                record = getattr(self.hms, collection).get(record_id)
+                if record is None:
+                    raise HTTPError(404, "Record not found")
+                return 200, vars(record)
+            if method == "DELETE":
+                options = {}
+                if collection in CASCADING and query.get("cascade") == ["1"]:
+                    options["cascade"] = True
+                try:
+                    found = self._deleters[collection](record_id, **options)
+                except HospitalError as error:
+                    raise HTTPError(409, str(error)) from None
+                if not found:
+                    raise HTTPError(404, "Record not found")
+                return 200, {"deleted": record_id}
+            if method == "PATCH" and collection in ("doctors", "inventory"):
+                return 200, vars(self.edit(collection, record_id, self._json(body)))
+        raise HTTPError(405, "Method not allowed")
+
+    @staticmethod
+    def _json(body):
+        try:
+            data = json.loads(body or b"{}")
+        except ValueError:
+            raise HTTPError(400, "Body must be JSON") from None
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Body must be a JSON object")
+        return data
+
+    @staticmethod
+    def _int(value, label):
+        try:
+            return integer(value)
+        except (TypeError, ValueError):
+            raise HTTPError(400, f"{label} must be an integer") from None
+
+    def _optional_int(self, data, name):
+        value = data.get(name)
+        return None if value is None else self._int(value, name)
+
+    @staticmethod
+    def _optional_text(data, name):
+        value = data.get(name)
+        if value is not None and not isinstance(value, str):
+            raise HTTPError(400, f"{name} must be a string")
+        return value
+
+    def query(self, collection, query):
+        """Return one page of a collection as {"rows": [...], "next": cursor}.
+
+        Without filters, pages follow insertion order and ``next`` is the
+        cursor to pass back as ?after=. Filters use the indexes: patients
+        name (with prefix=1; ``next`` is the last patient ID of a full page),
+        staff role, doctors designation, inventory below, and appointments
+        doctor_id with date, patient_id, or date. ?fields=a,b projects rows
+        and ?limit= caps the page size.
+        """
+        hms = self.hms
+        param = {name: values[0] for name, values in query.items()}
+        limit = min(self._int(param.get("limit", DEFAULT_LIMIT), "limit"), MAX_LIMIT)
+        if limit < 0:
+            raise HTTPError(400, "limit must not be negative")
+        after = self._int(param["after"], "after") if "after" in param else None
+        fields = param["fields"].split(",") if "fields" in param else None
+        if fields is not None and not set(fields) <= set(
+            HospitalManagementSystem.RECORD_TYPES[collection].FIELDS
+        ):
+            raise HTTPError(400, "Unknown field in fields")
+        next_cursor = None
+        if collection == "patients" and "name" in param:
+            ids = hms.patient_names.search(
+                param["name"], param.get("prefix") == "1", limit, after
+            )
+            records = [hms.patients.get(patient_id) for patient_id in ids]
+            next_cursor = ids[-1] if len(ids) == limit else None
+        elif collection == "staff" and "role" in param:
+            records = hms.staff.find("role", param["role"])
+        elif collection == "doctors" and "designation" in param:
+            records = hms.doctors.find("designation", param["designation"])
+        elif collection == "inventory" and "below" in param:
+            ids = hms.stock.below(self._int(param["below"], "below"))
+            records = (hms.inventory.get(item_id) for item_id in ids)
+        elif collection == "appointments" and param.keys() & APPOINTMENT_FILTERS:
+            records = self._appointments(param)
+        else:
+            rows, next_cursor = hms.page(collection, limit, after, fields)
+            return {"rows": rows, "next": next_cursor}
+        rows = [
+            vars(record) if fields is None else {f: getattr(record, f) for f in fields}
+            for record in itertools.islice(records, limit)
+        ]
+        return {"rows": rows, "next": next_cursor}
+
+    def _appointments(self, param):
+        """Return appointments for a doctor's day, a patient, or a whole day."""
+        schedule = self.hms.schedule
+        try:
+            if "doctor_id" in param:
+                day = to_timestamp(param["date"]) // DAY
+                ids = schedule.doctor_day(
+                    self._int(param["doctor_id"], "doctor_id"), day
+                )
+            elif "patient_id" in param:
+                ids = schedule.patient_appointments(
+                    self._int(param["patient_id"], "patient_id")
+                )
+            else:
+                start = to_timestamp(param["date"])
+                ids = schedule.between(start, start + DAY)
+        except (KeyError, ValueError):
+            raise HTTPError(
+                400, "Appointment filters need a valid date=YYYY-MM-DD"
+            ) from None
+        return (self.hms.appointments.get(appointment_id) for appointment_id in ids)
+
+    def create(self, collection, data):
+        """Validate every field's type, then add one record; return it."""
+        errors = []
+        records = list(parse_records(collection, [data], errors))
+        if errors:
+            raise HTTPError(400, errors[0][1])
+        try:
+            return self._adders[collection](records[0])
+        except HospitalError as error:
+            raise HTTPError(409, str(error)) from None
+
+    def edit(self, collection, record_id, data):
+        """Apply edit_doctor or update_inventory; return the updated record."""
+        try:
+            if collection == "doctors":
+                return self.hms.edit_doctor(
+                    record_id,
+                    self._optional_text(data, "name"),
+                    self._optional_text(data, "designation"),
+                    self._optional_text(data, "phone"),
+                )
+            return self.hms.update_inventory(
+                record_id,
+                self._optional_int(data, "quantity"),
+                self._optional_int(data, "reorder_level"),
+            )
+        except RecordNotFoundError:
+            raise HTTPError(404, "Record not found") from None
+
+
+async def flush_periodically(hms, interval=0.05):
+    """Group-commit journal writes that arrived since the last flush."""
+    while True:
+        await asyncio.sleep(interval)
+        hms.storage.flush()
+
+
+async def start(hms, host="127.0.0.1", port=8000, writable=None):
+    """Start listening on host:port; return the asyncio server (see HospitalServer)."""
+    server = HospitalServer(hms, writable=writable)
+    return await asyncio.start_server(server.handle_connection, host, port)
+
+
+async def serve(hms, host, port):
+    """Serve requests until SIGINT or SIGTERM."""
+    listener = await start(hms, host, port)
+    flusher = asyncio.create_task(flush_periodically(hms))
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signal_number, stop.set)
+        except NotImplementedError:
+            pass
+    print(f"Serving Hospital Management System on http://{host}:{port}/")
+    async with listener:
+        await stop.wait()
+    flusher.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Hospital Management System HTTP server"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--data", default="hospital_data", help="storage directory")
+    args = parser.parse_args()
+
+    hms = HospitalManagementSystem(LogStorage(args.data))
+    snapshot.recover(hms)
+    try:
+        asyncio.run(serve(hms, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        snapshot.checkpoint(hms)
+        hms.close()
+
+
+if __name__ == "__main__":
+    main()
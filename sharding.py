@@ -0,0 +1,554 @@
+import heapq
+import itertools
+import multiprocessing
+import os
+
+from errors import DuplicateRecordError, IntegrityError, RecordNotFoundError
+from indexes import normalize
+from main import HospitalManagementSystem
+from storage import LogStorage
+
+# How each partitioned collection picks its shard; doctors are replicated.
+PARTITION_KEYS = {
+    "patients": "patient_id",
+    "staff": "staff_id",
+    "inventory": "item_id",
+    "appointments": "doctor_id",
+}
+
+
+class ShardHospitalManagementSystem(HospitalManagementSystem):
+    """The system one worker process runs for its shard.
+
+    Doctors are replicated to every shard, so appointments only check their
+    doctor locally; patients live on their own shard and the coordinator
+    checks those references instead. Appointments also keep an index on
+    patient_id so the coordinator can find a patient's bookings.
+    """
+
+    REFERENCES = {"appointments": {"doctor_id": "doctors"}}
+
+    def __init__(self, storage=None):
+        """Initialize the shard's registries."""
+        super().__init__(storage)
+        self.appointments.create_index("patient_id")
+
+    def get(self, collection, record_id):
+        """Return one record by ID, or None."""
+        return getattr(self, collection).get(record_id)
+
+    def missing(self, collection, record_ids):
+        """Return the given IDs that are not in collection."""
+        registry = getattr(self, collection)
+        return [record_id for record_id in record_ids if record_id not in registry]
+
+    def ids(self, collection):
+        """Return every ID in collection."""
+        return list(getattr(self, collection).ids())
+
+    def count(self, collection):
+        """Return the number of records in collection."""
+        return len(getattr(self, collection))
+
+    def referencing(self, field, record_ids):
+        """Return {appointment ID: referenced ID} for appointments whose field holds any of record_ids."""
+        index = self.appointments.field_indexes[field]
+        return {
+            appointment_id: record_id
+            for record_id in record_ids
+            for appointment_id in index.lookup(record_id)
+        }
+
+
+def _serve(connection, directory):
+    """Worker loop: run (method, args, kwargs) requests until a None arrives.
+
+    Replies are (True, result) or (False, exception), sent only after the
+    shard's journal is flushed, so an acknowledged write is durable.
+    """
+    storage = LogStorage(directory) if directory is not None else None
+    hms = ShardHospitalManagementSystem(storage)
+    hms.recover()
+    while True:
+        request = connection.recv()
+        if request is None:
+            break
+        name, args, kwargs = request
+        try:
+            reply = (True, getattr(hms, name)(*args, **kwargs))
+        except Exception as error:
+            reply = (False, error)
+        hms.storage.flush()
+        connection.send(reply)
+    hms.close()
+    connection.close()
+
+
+class ShardedHospitalManagementSystem:
+    """HospitalManagementSystem partitioned across worker processes.
+
+    Patients, staff and inventory are split by ID modulo the number of
+    workers and appointments by doctor_id, so double-booking is still
+    checked on a single shard. Doctors are replicated to every shard.
+    Single-record calls go to the owning shard; searches and listings
+    fan out to every shard at once and merge the sorted results, so they
+    run in parallel. Batches are validated on every shard they touch
+    before any shard applies them.
+
+    The coordinator checks patient references and keeps a map from
+    appointment ID to shard. It is not thread-safe: use it from one thread.
+    With a directory, each shard journals to its own subdirectory; reopen
+    it with the same number of workers.
+    """
+
+    def __init__(self, workers=4, directory=None):
+        """Start workers processes, recovering each shard from directory if given."""
+        self.workers = workers
+        self._connections = []
+        self._processes = []
+        for number in range(workers):
+            parent, child = multiprocessing.Pipe()
+            path = (
+                os.path.join(directory, f"shard-{number}")
+                if directory is not None
+                else None
+            )
+            process = multiprocessing.Process(
+                target=_serve, args=(child, path), daemon=True
+            )
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+        self._appointment_shards = {
+            appointment_id: shard
+            for shard, ids in enumerate(self._fan_out("ids", "appointments"))
+            for appointment_id in ids
+        }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # Utility: Messaging
+    def shard_of(self, record_id):
+        """Return the shard number that owns record_id."""
+        return record_id % self.workers
+
+    def _receive(self, shard):
+        ok, result = self._connections[shard].recv()
+        if not ok:
+            raise result
+        return result
+
+    def _call(self, shard, name, *args, **kwargs):
+        """Run one method on one shard and return its result."""
+        self._connections[shard].send((name, args, kwargs))
+        return self._receive(shard)
+
+    def _scatter(self, requests):
+        """Send {shard: (name, args)} requests at once; return {shard: result}.
+
+        Every reply is collected before the first error, if any, is raised.
+        """
+        for shard, (name, args) in requests.items():
+            self._connections[shard].send((name, args, {}))
+        results = {}
+        error = None
+        for shard in requests:
+            try:
+                results[shard] = self._receive(shard)
+            except Exception as failure:
+                error = error or failure
+        if error is not None:
+            raise error
+        return results
+
+    def _fan_out(self, name, *args):
+        """Run one method on every shard in parallel; return the results in shard order."""
+        results = self._scatter({shard: (name, args) for shard in range(self.workers)})
+        return [results[shard] for shard in range(self.workers)]
+
+    def _partition(self, collection, records):
+        """Group records by owning shard."""
+        key = PARTITION_KEYS[collection]
+        groups = {}
+        for record in records:
+            groups.setdefault(self.shard_of(getattr(record, key)), []).append(record)
+        return groups
+
+    def _check_patients(self, patient_ids, referrers):
+        """Raise IntegrityError if any patient ID is missing, naming the referrers."""
+        groups = {}
+        for patient_id in set(patient_ids):
+            groups.setdefault(self.shard_of(patient_id), []).append(patient_id)
+        missing = set(
+            itertools.chain.from_iterable(
+                self._scatter(
+                    {
+                        shard: ("missing", ("patients", ids))
+                        for shard, ids in groups.items()
+                    }
+                ).values()
+            )
+        )
+        broken = [
+            (record_id, patient_id)
+            for record_id, patient_id in zip(referrers, patient_ids)
+            if patient_id in missing
+        ]
+        if len(broken) == 1:
+            raise IntegrityError(
+                f"patient_id {broken[0][1]} not found in patients!", [broken[0][0]]
+            )
+        if broken:
+            raise IntegrityError(
+                f"{len(broken)} references from appointments not found!",
+                [record_id for record_id, _ in broken],
+            )
+
+    # Adding Records
+    def add(self, collection, record):
+        """Add one record to its owning shard (every shard for doctors); return it."""
+        if collection == "doctors":
+            self._fan_out("add_doctor", record)
+            return record
+        if collection == "appointments":
+            return self.add_appointment(record)
+        method = {
+            "patients": "add_patient",
+            "staff": "add_staff",
+            "inventory": "add_inventory",
+        }[collection]
+        key = PARTITION_KEYS[collection]
+        return self._call(self.shard_of(getattr(record, key)), method, record)
+
+    def add_patient(self, patient):
+        """Add a patient on its shard; see HospitalManagementSystem.add_patient."""
+        return self.add("patients", patient)
+
+    def add_staff(self, staff):
+        """Add a staff member on its shard."""
+        return self.add("staff", staff)
+
+    def add_doctor(self, doctor):
+        """Add a doctor to every shard."""
+        return self.add("doctors", doctor)
+
+    def add_inventory(self, item):
+        """Add an inventory item on its shard."""
+        return self.add("inventory", item)
+
+    def add_appointment(self, appointment):
+        """Add an appointment on its doctor's shard after checking the patient exists."""
+        if appointment.appointment_id in self._appointment_shards:
+            raise DuplicateRecordError("Appointment with this ID already exists!")
+        self._check_patients([appointment.patient_id], [appointment.appointment_id])
+        shard = self.shard_of(appointment.doctor_id)
+        self._call(shard, "add_appointment", appointment)
+        self._appointment_shards[appointment.appointment_id] = shard
+        return appointment
+
+    def add_many(self, collection, records):
+        """Add a batch all-or-nothing across shards; return the records as a list.
+
+        Every shard validates its part before any shard applies it. The
+        coordinator checks appointment IDs and patients itself, since
+        appointments are partitioned by doctor rather than by their own ID.
+        """
+        records = list(records)
+        if collection == "doctors":
+            self._fan_out("add_many", collection, records)
+            return records
+        groups = self._partition(collection, records)
+        if collection == "appointments":
+            ids = [record.appointment_id for record in records]
+            seen = set()
+            duplicates = []
+            for appointment_id in ids:
+                if appointment_id in self._appointment_shards or appointment_id in seen:
+                    duplicates.append(appointment_id)
+                seen.add(appointment_id)
+            if duplicates:
+                raise DuplicateRecordError(
+                    f"{len(duplicates)} IDs already exist in appointments or repeat in the batch!",
+                    duplicates,
+                )
+            self._check_patients([record.patient_id for record in records], ids)
+        self._scatter(
+            {
+                shard: ("validate_new", (collection, part))
+                for shard, part in groups.items()
+            }
+        )
+        self._scatter(
+            {shard: ("add_many", (collection, part)) for shard, part in groups.items()}
+        )
+        if collection == "appointments":
+            for shard, part in groups.items():
+                for record in part:
+                    self._appointment_shards[record.appointment_id] = shard
+        return records
+
+    def add_patient_many(self, patients):
+        """Add many patients all-or-nothing across shards."""
+        return self.add_many("patients", patients)
+
+    def add_staff_many(self, staff):
+        """Add many staff members all-or-nothing across shards."""
+        return self.add_many("staff", staff)
+
+    def add_doctor_many(self, doctors):
+        """Add many doctors to every shard all-or-nothing."""
+        return self.add_many("doctors", doctors)
+
+    def add_inventory_many(self, items):
+        """Add many inventory items all-or-nothing across shards."""
+        return self.add_many("inventory", items)
+
+    def add_appointment_many(self, appointments):
+        """Add many appointments all-or-nothing across shards."""
+        return self.add_many("appointments", appointments)
+
+    # Lookups and Updates
+    def get(self, collection, record_id):
+        """Return one record by ID from its shard, or None."""
+        if collection == "doctors":
+            return self._call(0, "get", collection, record_id)
+        if collection == "appointments":
+            shard = self._appointment_shards.get(record_id)
+            if shard is None:
+                return None
+            return self._call(shard, "get", collection, record_id)
+        return self._call(self.shard_of(record_id), "get", collection, record_id)
+
+    def counts(self):
+        """Return the number of records per collection across all shards."""
+        return {
+            collection: (
+                self._call(0, "count", collection)
+                if collection == "doctors"
+                else sum(self._fan_out("count", collection))
+            )
+            for collection in HospitalManagementSystem.RECORD_TYPES
+        }
+
+    def summary(self):
+        """Return HospitalManagementSystem.summary() merged across shards."""
+        summaries = self._fan_out("summary")
+        merged = summaries[0]
+        for collection in merged["counts"]:
+            if collection != "doctors":
+                merged["counts"][collection] = sum(
+                    summary["counts"][collection] for summary in summaries
+                )
+        for name in ("patients_per_diagnosis", "staff_per_shift"):
+            totals = {}
+            for summary in summaries:
+                for value, count in summary[name].items():
+                    entry = totals.setdefault(normalize(value), [value, 0])
+                    entry[1] += count
+            merged[name] = dict(sorted(totals.values(), key=lambda entry: -entry[1]))
+        merged["total_stock"] = sum(summary["total_stock"] for summary in summaries)
+        return merged
+
+    def edit_doctor(
+        self, doctor_id, new_name=None, new_designation=None, new_phone=None
+    ):
+        """Edit a doctor on every shard; return the updated doctor."""
+        return self._fan_out(
+            "edit_doctor", doctor_id, new_name, new_designation, new_phone
+        )[0]
+
+    def update_inventory(self, item_id, new_quantity=None, new_reorder_level=None):
+        """Update an inventory item on its shard; return it."""
+        return self._call(
+            self.shard_of(item_id),
+            "update_inventory",
+            item_id,
+            new_quantity,
+            new_reorder_level,
+        )
+
+    # Deleting Records
+    def delete_patient(self, patient_id, cascade=False):
+        """Delete a patient; see HospitalManagementSystem.delete_patient."""
+        if self._call(self.shard_of(patient_id), "missing", "patients", [patient_id]):
+            return False
+        self.delete_patient_many([patient_id], cascade)
+        return True
+
+    def delete_patient_many(self, patient_ids, cascade=False):
+        """Delete many patients, refusing or cascading to their appointments on any shard.
+
+        Returns the deleted patients. RecordNotFoundError lists IDs that do
+        not exist, before anything is deleted.
+        """
+        patient_ids = list(patient_ids)
+        groups = {}
+        for patient_id in patient_ids:
+            groups.setdefault(self.shard_of(patient_id), []).append(patient_id)
+        missing = list(
+            itertools.chain.from_iterable(
+                self._scatter(
+                    {
+                        shard: ("missing", ("patients", ids))
+                        for shard, ids in groups.items()
+                    }
+                ).values()
+            )
+        )
+        if missing:
+            raise RecordNotFoundError(
+                f"{len(missing)} IDs not found in patients!", missing
+            )
+        bookings = self._fan_out("referencing", "patient_id", patient_ids)
+        if not cascade:
+            booked = set().union(*(booking.values() for booking in bookings))
+            blocked = [patient_id for patient_id in patient_ids if patient_id in booked]
+            if len(blocked) == 1:
+                raise IntegrityError(
+                    f"ID {blocked[0]} in patients is still referenced by appointments!",
+                    blocked,
+                )
+            if blocked:
+                raise IntegrityError(
+                    f"{len(blocked)} IDs in patients are still referenced by appointments!",
+                    blocked,
+                )
+        self._cancel_on_shards(
+            {shard: list(booking) for shard, booking in enumerate(bookings)}
+        )
+        return list(
+            itertools.chain.from_iterable(
+                self._scatter(
+                    {
+                        shard: ("delete_patient_many", (ids,))
+                        for shard, ids in groups.items()
+                    }
+                ).values()
+            )
+        )
+
+    def delete_doctor(self, doctor_id, cascade=False):
+        """Delete a doctor from every shard, cancelling their appointments if cascade is set."""
+        shard = self.shard_of(doctor_id)
+        canceled = self._call(shard, "referencing", "doctor_id", [doctor_id])
+        if not self._call(shard, "delete_doctor", doctor_id, cascade):
+            return False
+        for appointment_id in canceled:
+            del self._appointment_shards[appointment_id]
+        self._scatter(
+            {
+                other: ("delete_doctor", (doctor_id,))
+                for other in range(self.workers)
+                if other != shard
+            }
+        )
+        return True
+
+    def delete_staff(self, staff_id):
+        """Delete a staff member from its shard."""
+        return self._call(self.shard_of(staff_id), "delete_staff", staff_id)
+
+    def delete_inventory(self, item_id):
+        """Delete an inventory item from its shard."""
+        return self._call(self.shard_of(item_id), "delete_inventory", item_id)
+
+    def cancel_appointment(self, appointment_id):
+        """Cancel an appointment on the shard holding it."""
+        shard = self._appointment_shards.pop(appointment_id, None)
+        if shard is None:
+            return False
+        return self._call(shard, "cancel_appointment", appointment_id)
+
+    def _cancel_on_shards(self, groups):
+        """Cancel {shard: appointment IDs} everywhere at once."""
+        groups = {shard: ids for shard, ids in groups.items() if ids}
+        for ids in groups.values():
+            for appointment_id in ids:
+                self._appointment_shards.pop(appointment_id, None)
+        self._scatter(
+            {
+                shard: ("cancel_appointment_many", (ids,))
+                for shard, ids in groups.items()
+            }
+        )
+
+    # Fan-out Queries
+    def search_patient_by_name(self, name, prefix=False, limit=20, after=None):
+        """Search every shard in parallel; return one page of patients in ID order."""
+        pages = self._fan_out("search_patient_by_name", name, prefix, limit, after)
+        return list(
+            itertools.islice(
+                heapq.merge(*pages, key=lambda patient: patient.patient_id), limit
+            )
+        )
+
+    def list_low_stock_items(self, threshold):
+        """Return items below threshold from every shard, lowest quantity first."""
+        return list(
+            heapq.merge(
+                *self._fan_out("list_low_stock_items", threshold),
+                key=lambda item: (item.quantity, item.item_id),
+            )
+        )
+
+    def list_staff_by_role(self, role):
+        """Return staff members with a role from every shard."""
+        return list(
+            itertools.chain.from_iterable(self._fan_out("list_staff_by_role", role))
+        )
+
+    def list_doctors_by_designation(self, designation):
+        """Return doctors with a designation (from one shard, as doctors are replicated)."""
+        return self._call(0, "list_doctors_by_designation", designation)
+
+    def _merge_appointments(self, name, *args):
+        """Fan out an appointment query and merge the time-ordered results."""
+        return list(
+            heapq.merge(
+                *self._fan_out(name, *args),
+                key=lambda appointment: (
+                    appointment.starts_at,
+                    appointment.appointment_id,
+                ),
+            )
+        )
+
+    def doctor_schedule(self, doctor_id, date):
+        """Return a doctor's appointments on date from the doctor's shard."""
+        return self._call(self.shard_of(doctor_id), "doctor_schedule", doctor_id, date)
+
+    def patient_appointments(self, patient_id, date=None, time="00:00"):
+        """Return a patient's appointments from every shard, in time order."""
+        return self._merge_appointments("patient_appointments", patient_id, date, time)
+
+    def appointments_between(
+        self, start_date, end_date, start_time="00:00", end_time="00:00"
+    ):
+        """Return appointments in [start, end) from every shard, in time order."""
+        return self._merge_appointments(
+            "appointments_between", start_date, end_date, start_time, end_time
+        )
+
+    def daily_schedule(self, date=None):
+        """Return all appointments on date from every shard, in time order."""
+        return self._merge_appointments("daily_schedule", date)
+
+    # Lifecycle
+    def checkpoint(self):
+        """Snapshot every shard's journal."""
+        self._fan_out("checkpoint")
+
+    def close(self):
+        """Stop every worker, letting each flush and close its storage."""
+        for connection in self._connections:
+            connection.send(None)
+        for process, connection in zip(self._processes, self._connections):
+            process.join()
+            connection.close()
+        self._connections = []
+        self._processes = []
@@ -0,0 +1,450 @@
+import argparse
+import itertools
+import json
+import mmap
+import operator
+import os
+import struct
+import time
+
+from errors import DuplicateRecordError
+from main import HospitalManagementSystem
+from storage import LogStorage
+
+MAGIC = b"HMSSNAP1"
+# File trailer: footer offset, footer length, magic.
+TRAILER = struct.Struct("<QQ8s")
+# Column type codes: signed 64-bit integers, or uint32 string-table indexes.
+INT, STRING = "q", "I"
+NULL_INT = -(2**63)
+NULL_STRING = 2**32 - 1
+# Primary-key index entries: (record ID, row number), sorted by ID.
+KEY_ENTRY = struct.Struct("<qI")
+OFFSET = struct.Struct("<Q")
+# Name of the startup snapshot inside a LogStorage directory.
+BINARY_FILE = "snapshot.bin"
+
+
+# Utility: Column Layout
+def _column_type(registry, field):
+    """Return (INT or STRING, whether any value is None) for a field across all records."""
+    kinds = {type(getattr(record, field)) for record in registry}
+    nullable = type(None) in kinds
+    kinds.discard(type(None))
+    if kinds <= {int, bool}:
+        return INT, nullable
+    if kinds == {str}:
+        return STRING, nullable
+    raise TypeError(
+        f"Field '{field}' mixes value types {sorted(k.__name__ for k in kinds)}"
+    )
+
+
+class _StringTable:
+    """Deduplicated UTF-8 strings, addressed by their position in the table."""
+
+    def __init__(self):
+        """Initialize an empty table."""
+        self.positions = {}
+        self.blobs = []
+
+    def add(self, text):
+        """Return the position of text, adding it on first sight."""
+        position = self.positions.get(text)
+        if position is None:
+            position = self.positions[text] = len(self.blobs)
+            self.blobs.append(text.encode("utf-8"))
+        return position
+
+
+# Writing
+def save(hms, path, seq=None):
+    """Write every collection of hms to a binary snapshot at path; return the record count.
+
+    Each collection becomes a block of fixed-width rows (one struct per
+    record, columns in slot order) plus an ID index sorted for bisection.
+    Strings live once in a shared table. A JSON footer describes the
+    layout, so opening the file only has to read the footer. The file is
+    written to a temporary name and renamed into place. seq, if given, is
+    the journal sequence number the snapshot reflects.
+    """
+    count = 0
+    for count in save_steps(hms, path, seq=seq):
+        pass
+    return count
+
+
+def save_steps(hms, path, step=1 << 20, seq=None):
+    """Write a snapshot like save(), yielding the records written so far.
+
+    A count is yielded after each column's type check, every step bytes of
+    rows and each collection, and once more, with the total, when the file
+    is in place. hms must not change until the
+    generator is exhausted. Closing it early removes the partial file and
+    leaves any existing snapshot at path untouched.
+    """
+    strings = _StringTable()
+
+    def encode_int(value):
+        return NULL_INT if value is None else value
+
+    def encode_string(value):
+        return NULL_STRING if value is None else strings.add(value)
+
+    collections = {}
+    count = 0
+    temp_path = path + ".tmp"
+    try:
+        with open(temp_path, "wb") as file:
+            file.write(MAGIC)
+            for (
+                collection,
+                record_type,
+            ) in HospitalManagementSystem.RECORD_TYPES.items():
+                registry = getattr(hms, collection)
+                columns = record_type.__slots__
+                layout = []
+                for field in columns:
+                    layout.append(_column_type(registry, field))
+                    yield count
+                types = "".join(kind for kind, _ in layout)
+                row = struct.Struct("<" + types)
+                encoders = [
+                    encode_int if kind == INT else encode_string for kind in types
+                ]
+                rows_offset = file.tell()
+                keys = []
+                buffer = bytearray()
+                for number, record in enumerate(registry):
+                    buffer += row.pack(
+                        *[
+                            encode(getattr(record, field))
+                            for encode, field in zip(encoders, columns)
+                        ]
+                    )
+                    keys.append((getattr(record, registry.key), number))
+                    if len(buffer) >= step:
+                        file.write(buffer)
+                        buffer.clear()
+                        yield count + len(keys)
+                file.write(buffer)
+                keys_offset = file.tell()
+                yield count + len(keys)
+                keys.sort()
+                file.write(b"".join(KEY_ENTRY.pack(*entry) for entry in keys))
+                collections[collection] = {
+                    "columns": list(columns),
+                    "types": types,
+                    "nullable": [
+                        position
+                        for position, (_, nullable) in enumerate(layout)
+                        if nullable
+                    ],
+                    "count": len(keys),
+                    "rows": rows_offset,
+                    "keys": keys_offset,
+                }
+                count += len(keys)
+            offsets_offset = file.tell()
+            position = 0
+            offsets = [OFFSET.pack(0)]
+            for blob in strings.blobs:
+                position += len(blob)
+                offsets.append(OFFSET.pack(position))
+            file.write(b"".join(offsets))
+            blob_offset = file.tell()
+            file.write(b"".join(strings.blobs))
+            footer = json.dumps(
+                {
+                    "seq": seq,
+                    "collections": collections,
+                    "strings": {
+                        "count": len(strings.blobs),
+                        "offsets": offsets_offset,
+                        "data": blob_offset,
+                    },
+                }
+            ).encode("utf-8")
+            footer_offset = file.tell()
+            file.write(footer)
+            file.write(TRAILER.pack(footer_offset, len(footer), MAGIC))
+            file.flush()
+            os.fsync(file.fileno())
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    os.replace(temp_path, path)
+    yield count
+
+
+# Reading
+class MappedCollection:
+    """Read-only view of one snapshot collection that decodes records on access.
+
+    Supports len(), iteration, indexing by row number, ``in`` and get() by
+    ID (a bisection over the sorted ID index), and scan(after=cursor) with
+    row numbers as cursors, like Registry.scan.
+    """
+
+    def __init__(self, snapshot, name, layout):
+        """Initialize the view from its footer entry; nothing is decoded yet."""
+        self.name = name
+        self.record_type = HospitalManagementSystem.RECORD_TYPES[name]
+        self.columns = layout["columns"]
+        self._snapshot = snapshot
+        self._row = struct.Struct("<" + layout["types"])
+        self._string_columns = [
+            position for position, kind in enumerate(layout["types"]) if kind == STRING
+        ]
+        self._null_int_columns = [
+            position
+            for position in layout["nullable"]
+            if layout["types"][position] == INT
+        ]
+        if tuple(self.columns) == self.record_type.FIELDS:
+            self._build = self.record_type
+        else:
+            self._build = self._from_slots
+        self._count = layout["count"]
+        self._rows = layout["rows"]
+        self._keys = layout["keys"]
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        """Decode every record in row order, reading the rows block sequentially."""
+        start = self._rows
+        rows = memoryview(self._snapshot.buffer)[
+            start : start + self._count * self._row.size
+        ]
+        cache = {}
+        string = self._snapshot.string
+
+        def cached_string(position):
+            text = cache.get(position)
+            if text is None:
+                text = cache[position] = string(position)
+            return text
+
+        try:
+            for values in self._row.iter_unpack(rows):
+                yield self._decode(values, cached_string)
+        finally:
+            rows.release()
+
+    def __contains__(self, record_id):
+        return self._find(record_id) is not None
+
+    def __repr__(self):
+        return f"MappedCollection({self.name!r}, size={self._count})"
+
+    def __getitem__(self, number):
+        """Decode and return the record stored in the given row."""
+        if not 0 <= number < self._count:
+            raise IndexError(number)
+        values = self._row.unpack_from(
+            self._snapshot.buffer, self._rows + number * self._row.size
+        )
+        return self._decode(values, self._snapshot.string)
+
+    def _decode(self, values, string):
+        """Build a record from one unpacked row, resolving nulls and strings."""
+        values = list(values)
+        for position in self._null_int_columns:
+            if values[position] == NULL_INT:
+                values[position] = None
+        for position in self._string_columns:
+            values[position] = string(values[position])
+        return self._build(*values)
+
+    def _from_slots(self, *values):
+        """Build a record whose stored columns are its slots rather than its FIELDS."""
+        record = self.record_type.__new__(self.record_type)
+        for field, value in zip(self.columns, values):
+            setattr(record, field, value)
+        return record
+
+    def _find(self, record_id):
+        """Return the row number holding record_id, or None, by bisecting the ID index."""
+        buffer = self._snapshot.buffer
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            key, number = KEY_ENTRY.unpack_from(
+                buffer, self._keys + middle * KEY_ENTRY.size
+            )
+            if key < record_id:
+                low = middle + 1
+            elif key > record_id:
+                high = middle
+            else:
+                return number
+        return None
+
+    def get(self, record_id, default=None):
+        """Return the record with the given ID, or default if it is missing."""
+        number = self._find(record_id)
+        return default if number is None else self[number]
+
+    def scan(self, after=None):
+        """Lazily yield (row number, record) pairs after the given row number."""
+        for number in range(0 if after is None else after + 1, self._count):
+            yield number, self[number]
+
+
+class Snapshot:
+    """A binary snapshot opened through mmap.
+
+    Opening maps the file and parses the small JSON footer, so it costs the
+    same for ten records or ten million; ``snapshot["patients"]`` is a
+    MappedCollection that decodes records only when they are accessed.
+    Use restore() to load everything into a HospitalManagementSystem, as
+    recover() does at startup.
+    """
+
+    def __init__(self, path):
+        """Map the snapshot at path; raise ValueError if it is not one."""
+        self._file = open(path, "rb")
+        self.buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        footer_offset, footer_length, magic = TRAILER.unpack_from(
+            self.buffer, len(self.buffer) - TRAILER.size
+        )
+        if magic != MAGIC or self.buffer[: len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a hospital snapshot")
+        footer = json.loads(self.buffer[footer_offset : footer_offset + footer_length])
+        self.seq = footer.get("seq")
+        self._string_offsets = footer["strings"]["offsets"]
+        self._string_data = footer["strings"]["data"]
+        self.collections = {
+            name: MappedCollection(self, name, layout)
+            for name, layout in footer["collections"].items()
+        }
+
+    def __getitem__(self, collection):
+        return self.collections[collection]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def string(self, position):
+        """Decode one entry of the string table."""
+        if position == NULL_STRING:
+            return None
+        start, end = struct.unpack_from(
+            "<QQ", self.buffer, self._string_offsets + position * OFFSET.size
+        )
+        data = self._string_data
+        return str(self.buffer[data + start : data + end], "utf-8")
+
+    def restore(self, hms):
+        """Decode every record into hms's registries; return how many were loaded.
+
+        Records go straight into the registries, without journaling. If any
+        snapshot ID is already present in hms, DuplicateRecordError is raised
+        and nothing is loaded.
+        """
+        decoded = {name: list(records) for name, records in self.collections.items()}
+        for name, records in decoded.items():
+            registry = getattr(hms, name)
+            taken = [
+                record_id
+                for record_id in map(operator.attrgetter(registry.key), records)
+                if record_id in registry
+            ]
+            if taken:
+                raise DuplicateRecordError(
+                    f"{len(taken)} IDs already exist in {name}!", taken
+                )
+        count = 0
+        for name, records in decoded.items():
+            getattr(hms, name).add_many(records)
+            count += len(records)
+        return count
+
+    def close(self):
+        """Unmap and close the snapshot file."""
+        self.buffer.close()
+        self._file.close()
+
+
+def load(path, hms=None):
+    """Open the snapshot at path; with hms, also restore it and close the file.
+
+    Returns the open Snapshot, or the number of records restored into hms.
+    """
+    snapshot = Snapshot(path)
+    if hms is None:
+        return snapshot
+    with snapshot:
+        return snapshot.restore(hms)
+
+
+# Startup
+def checkpoint(hms):
+    """Save hms to the binary snapshot in its storage directory and truncate the journal.
+
+    hms.storage must be a LogStorage. The snapshot records the journal's
+    sequence number, so recover() replays only what was journaled after it.
+    """
+    storage = hms.storage
+    storage.flush()
+    save(hms, os.path.join(storage.directory, BINARY_FILE), seq=storage.seq)
+    storage.write_snapshot((), binary=BINARY_FILE)
+
+
+def recover(hms):
+    """Rebuild hms at startup; return the records restored plus events replayed.
+
+    When the last checkpoint was a binary one, its snapshot is restored
+    through mmap and only the journal tail after it is replayed; otherwise
+    this is hms.recover().
+    """
+    storage = hms.storage
+    if getattr(storage, "binary_snapshot", None) is None:
+        return hms.recover()
+    with Snapshot(os.path.join(storage.directory, storage.binary_snapshot)) as mapped:
+        count = mapped.restore(hms)
+        seq = mapped.seq
+    return count + hms.recover(after=seq)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Save or inspect binary hospital snapshots"
+    )
+    parser.add_argument("action", choices=["save", "show"])
+    parser.add_argument("path", help="snapshot file")
+    parser.add_argument("--data", default="hospital_data", help="storage directory")
+    parser.add_argument("--collection", default="patients")
+    parser.add_argument("--after", type=int, help="row number to continue after")
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.action == "save":
+        hms = HospitalManagementSystem(LogStorage(args.data))
+        recover(hms)
+        count = save(hms, args.path)
+        hms.close()
+        print(f"{count:,} records saved in {time.perf_counter() - start:.2f}s")
+    else:
+        with Snapshot(args.path) as snapshot:
+            records = snapshot[args.collection]
+            for number, record in itertools.islice(
+                records.scan(args.after), args.limit
+            ):
+                print(number, vars(record))
+            print(
+                f"{len(records):,} {args.collection} mapped; "
+                f"shown in {time.perf_counter() - start:.3f}s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import json
+import os
+import time
+
+
+class Storage:
+    """Persistence backend interface; the default implementation keeps nothing."""
+
+    def append(self, event):
+        """Record one mutation event."""
+
+    def flush(self):
+        """Make every recorded event durable."""
+
+    def write_snapshot(self, events, binary=None):
+        """Replace the persisted state with the given stream of add events.
+
+        binary names a file holding the rest of the state, written elsewhere.
+        """
+
+    def replay(self, after=None):
+        """Yield every persisted event in the order it must be applied.
+
+        With after, yield only journal events with a later sequence number.
+        """
+        return iter(())
+
+    def close(self):
+        """Flush pending events and release any open resources."""
+
+
+class LogStorage(Storage):
+    """Append-only JSON-lines journal with group commit and snapshot compaction."""
+
+    SNAPSHOT_FILE = "snapshot.jsonl"
+    JOURNAL_FILE = "journal.jsonl"
+
+    def __init__(self, directory, batch_size=512, flush_interval=0.05):
+        """Open (or create) a journal in directory.
+
+        Events are buffered and written with a single fsync once batch_size
+        events are pending or flush_interval seconds have passed since the
+        last flush, whichever comes first.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.snapshot_path = os.path.join(directory, self.SNAPSHOT_FILE)
+        self.journal_path = os.path.join(directory, self.JOURNAL_FILE)
+        self._pending = []
+        self._last_flush = time.monotonic()
+        header = self._read_snapshot_header()
+        self._snapshot_seq = header.get("seq", 0)
+        self.binary_snapshot = header.get("binary")
+        self._seq = max(self._snapshot_seq, self._repair_journal())
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+
+    # Utility: Sequence Numbers
+    @property
+    def seq(self):
+        """Return the sequence number of the last event appended."""
+        return self._seq
+
+    @property
+    def snapshot_seq(self):
+        """Return the sequence number the snapshot was taken at (0 if none)."""
+        return self._snapshot_seq
+
+    def _read_snapshot_header(self):
+        """Return the snapshot's header: its sequence number and binary file, if any."""
+        if not os.path.exists(self.snapshot_path):
+            return {}
+        with open(self.snapshot_path, encoding="utf-8") as file:
+            header = file.readline()
+        return json.loads(header) if header else {}
+
+    def _repair_journal(self):
+        """Drop a torn final line left by a crash; return the last valid sequence number."""
+        if not os.path.exists(self.journal_path):
+            return 0
+        seq = 0
+        valid_end = 0
+        with open(self.journal_path, "rb+") as file:
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    seq = json.loads(line)["seq"]
+                except ValueError:
+                    break
+                valid_end += len(line)
+            file.truncate(valid_end)
+        return seq
+
+    def _read_journal(self):
+        """Yield journal events in the order they were written."""
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, encoding="utf-8") as file:
+            for line in file:
+                yield json.loads(line)
+
+    # Journal Methods
+    def append(self, event):
+        """Buffer an event and group-commit once the batch is full or stale."""
+        self._seq += 1
+        event["seq"] = self._seq
+        self._pending.append(json.dumps(event, separators=(",", ":")))
+        if (
+            len(self._pending) >= self.batch_size
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self):
+        """Write all buffered events and fsync the journal once."""
+        if self._pending:
+            self._journal.write("\n".join(self._pending) + "\n")
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._pending.clear()
+        self._last_flush = time.monotonic()
+
+    # Snapshot Methods
+    def write_snapshot(self, events, binary=None):
+        """Atomically write a snapshot of the current state and truncate the journal.
+
+        binary names a file in the directory that holds the state instead
+        (see snapshot.checkpoint); replay() then yields only the journal tail.
+        """
+        self.flush()
+        header = {"seq": self._seq}
+        if binary is not None:
+            header["binary"] = binary
+        temp_path = self.snapshot_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            file.write(json.dumps(header) + "\n")
+            for event in events:
+                file.write(json.dumps(event, separators=(",", ":")) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, self.snapshot_path)
+        self._snapshot_seq = self._seq
+        self.binary_snapshot = binary
+        self._journal.close()
+        self._journal = open(self.journal_path, "w", encoding="utf-8")
+
+    def replay(self, after=None):
+        """Yield snapshot events followed by the journal tail written after it.
+
+        With after, yield only the journal events after that sequence number,
+        for state restored from elsewhere. Without it, raise ValueError if
+        the state lives in a binary snapshot, which replay cannot read.
+        """
+        if after is not None:
+            for event in self._read_journal():
+                if event["seq"] > after:
+                    yield event
+            return
+        if self.binary_snapshot is not None:
+            raise ValueError(
+                f"State is in {self.binary_snapshot}; load it with snapshot.recover()"
+            )
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, encoding="utf-8") as file:
+                file.readline()
+                for line in file:
+                    yield json.loads(line)
+        for event in self._read_journal():
+            if event["seq"] > self._snapshot_seq:
+                yield event
+
+    def close(self):
+        """Flush pending events and close the journal file."""
+        self.flush()
+        self._journal.close()